@@ -1,7 +1,7 @@
 """
 Konfigurationsmodul für das TestSuite System
 """
-from .settings import config, SystemConfig, APIConfig, TestConfig
+from .settings import config, SystemConfig, APIConfig, TestConfig, JudgeConfig, NetworkConfig, WorkerConfig
 from .api_keys import key_manager, APIKeyManager
 
 __all__ = [
@@ -9,6 +9,9 @@ __all__ = [
     'SystemConfig', 
     'APIConfig',
     'TestConfig',
+    'JudgeConfig',
+    'NetworkConfig',
+    'WorkerConfig',
     'key_manager',
     'APIKeyManager'
 ]
\ No newline at end of file
@@ -3,7 +3,7 @@ Konfigurationsverwaltung für das TestSuite System
 """
 import os
 from typing import Dict, Any
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from dotenv import load_dotenv
 
 # Lade Umgebungsvariablen
@@ -27,11 +27,59 @@ class MultiModelConfig:
 @dataclass
 class TestConfig:
     """Test Konfiguration"""
-    max_test_duration: int = 300  # Sekunden
+    max_test_duration: int = 300  # Zeitbudget pro Test in Sekunden (0 = unbegrenzt)
+    max_run_duration: int = 0  # Zeitbudget des gesamten Laufs in Sekunden (0 = unbegrenzt)
     similarity_threshold: float = 0.8
     enable_logging: bool = True
     log_level: str = "INFO"
     results_dir: str = "data/results"
+    max_workers: int = 1  # Gleichzeitig ausgeführte Tests pro Suite (1 = nacheinander)
+    max_model_workers: int = 0  # Gleichzeitig getestete Modelle pro Suite (0 = alle, 1 = nacheinander)
+    reference_index_path: str = "data/cache/reference_index.json"
+    similarity_idf: str = "corpus"  # "corpus" (korpusweite IDF) oder "pair" (IDF nur aus dem Textpaar)
+    corpus_stats_path: str = "data/cache/corpus_stats.npz"
+    corpus_hash_features: int = 2 ** 18  # Größe des Hashing-Merkmalsraums
+    warmup_requests: int = 0  # Wegwerf-Anfragen pro Modell vor der Messung (0 = keine Aufwärmphase)
+    warmup_max_tokens: int = 32  # Maximale Antwortlänge der Aufwärmanfragen
+    telemetry_streaming: bool = True  # Modellanfragen streamen, um Zeit bis zum ersten Token und Token-Abstände zu messen
+
+@dataclass
+class JudgeConfig:
+    """Konfiguration des Bewertungsmodells (Judge)"""
+    max_concurrency: int = 8  # Gleichzeitige Bewertungsanfragen pro Endpunkt
+    cache_enabled: bool = True
+    cache_path: str = "data/cache/judge_cache.sqlite"
+    cache_max_entries: int = 10000
+    mode: str = "text"  # "text" (Freitext), "logprob" (einzelnes Score-Token) oder "stream" (Abbruch nach Urteil)
+    logprob_top_k: int = 20  # Anzahl der Alternativen pro Token im Logprob-Modus
+    stream_reasoning_chars: int = 0  # Zeichen Begründung, die nach dem Urteil noch gelesen werden
+    batch_size: int = 1  # Kandidaten pro gebündelter Bewertungsanfrage (1 = keine Bündelung)
+
+@dataclass
+class NetworkConfig:
+    """HTTP Verbindungskonfiguration für alle Modell-Clients"""
+    max_connections_per_host: int = 20
+    max_keepalive_connections: int = 10
+    keepalive_expiry: float = 30.0  # Sekunden
+    http2: bool = False  # Benötigt das Paket 'h2'
+    retry_backoff_base: float = 0.5  # Sekunden
+    retry_backoff_max: float = 20.0  # Sekunden
+    breaker_failure_threshold: int = 5  # Aufeinanderfolgende Fehler bis zum Öffnen
+    breaker_reset_timeout: float = 30.0  # Sekunden bis zur Probeanfrage
+    endpoint_max_concurrency: int = 4  # Gleichzeitige Anfragen pro base_url über alle Suiten (0 = unbegrenzt)
+    endpoint_slots: Dict[str, int] = field(default_factory=dict)  # Abweichende Plätze einzelner base_urls
+    adaptive_concurrency: bool = False  # Plätze pro Endpunkt per AIMD an die Kapazität anpassen
+    adaptive_min_concurrency: int = 1  # Untergrenze des adaptiven Fensters
+    adaptive_max_concurrency: int = 64  # Obergrenze des adaptiven Fensters
+    adaptive_latency_factor: float = 3.0  # p95 Latenz über Faktor x Basislatenz gilt als Überlastung
+    health_probe_ttl: float = 120.0  # Sekunden, die ein Ergebnis der Erreichbarkeitsprüfung gilt
+    health_probe_timeout: float = 10.0  # Zeitbudget einer Erreichbarkeitsprüfung in Sekunden
+
+@dataclass
+class WorkerConfig:
+    """Prozesspool für rechenintensive Schritte (Code-Ausführung, Audio, Bildkodierung, Metriken)"""
+    cpu_workers: int = 0  # Worker-Prozesse (0 = im aufrufenden Thread ausführen)
+    start_method: str = "spawn"  # Startmethode der Worker-Prozesse (spawn, forkserver oder fork)
 
 @dataclass
 class SystemConfig:
@@ -39,8 +87,23 @@ class SystemConfig:
     api_configs: Dict[str, APIConfig]
     multi_model_configs: Dict[str, MultiModelConfig]
     test_config: TestConfig
+    judge_config: JudgeConfig = field(default_factory=JudgeConfig)
+    network_config: NetworkConfig = field(default_factory=NetworkConfig)
+    worker_config: WorkerConfig = field(default_factory=WorkerConfig)
     debug_mode: bool = False
     
+    @staticmethod
+    def _parse_endpoint_slots(value: str) -> Dict[str, int]:
+        """Lese die Plätze pro base_url aus JSON, z.B. {"http://gpu1:8000/v1": 8}"""
+        if not value:
+            return {}
+        try:
+            import json
+            return {base_url.rstrip("/"): int(slots) for base_url, slots in json.loads(value).items()}
+        except (json.JSONDecodeError, AttributeError, TypeError, ValueError):
+            print("Warning: Invalid JSON in ENDPOINT_SLOTS environment variable")
+            return {}
+    
     @classmethod
     def from_env(cls) -> 'SystemConfig':
         """Erstelle Konfiguration aus Umgebungsvariablen"""
@@ -76,10 +139,58 @@ class SystemConfig:
         # Test Konfiguration
         test_config = TestConfig(
             max_test_duration=int(os.getenv("MAX_TEST_DURATION", "300")),
+            max_run_duration=int(os.getenv("MAX_RUN_DURATION", "0")),
             similarity_threshold=float(os.getenv("SIMILARITY_THRESHOLD", "0.8")),
             enable_logging=os.getenv("ENABLE_LOGGING", "true").lower() == "true",
             log_level=os.getenv("LOG_LEVEL", "INFO"),
-            results_dir=os.getenv("RESULTS_DIR", "data/results")
+            results_dir=os.getenv("RESULTS_DIR", "data/results"),
+            max_workers=int(os.getenv("TEST_MAX_WORKERS", "1")),
+            max_model_workers=int(os.getenv("TEST_MAX_MODEL_WORKERS", "0")),
+            reference_index_path=os.getenv("REFERENCE_INDEX_PATH", "data/cache/reference_index.json"),
+            similarity_idf=os.getenv("SIMILARITY_IDF", "corpus").lower(),
+            corpus_stats_path=os.getenv("CORPUS_STATS_PATH", "data/cache/corpus_stats.npz"),
+            corpus_hash_features=int(os.getenv("CORPUS_HASH_FEATURES", str(2 ** 18))),
+            warmup_requests=int(os.getenv("WARMUP_REQUESTS", "0")),
+            warmup_max_tokens=int(os.getenv("WARMUP_MAX_TOKENS", "32")),
+            telemetry_streaming=os.getenv("TELEMETRY_STREAMING", "true").lower() == "true"
+        )
+        
+        # Judge Konfiguration
+        judge_config = JudgeConfig(
+            max_concurrency=int(os.getenv("JUDGE_MAX_CONCURRENCY", "8")),
+            cache_enabled=os.getenv("JUDGE_CACHE_ENABLED", "true").lower() == "true",
+            cache_path=os.getenv("JUDGE_CACHE_PATH", "data/cache/judge_cache.sqlite"),
+            cache_max_entries=int(os.getenv("JUDGE_CACHE_MAX_ENTRIES", "10000")),
+            mode=os.getenv("JUDGE_MODE", "text").lower(),
+            logprob_top_k=int(os.getenv("JUDGE_LOGPROB_TOP_K", "20")),
+            stream_reasoning_chars=int(os.getenv("JUDGE_STREAM_REASONING_CHARS", "0")),
+            batch_size=int(os.getenv("JUDGE_BATCH_SIZE", "1"))
+        )
+        
+        # Netzwerk Konfiguration
+        network_config = NetworkConfig(
+            max_connections_per_host=int(os.getenv("HTTP_MAX_CONNECTIONS_PER_HOST", "20")),
+            max_keepalive_connections=int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "10")),
+            keepalive_expiry=float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30")),
+            http2=os.getenv("HTTP2_ENABLED", "false").lower() == "true",
+            retry_backoff_base=float(os.getenv("RETRY_BACKOFF_BASE", "0.5")),
+            retry_backoff_max=float(os.getenv("RETRY_BACKOFF_MAX", "20")),
+            breaker_failure_threshold=int(os.getenv("CIRCUIT_BREAKER_THRESHOLD", "5")),
+            breaker_reset_timeout=float(os.getenv("CIRCUIT_BREAKER_RESET_TIMEOUT", "30")),
+            endpoint_max_concurrency=int(os.getenv("ENDPOINT_MAX_CONCURRENCY", "4")),
+            endpoint_slots=cls._parse_endpoint_slots(os.getenv("ENDPOINT_SLOTS", "")),
+            adaptive_concurrency=os.getenv("ADAPTIVE_CONCURRENCY", "false").lower() == "true",
+            adaptive_min_concurrency=int(os.getenv("ADAPTIVE_MIN_CONCURRENCY", "1")),
+            adaptive_max_concurrency=int(os.getenv("ADAPTIVE_MAX_CONCURRENCY", "64")),
+            adaptive_latency_factor=float(os.getenv("ADAPTIVE_LATENCY_FACTOR", "3.0")),
+            health_probe_ttl=float(os.getenv("HEALTH_PROBE_TTL", "120")),
+            health_probe_timeout=float(os.getenv("HEALTH_PROBE_TIMEOUT", "10"))
+        )
+        
+        # Worker Konfiguration
+        worker_config = WorkerConfig(
+            cpu_workers=int(os.getenv("CPU_WORKERS", "0")),
+            start_method=os.getenv("CPU_WORKER_START_METHOD", "spawn").lower()
         )
         
         # System Konfiguration
@@ -196,6 +307,9 @@ class SystemConfig:
             api_configs=api_configs,
             multi_model_configs=multi_model_configs,
             test_config=test_config,
+            judge_config=judge_config,
+            network_config=network_config,
+            worker_config=worker_config,
             debug_mode=debug_mode
         )
 
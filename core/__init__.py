@@ -2,7 +2,20 @@
 Kernkomponenten Modul für das TestSuite System
 """
 from .logger import TestSuiteLogger, TestResult, get_suite_logger
-from .evaluator import evaluator, TestEvaluator, EvaluationResult, LLMClient, TextComparator
+from .client_registry import client_registry, ClientRegistry
+from .judge_cache import judge_cache, JudgeCache
+from .reference_index import reference_index, ReferenceIndex
+from .corpus_stats import corpus_stats, CorpusStatistics
+from .scheduler import work_scheduler, WorkScheduler
+from .run_manifest import run_manifest, RunManifest
+from .sharding import shard_selector, ShardSelector
+from .worker_pool import cpu_pool, CpuWorkerPool
+from .deadlines import deadlines, Deadlines, DeadlineExceeded
+from .health import health_probe, HealthProbe
+from .warmup import warmup, Warmup
+from .planner import run_planner, RunPlanner, PlannedTest
+from .telemetry import telemetry, Telemetry, CallTelemetry
+from .evaluator import evaluator, TestEvaluator, EvaluationResult, JudgeJob, LLMClient, AsyncLLMClient, TextComparator
 
 __all__ = [
     'TestSuiteLogger',
@@ -11,6 +24,37 @@ __all__ = [
     'evaluator',
     'TestEvaluator',
     'EvaluationResult',
+    'JudgeJob',
     'LLMClient',
-    'TextComparator'
+    'AsyncLLMClient',
+    'TextComparator',
+    'judge_cache',
+    'JudgeCache',
+    'client_registry',
+    'ClientRegistry',
+    'reference_index',
+    'ReferenceIndex',
+    'corpus_stats',
+    'CorpusStatistics',
+    'work_scheduler',
+    'WorkScheduler',
+    'run_manifest',
+    'RunManifest',
+    'shard_selector',
+    'ShardSelector',
+    'cpu_pool',
+    'CpuWorkerPool',
+    'deadlines',
+    'Deadlines',
+    'DeadlineExceeded',
+    'health_probe',
+    'HealthProbe',
+    'warmup',
+    'Warmup',
+    'run_planner',
+    'RunPlanner',
+    'PlannedTest',
+    'telemetry',
+    'Telemetry',
+    'CallTelemetry'
 ]
\ No newline at end of file
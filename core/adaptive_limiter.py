@@ -0,0 +1,127 @@
+"""
+Adaptive Begrenzung gleichzeitiger Anfragen pro Endpunkt (AIMD)
+"""
+import time
+import threading
+from collections import deque
+from typing import Dict, Any, Optional
+
+class AdaptiveLimiter:
+    """Begrenzung gleichzeitiger HTTP-Anfragen eines Endpunkts mit AIMD-Fenster
+
+    Ersetzt die feste Semaphore der Transports (acquire/release). Mit
+    adaptive=True passt sich das Fenster der Kapazität des Backends an:
+
+    - additive Erhöhung: jede erfolgreiche Antwort bei voll genutztem Fenster
+      erhöht es um 1/Fenster, also um etwa einen Platz pro Anfragerunde
+    - multiplikative Senkung: 429, 503, Timeouts oder ein p95 der Latenz über
+      latency_factor mal der Basislatenz halbieren das Fenster (backoff)
+
+    Nach einer Senkung werden Signale von Anfragen, die vorher gestartet
+    wurden, ignoriert, damit eine einzige Überlastung das Fenster nicht
+    mehrfach halbiert. Ohne adaptive bleibt das Fenster fest bei limit.
+    """
+
+    def __init__(self, name: str, limit: int, adaptive: bool = False, min_limit: int = 1,
+                 max_limit: int = 64, latency_factor: float = 3.0, sample_size: int = 20,
+                 backoff: float = 0.5):
+        self.name = name
+        self.adaptive = adaptive
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(limit, max_limit) if adaptive else limit
+        self.latency_factor = latency_factor
+        self.backoff = backoff
+        self.window = float(limit)
+        self.active = 0
+        self.peak_active = 0
+        self.increases = 0
+        self.decreases = 0
+        self._samples: deque = deque(maxlen=sample_size)
+        self._p95: Optional[float] = None
+        self._baseline: Optional[float] = None
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        """Aktuelle Anzahl gleichzeitig erlaubter Anfragen"""
+        return max(self.min_limit, int(self.window))
+
+    def acquire(self, blocking: bool = True, timeout: Optional[float] = None) -> bool:
+        """Belege einen Platz (Schnittstelle wie threading.Semaphore)"""
+        with self._cond:
+            if not blocking:
+                if self.active >= self.limit:
+                    return False
+            elif not self._cond.wait_for(lambda: self.active < self.limit, timeout):
+                return False
+            self.active += 1
+            self.peak_active = max(self.peak_active, self.active)
+            return True
+
+    def release(self) -> None:
+        """Gib einen Platz frei"""
+        with self._cond:
+            self.active -= 1
+            self._cond.notify()
+
+    def record(self, started: float, latency: Optional[float], overloaded: bool) -> None:
+        """Werte eine abgeschlossene Anfrage aus (started aus time.monotonic, latency nur bei Erfolg)"""
+        if not self.adaptive:
+            return
+
+        with self._cond:
+            if overloaded:
+                self._decrease_locked(started, "Überlastung gemeldet")
+                return
+            if latency is None:
+                return
+
+            self._samples.append(latency)
+            if len(self._samples) == self._samples.maxlen:
+                ordered = sorted(self._samples)
+                self._p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+                if self._baseline is None or self._p95 <= self._baseline:
+                    self._baseline = self._p95
+                elif self._p95 > self.latency_factor * self._baseline:
+                    self._decrease_locked(started, f"p95 Latenz {self._p95:.1f}s")
+                    return
+                else:
+                    # Langsame Anpassung an dauerhaft veränderte Antwortzeiten
+                    self._baseline = 0.9 * self._baseline + 0.1 * self._p95
+
+            # Nur ein ausgeschöpftes Fenster wird vergrößert
+            if self.active >= self.limit and self.window < self.max_limit:
+                previous = self.limit
+                self.window = min(self.max_limit, self.window + 1.0 / self.window)
+                if self.limit > previous:
+                    self.increases += 1
+                    self._cond.notify_all()
+
+    def _decrease_locked(self, started: float, reason: str) -> None:
+        """Halbiere das Fenster einmal pro Überlastungsereignis"""
+        if started < self._last_decrease:
+            return
+        previous = self.limit
+        self.window = max(float(self.min_limit), self.window * self.backoff)
+        self._last_decrease = time.monotonic()
+        self._samples.clear()
+        if self.limit < previous:
+            self.decreases += 1
+            print(f"Adaptive Begrenzung {self.name}: {previous} -> {self.limit} gleichzeitige Anfragen ({reason})")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hole Fenster, Auslastung und Latenz"""
+        with self._cond:
+            return {
+                "adaptive": self.adaptive,
+                "window": self.limit,
+                "min_window": self.min_limit,
+                "max_window": self.max_limit,
+                "active": self.active,
+                "peak_active": self.peak_active,
+                "increases": self.increases,
+                "decreases": self.decreases,
+                "p95_latency": self._p95,
+                "baseline_latency": self._baseline
+            }
@@ -0,0 +1,185 @@
+"""
+Prozessweites Register für OpenAI Clients mit gemeinsamen Verbindungspools
+"""
+import atexit
+import importlib.util
+import threading
+from typing import Dict, Any, Optional, Set, Tuple, TYPE_CHECKING
+from urllib.parse import urlsplit
+
+import httpx
+
+from config import config, key_manager
+from .resilience import CircuitBreaker, RetryPolicy, ResilientTransport, ResilientAsyncTransport
+from .scheduler import work_scheduler, pool_for_service
+from .lazy_imports import get_openai
+
+if TYPE_CHECKING:
+    from openai import OpenAI
+
+ClientKey = Tuple[str, str, float, int, Optional[str]]
+
+class ClientRegistry:
+    """Verwaltet OpenAI Clients, die sich einen HTTP-Verbindungspool pro Host teilen
+
+    Clients werden über (base_url, api_key, timeout, max_retries, pool) identifiziert.
+    Alle Clients desselben Hosts nutzen einen gemeinsamen Verbindungspool mit
+    Keep-Alive, sodass Verbindungen über Modelle und Test Suiten hinweg
+    wiederverwendet werden. Jeder Client erhält darüber einen Transport mit
+    Wiederholungen, einem Circuit Breaker pro base_url und der Begrenzung
+    gleichzeitiger Anfragen seines Kapazitätspools (siehe WorkScheduler).
+    """
+
+    def __init__(self):
+        self._pools: Dict[str, httpx.HTTPTransport] = {}
+        self._http_clients: Dict[ClientKey, httpx.Client] = {}
+        self._clients: Dict[ClientKey, "OpenAI"] = {}
+        self._owners: Dict[ClientKey, Set[str]] = {}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+        self._http2 = self._resolve_http2()
+
+    def _resolve_http2(self) -> bool:
+        """Prüfe ob HTTP/2 aktiviert und verfügbar ist"""
+        if not config.network_config.http2:
+            return False
+        if importlib.util.find_spec("h2") is None:
+            print("Warnung: HTTP/2 aktiviert, aber das Paket 'h2' ist nicht installiert. Verwende HTTP/1.1")
+            return False
+        return True
+
+    @property
+    def limits(self) -> httpx.Limits:
+        """Verbindungslimits pro Host"""
+        network_config = config.network_config
+        return httpx.Limits(
+            max_connections=network_config.max_connections_per_host,
+            max_keepalive_connections=network_config.max_keepalive_connections,
+            keepalive_expiry=network_config.keepalive_expiry
+        )
+
+    @staticmethod
+    def _host_key(base_url: str) -> str:
+        """Bestimme den Host (Schema und Netzwerkadresse) einer Basis-URL"""
+        parts = urlsplit(base_url)
+        return f"{parts.scheme}://{parts.netloc}"
+
+    def _retry_policy(self, max_retries: int) -> RetryPolicy:
+        """Erstelle die Wiederholungsstrategie aus der Netzwerkkonfiguration"""
+        return RetryPolicy(
+            max_retries=max_retries,
+            backoff_base=config.network_config.retry_backoff_base,
+            backoff_max=config.network_config.retry_backoff_max
+        )
+
+    def get_breaker(self, base_url: str) -> CircuitBreaker:
+        """Hole oder erstelle den Circuit Breaker für eine base_url"""
+        with self._lock:
+            return self._get_breaker_locked(base_url)
+
+    def _get_breaker_locked(self, base_url: str) -> CircuitBreaker:
+        if base_url not in self._breakers:
+            self._breakers[base_url] = CircuitBreaker(
+                name=base_url,
+                failure_threshold=config.network_config.breaker_failure_threshold,
+                reset_timeout=config.network_config.breaker_reset_timeout
+            )
+        return self._breakers[base_url]
+
+    def _get_pool(self, host: str) -> httpx.HTTPTransport:
+        """Hole oder erstelle den gemeinsamen Verbindungspool für einen Host"""
+        if host not in self._pools:
+            self._pools[host] = httpx.HTTPTransport(limits=self.limits, http2=self._http2)
+        return self._pools[host]
+
+    def get_client(self, base_url: str, api_key: str, timeout: float,
+                   max_retries: int = 3, owner: str = "global", pool: Optional[str] = None) -> "OpenAI":
+        """Hole oder erstelle einen OpenAI Client für einen Endpunkt (pool wählt die Anfragebegrenzung)"""
+        key = (base_url, api_key, float(timeout), max_retries, pool)
+        limiter = work_scheduler.request_limiter(base_url, pool)
+
+        with self._lock:
+            if key not in self._clients:
+                transport = ResilientTransport(
+                    transport=self._get_pool(self._host_key(base_url)),
+                    breaker=self._get_breaker_locked(base_url),
+                    policy=self._retry_policy(max_retries),
+                    limiter=limiter
+                )
+                self._http_clients[key] = httpx.Client(transport=transport, follow_redirects=True)
+                # Wiederholungen übernimmt der Transport, nicht das SDK
+                self._clients[key] = get_openai().OpenAI(
+                    api_key=api_key,
+                    base_url=base_url,
+                    timeout=timeout,
+                    max_retries=0,
+                    http_client=self._http_clients[key]
+                )
+            self._owners.setdefault(key, set()).add(owner)
+            return self._clients[key]
+
+    def get_client_for(self, service: str, model_type: str = "default", owner: str = "global") -> "OpenAI":
+        """Hole einen OpenAI Client für einen konfigurierten Dienst und Modelltyp"""
+        return self.get_client(
+            base_url=key_manager.get_base_url(service, model_type),
+            api_key=key_manager.get_key(service, model_type),
+            timeout=key_manager.get_timeout(service, model_type),
+            max_retries=key_manager.get_max_retries(service, model_type),
+            owner=owner,
+            pool=pool_for_service(service)
+        )
+
+    def create_async_http_client(self, base_url: str, max_retries: int = 3,
+                                 pool: Optional[str] = None) -> httpx.AsyncClient:
+        """Erstelle einen asynchronen httpx Client mit denselben Pool-Einstellungen, Circuit Breaker und Anfragebegrenzung"""
+        transport = ResilientAsyncTransport(
+            transport=httpx.AsyncHTTPTransport(limits=self.limits, http2=self._http2),
+            breaker=self.get_breaker(base_url),
+            policy=self._retry_policy(max_retries),
+            limiter=work_scheduler.request_limiter(base_url, pool)
+        )
+        return httpx.AsyncClient(transport=transport, follow_redirects=True)
+
+    def release(self, owner: str) -> None:
+        """Gib alle Clients eines Besitzers frei und schließe ungenutzte Verbindungspools"""
+        with self._lock:
+            for key in list(self._owners.keys()):
+                owners = self._owners[key]
+                owners.discard(owner)
+                if not owners:
+                    del self._owners[key]
+                    del self._clients[key]
+                    self._http_clients.pop(key).close()
+
+            used_hosts = {self._host_key(base_url) for base_url, _, _, _, _ in self._clients}
+            for host in list(self._pools.keys()):
+                if host not in used_hosts:
+                    self._pools.pop(host).close()
+
+    def close_all(self) -> None:
+        """Schließe alle Verbindungspools"""
+        with self._lock:
+            for http_client in self._http_clients.values():
+                http_client.close()
+            for pool in self._pools.values():
+                pool.close()
+            self._pools.clear()
+            self._http_clients.clear()
+            self._clients.clear()
+            self._owners.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hole eine Übersicht über Clients, Verbindungspools und Circuit Breaker"""
+        with self._lock:
+            return {
+                "clients": len(self._clients),
+                "hosts": sorted(self._pools.keys()),
+                "http2": self._http2,
+                "circuit_breakers": {
+                    base_url: breaker.get_stats() for base_url, breaker in self._breakers.items()
+                }
+            }
+
+# Globale Registerinstanz
+client_registry = ClientRegistry()
+atexit.register(client_registry.close_all)
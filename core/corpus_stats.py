@@ -0,0 +1,239 @@
+"""
+Korpusweite Dokumenthäufigkeiten für die Ähnlichkeitsbewertung
+"""
+import json
+import math
+import time
+import zlib
+import hashlib
+import atexit
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Set, Tuple
+
+from config import config
+from .lazy_imports import get_numpy
+from .reference_index import TERM_PATTERN, normalize_text
+
+# Felder der gespeicherten Testergebnisse, deren Texte in den Korpus eingehen
+RESULT_SECTIONS = ("output_data", "expected_data")
+RESULT_TEXT_FIELDS = ("reference_text", "transcription", "translation")
+RESULT_TEXT_PREFIXES = ("generated_", "expected_")
+
+def hash_term(term: str, n_features: int) -> int:
+    """Bilde einen Term stabil auf einen Index im Merkmalsraum ab (unabhängig von PYTHONHASHSEED)"""
+    return zlib.crc32(term.encode("utf-8")) % n_features
+
+class CorpusStatistics:
+    """Persistente, inkrementell aktualisierte Dokumenthäufigkeiten in einem Hashing-Merkmalsraum
+
+    Jeder Text wird in einem Durchlauf auf einen Vektor fester Größe abgebildet,
+    ein Anpassungsschritt pro Vergleich entfällt. Die IDF wird wie beim
+    TfidfVectorizer geglättet: ln((1 + N) / (1 + df)) + 1. Da der Korpus über
+    Läufe hinweg wächst statt pro Paar neu aufgebaut zu werden, sind die Scores
+    zwischen Läufen vergleichbar.
+
+    Innerhalb eines Laufs gilt ein eingefrorener Stand (freeze): die
+    gespeicherte Tabelle und die Ergebnisse früherer Läufe. Neue Referenzen
+    und die Ergebnisse des laufenden Laufs fließen erst nach dessen Ende ein
+    (finish_run), damit Scores nicht von Testreihenfolge und Parallelität abhängen.
+    """
+
+    def __init__(self, path: str, n_features: int = 2 ** 18):
+        self.path = Path(path)
+        self.n_features = n_features
+        self._document_frequencies = None
+        self._document_count = 0
+        self._documents: Set[str] = set()
+        self._scanned_files: Dict[str, float] = {}
+        self._snapshot: Optional[Tuple[int, Any]] = None  # (Dokumentanzahl, Dokumenthäufigkeiten) des Laufs
+        self._results_dir: Optional[str] = None
+        self._run_started = time.time()  # Spätere Ergebnisdateien gehören zum laufenden Lauf
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._ingest_lock = threading.Lock()
+
+    def _load(self) -> None:
+        """Lade die gespeicherte Tabelle beim ersten Zugriff"""
+        if self._document_frequencies is not None:
+            return
+
+        np = get_numpy()
+        self._document_frequencies = np.zeros(self.n_features, dtype=np.int32)
+        if not self.path.exists():
+            return
+
+        try:
+            with np.load(self.path, allow_pickle=False) as data:
+                if int(data["n_features"]) != self.n_features:
+                    print(f"Korpusstatistik {self.path} hat einen anderen Merkmalsraum, beginne neu")
+                    return
+                self._document_frequencies = data["document_frequencies"].astype(np.int32)
+                self._document_count = int(data["document_count"])
+                self._documents = set(data["documents"].tolist())
+                self._scanned_files = json.loads(str(data["scanned_files"]))
+        except (OSError, KeyError, ValueError) as e:
+            print(f"Fehler beim Laden der Korpusstatistik {self.path}: {e}")
+            self._document_frequencies = np.zeros(self.n_features, dtype=np.int32)
+
+    def term_frequencies(self, text: str) -> Counter:
+        """Bilde einen Text auf Termhäufigkeiten im Hashing-Merkmalsraum ab"""
+        return Counter(hash_term(term, self.n_features) for term in TERM_PATTERN.findall(normalize_text(text)))
+
+    def add_document(self, text: str, document_hash: Optional[str] = None) -> bool:
+        """Nimm ein Dokument in die Statistik auf (jedes Dokument wird nur einmal gezählt)"""
+        if document_hash is None:
+            document_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+        with self._lock:
+            self._load()
+            if document_hash in self._documents:
+                return False
+
+        features = list(self.term_frequencies(text).keys())
+        with self._lock:
+            if document_hash in self._documents or not features:
+                return False
+            self._documents.add(document_hash)
+            self._document_frequencies[features] += 1
+            self._document_count += 1
+            self._dirty = True
+            return True
+
+    def ingest_results(self, results_dir: str, before: Optional[float] = None) -> int:
+        """Nimm neue oder geänderte Ergebnisdateien auf und gib die Anzahl neuer Dokumente zurück
+
+        Mit before werden nur Dateien gelesen, die vor diesem Zeitpunkt geschrieben wurden.
+        """
+        added = 0
+        for filepath in Path(results_dir).rglob("*.json"):
+            file_key = str(filepath.resolve())
+            mtime = filepath.stat().st_mtime
+            if before is not None and mtime >= before:
+                continue
+            with self._lock:
+                self._load()
+                if self._scanned_files.get(file_key) == mtime:
+                    continue
+
+            try:
+                with open(filepath, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                continue
+
+            for text in self._result_texts(data):
+                added += self.add_document(text)
+
+            with self._lock:
+                self._scanned_files[file_key] = mtime
+                self._dirty = True
+        return added
+
+    def freeze(self, results_dir: str) -> None:
+        """Nimm die Ergebnisse früherer Läufe auf und friere den Stand für diesen Lauf ein
+
+        Nur der erste Aufruf pro Lauf arbeitet, weitere Aufrufer warten darauf.
+        """
+        with self._ingest_lock:
+            if self._snapshot is not None:
+                return
+            added = self.ingest_results(results_dir, before=self._run_started)
+            with self._lock:
+                self._load()
+                self._snapshot = (self._document_count, self._document_frequencies.copy())
+                self._results_dir = results_dir
+        if added:
+            print(f"Korpusstatistik: {added} neue Dokumente aus {results_dir} aufgenommen")
+
+    def finish_run(self) -> None:
+        """Nimm nach dem Lauf dessen Ergebnisse auf und speichere die Tabelle"""
+        if self._results_dir is not None:
+            self.ingest_results(self._results_dir)
+        self.save()
+
+    @staticmethod
+    def _result_texts(data: Any) -> List[str]:
+        """Sammle generierte Texte und Referenztexte aus einem gespeicherten Testergebnis"""
+        if not isinstance(data, dict):
+            return []
+        texts = []
+        for section in RESULT_SECTIONS:
+            values = data.get(section)
+            if not isinstance(values, dict):
+                continue
+            texts.extend(
+                value for key, value in values.items()
+                if isinstance(value, str) and (key.startswith(RESULT_TEXT_PREFIXES) or key in RESULT_TEXT_FIELDS)
+            )
+        return texts
+
+    def idf(self, features: List[int]) -> List[float]:
+        """Geglättete IDF für eine Liste von Merkmalsindizes (aus dem eingefrorenen Stand, falls vorhanden)"""
+        with self._lock:
+            self._load()
+            document_count, document_frequencies = self._snapshot or (self._document_count, self._document_frequencies)
+            frequencies = document_frequencies[features].tolist() if features else []
+        return [math.log((1 + document_count) / (1 + frequency)) + 1.0 for frequency in frequencies]
+
+    def weighted_vector(self, text: str) -> Dict[int, float]:
+        """TF-IDF Vektor eines Texts als dünn besetztes Dictionary"""
+        frequencies = self.term_frequencies(text)
+        features = list(frequencies.keys())
+        return {
+            feature: frequencies[feature] * weight
+            for feature, weight in zip(features, self.idf(features))
+        }
+
+    def similarity(self, text1: str, text2: str) -> float:
+        """Cosine Ähnlichkeit mit korpusweiter IDF in O(Token)"""
+        vector1 = self.weighted_vector(text1)
+        vector2 = self.weighted_vector(text2)
+        if not vector1 or not vector2:
+            return 0.0
+
+        if len(vector2) < len(vector1):
+            vector1, vector2 = vector2, vector1
+        dot_product = sum(weight * vector2.get(feature, 0.0) for feature, weight in vector1.items())
+        norm1 = math.sqrt(sum(weight * weight for weight in vector1.values()))
+        norm2 = math.sqrt(sum(weight * weight for weight in vector2.values()))
+        return float(dot_product / (norm1 * norm2))
+
+    def save(self) -> None:
+        """Speichere die Tabelle, falls sie sich geändert hat"""
+        with self._lock:
+            if not self._dirty:
+                return
+            np = get_numpy()
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.path, "wb") as f:
+                    np.savez_compressed(
+                        f,
+                        n_features=np.int64(self.n_features),
+                        document_frequencies=self._document_frequencies,
+                        document_count=np.int64(self._document_count),
+                        documents=np.array(sorted(self._documents), dtype=str),
+                        scanned_files=np.array(json.dumps(self._scanned_files))
+                    )
+                self._dirty = False
+            except OSError as e:
+                print(f"Fehler beim Speichern der Korpusstatistik {self.path}: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hole Umfang und Merkmalsraum der Statistik"""
+        with self._lock:
+            self._load()
+            return {
+                "documents": self._document_count,
+                "n_features": self.n_features,
+                "scanned_files": len(self._scanned_files)
+            }
+
+# Globale Statistikinstanz
+corpus_stats = CorpusStatistics(
+    path=config.test_config.corpus_stats_path,
+    n_features=config.test_config.corpus_hash_features
+)
+atexit.register(corpus_stats.finish_run)
@@ -0,0 +1,81 @@
+"""
+Zeitbudgets pro Test und für den gesamten Lauf
+"""
+import time
+import contextvars
+from contextlib import contextmanager
+from typing import Dict, Any, Optional
+
+# Absoluter Ablaufzeitpunkt (time.monotonic) des Tests im aktuellen Kontext
+_test_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("test_deadline", default=None)
+
+class DeadlineExceeded(TimeoutError):
+    """Das Zeitbudget des Tests oder des Laufs ist abgelaufen"""
+
+class Deadlines:
+    """Verwaltet das Zeitbudget des laufenden Tests und ein optionales Budget für den ganzen Lauf
+
+    Das Testbudget gilt für den Kontext (Thread bzw. asyncio Task), in dem der
+    Test läuft. Transports und Prozesspool lesen die verbleibende Zeit und
+    begrenzen damit Timeouts, Wartezeiten und Wiederholungen. Läuft das
+    Laufbudget ab, starten keine weiteren Tests mehr.
+    """
+
+    def __init__(self):
+        self._run_deadline: Optional[float] = None
+        self.run_duration = 0.0
+
+    def start_run(self, seconds: float) -> None:
+        """Setze das Budget des gesamten Laufs ab jetzt (0 = unbegrenzt)"""
+        self.run_duration = seconds
+        self._run_deadline = time.monotonic() + seconds if seconds > 0 else None
+
+    def current(self) -> Optional[float]:
+        """Frühester gültiger Ablaufzeitpunkt aus Test- und Laufbudget"""
+        deadlines = [deadline for deadline in (_test_deadline.get(), self._run_deadline) if deadline is not None]
+        return min(deadlines) if deadlines else None
+
+    def time_left(self) -> Optional[float]:
+        """Verbleibende Sekunden im aktuellen Kontext (None = unbegrenzt)"""
+        deadline = self.current()
+        return None if deadline is None else deadline - time.monotonic()
+
+    def test_time_left(self) -> Optional[float]:
+        """Verbleibende Sekunden nur des Testbudgets im aktuellen Kontext (None = kein Testbudget)"""
+        deadline = _test_deadline.get()
+        return None if deadline is None else deadline - time.monotonic()
+
+    def expired(self) -> bool:
+        """Prüfe ob das Budget im aktuellen Kontext abgelaufen ist"""
+        time_left = self.time_left()
+        return time_left is not None and time_left <= 0
+
+    def run_expired(self) -> bool:
+        """Prüfe ob das Budget des gesamten Laufs abgelaufen ist"""
+        return self._run_deadline is not None and time.monotonic() >= self._run_deadline
+
+    def check(self) -> None:
+        """Löse DeadlineExceeded aus, wenn das Budget abgelaufen ist"""
+        if self.expired():
+            raise DeadlineExceeded("Zeitbudget abgelaufen")
+
+    @contextmanager
+    def test_budget(self, seconds: float):
+        """Setze das Budget eines Tests für den aktuellen Kontext (0 = nur Laufbudget)"""
+        token = _test_deadline.set(time.monotonic() + seconds if seconds > 0 else None)
+        try:
+            yield
+        finally:
+            _test_deadline.reset(token)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hole das Budget des Laufs und die verbleibende Zeit"""
+        run_time_left = None if self._run_deadline is None else max(0.0, self._run_deadline - time.monotonic())
+        return {
+            "run_duration": self.run_duration,
+            "run_time_left": run_time_left,
+            "run_expired": self.run_expired()
+        }
+
+# Globale Instanz
+deadlines = Deadlines()
@@ -2,16 +2,27 @@
 Bewertungsmaschine für Testergebnisse
 """
 import time
+import math
+import json
+import asyncio
 import threading
-from typing import Dict, Any, List, Optional, Tuple
-from dataclasses import dataclass
-from openai import OpenAI
-import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from typing import Dict, Any, List, Optional, Tuple, Callable
+from dataclasses import dataclass, field, replace
+from functools import partial
 import re
+from collections import Counter
 
-from config import key_manager
+from config import key_manager, config
+from .judge_cache import judge_cache
+from .client_registry import client_registry
+from .reference_index import reference_index, normalize_text, TERM_PATTERN
+from .corpus_stats import corpus_stats
+from .scheduler import pool_for_service
+from .telemetry import telemetry, StreamTimer
+from .worker_pool import cpu_pool
+from .deadlines import deadlines, DeadlineExceeded
+from . import metrics
+from .lazy_imports import get_numpy, get_openai, get_tfidf_vectorizer
 
 @dataclass
 class EvaluationResult:
@@ -23,46 +34,149 @@ class EvaluationResult:
     confidence: Optional[float] = None
     primary_model: str = ""
     secondary_model: str = ""
+    duration: Optional[float] = None  # Dauer der Bewertungsanfrage in Sekunden
+    calls: List[Any] = field(default_factory=list)  # Telemetrie der Anfragen (nur evaluate_many, sonst im Test erfasst)
+    timed_out: bool = False  # Zeitbudget des Tests bzw. Laufs während der Bewertung abgelaufen (nur evaluate_many)
 
-class LLMClient:
-    """LLM Client für Bewertungsanfragen"""
+@dataclass
+class JudgeJob:
+    """Datenklasse für eine ausstehende Bewertungsanfrage"""
+    task: str  # "general_llm", "coding", "audio"
+    arguments: Dict[str, Any]
+    service: str = "evaluation"
+    time_budget: Optional[float] = None  # Verbleibendes Zeitbudget des Tests in Sekunden (None = nur Laufbudget)
+
+@dataclass
+class _JudgePlan:
+    """Vorbereitete Bewertungsanfrage mit Auswertungslogik"""
+    prompt: str
+    finish: Callable[[str], EvaluationResult]
+    fail: Callable[[Exception], EvaluationResult]
+    # Auswertung eines direkt ermittelten Scores (score, confidence, details),
+    # None wenn die Aufgabe keinen numerischen Score liefert
+    finish_score: Optional[Callable[..., EvaluationResult]] = None
+    # Bewertungsauftrag ohne Kandidat und die zu bewertende Antwort (für gebündelte Bewertungen)
+    rubric: Optional[str] = None
+    candidate: Optional[str] = None
+
+class _BaseLLMClient:
+    """Gemeinsame Logik für synchrone und asynchrone LLM Clients"""
+    
+    system_prompt = "Du bist ein hilfreicher Assistent für die Bewertung von Testergebnissen."
+    sampling_params = {"temperature": 0.1, "max_tokens": 1000}
+    
+    # Logprob-Modus: ein einzelnes Score-Token auf einer Skala von 0 bis SCORE_SCALE.
+    # Die Skala bleibt einstellig, da viele Tokenizer mehrstellige Zahlen in
+    # Ziffern zerlegen ("10" als "1" und "0") und das erste Token dann nur "1" wäre.
+    SCORE_SCALE = 9
+    score_instruction = (
+        "Antworte ausschließlich mit einer einzigen Ziffer von 0 bis 9 "
+        "(9 = perfekt), ohne weiteren Text."
+    )
+    
+    # Streaming-Modus: Urteil in der ersten Zeile, Begründung danach
+    verdict_instruction = (
+        "Beginne deine Antwort in der ersten Zeile mit 'Bewertung: <Zahl von 0 bis 1>' "
+        "und begründe die Bewertung erst danach."
+    )
+    VERDICT_PATTERN = re.compile(r'^\W*Bewertung\W*\s*(0?\.\d+|1(?:\.0+)?|0)\b', re.IGNORECASE | re.MULTILINE)
     
     def __init__(self, service: str):
         self.service = service
-        self.client = OpenAI(
-            api_key=key_manager.get_key(service),
-            base_url=key_manager.get_base_url(service),
-            timeout=key_manager.get_timeout(service)
-        )
+        self.base_url = key_manager.get_base_url(service)
         self.model = key_manager.get_model(service)
+        self.score_params = {
+            "temperature": 0.0,
+            "max_tokens": 2,
+            "logprobs": True,
+            "top_logprobs": config.judge_config.logprob_top_k
+        }
+        # Wird deaktiviert, sobald der Endpunkt keine Logprobs liefert
+        self.logprobs_supported = True
     
-    def evaluate_text(self, prompt: str, context: str = "") -> str:
-        """Bewerte Text mit LLM"""
-        try:
-            # Sanitize the prompt and context to prevent encoding issues
-            sanitized_prompt = self._sanitize_text(prompt)
-            sanitized_context = self._sanitize_text(context)
-            
-            messages = [
-                {"role": "system", "content": "Du bist ein hilfreicher Assistent für die Bewertung von Testergebnissen."},
-                {"role": "user", "content": f"{sanitized_prompt}\n\nKontext: {sanitized_context}"}
-            ]
-            
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                temperature=0.1,
-                max_tokens=1000
-            )
-            
-            result = response.choices[0].message.content.strip()
-            return self._sanitize_text(result)
+    def _cache_key(self, messages: List[Dict[str, str]], params: Optional[Dict[str, Any]] = None) -> str:
+        """Erstelle den Schlüssel für den Bewertungscache"""
+        return judge_cache.make_key(self.model, messages, params if params is not None else self.sampling_params)
+    
+    def _build_score_messages(self, prompt: str, context: str = "") -> List[Dict[str, str]]:
+        """Erstelle die Nachrichten für eine Score-Token Anfrage"""
+        return self._build_messages(f"{prompt}\n\n{self.score_instruction}", context)
+    
+    def _build_stream_request(self, prompt: str, context: str = "") -> Tuple[List[Dict[str, str]], str]:
+        """Erstelle Nachrichten und Cache-Schlüssel für eine gestreamte Bewertung"""
+        messages = self._build_messages(f"{prompt}\n\n{self.verdict_instruction}", context)
+        params = dict(self.sampling_params, reasoning_budget=config.judge_config.stream_reasoning_chars)
+        return messages, self._cache_key(messages, params)
+    
+    def _feed_stream_chunk(self, state: Dict[str, Any], chunk) -> bool:
+        """Verarbeite einen Stream-Chunk und gib zurück, ob das Lesen beendet werden kann
         
-        except Exception as e:
-            # Sanitize the error message to prevent encoding issues
-            error_msg = str(e)
-            sanitized_error = self._sanitize_text(error_msg)
-            return f"LLM Bewertung fehlgeschlagen: {sanitized_error}"
+        Sobald die Urteilszeile vollständig ist, wird nur noch bis zum
+        konfigurierten Begründungsbudget (in Zeichen) weitergelesen.
+        """
+        if chunk.choices and chunk.choices[0].delta.content:
+            state["text"] += chunk.choices[0].delta.content
+        
+        text = state["text"]
+        if state["verdict_end"] is None:
+            completed_lines = text[:text.rfind("\n") + 1]
+            match = self.VERDICT_PATTERN.search(completed_lines)
+            if match is None:
+                return False
+            state["verdict_end"] = text.find("\n", match.end())
+        
+        return len(text) - state["verdict_end"] >= config.judge_config.stream_reasoning_chars
+    
+    def _score_from_logprobs(self, choice) -> Optional[Tuple[float, float]]:
+        """Berechne den Erwartungswert über die Verteilung der Score-Token
+        
+        Gibt (score, confidence) zurück, beide im Bereich 0-1. confidence ist die
+        normierte Wahrscheinlichkeit des wahrscheinlichsten Scores. None, wenn der
+        Endpunkt keine Logprobs liefert, kein Score-Token gefunden wurde oder das
+        Modell eine mehrstellige Zahl ausgegeben hat (erstes Token wäre nur eine Ziffer davon).
+        """
+        logprobs = getattr(choice, "logprobs", None)
+        content = getattr(logprobs, "content", None) if logprobs is not None else None
+        if not content:
+            self._disable_logprobs("Endpunkt liefert keine Logprobs")
+            return None
+        
+        first_token = content[0]
+        if len(content) > 1 and first_token.token.strip().isdigit() and content[1].token.strip()[:1].isdigit():
+            return None
+        candidates = first_token.top_logprobs or [first_token]
+        
+        # Wahrscheinlichkeitsmasse pro Score (Token wie " 8" und "8" werden zusammengefasst)
+        distribution: Dict[int, float] = {}
+        for candidate in candidates:
+            token = candidate.token.strip()
+            if token.isdigit() and 0 <= int(token) <= self.SCORE_SCALE:
+                distribution[int(token)] = distribution.get(int(token), 0.0) + math.exp(candidate.logprob)
+        
+        mass = sum(distribution.values())
+        if mass <= 0.0:
+            return None
+        
+        expected_value = sum(value * probability for value, probability in distribution.items()) / mass
+        confidence = max(distribution.values()) / mass
+        return expected_value / self.SCORE_SCALE, confidence
+    
+    def _disable_logprobs(self, reason: str) -> None:
+        """Falle für alle weiteren Bewertungen dieses Clients auf die Textbewertung zurück"""
+        if self.logprobs_supported:
+            print(f"Logprob Bewertung für {self.model} nicht verfügbar ({reason}), verwende Textbewertung")
+        self.logprobs_supported = False
+    
+    def _build_messages(self, prompt: str, context: str = "") -> List[Dict[str, str]]:
+        """Erstelle die Nachrichten für eine Bewertungsanfrage"""
+        # Sanitize the prompt and context to prevent encoding issues
+        sanitized_prompt = self._sanitize_text(prompt)
+        sanitized_context = self._sanitize_text(context)
+        
+        return [
+            {"role": "system", "content": self.system_prompt},
+            {"role": "user", "content": f"{sanitized_prompt}\n\nKontext: {sanitized_context}"}
+        ]
     
     def _sanitize_text(self, text: str) -> str:
         """Sanitize text to prevent encoding issues"""
@@ -77,9 +191,15 @@ class LLMClient:
         # Keep other Unicode characters but ensure they're properly encoded
         return text.strip()
     
-    def evaluate_code_functionality(self, code: str, test_cases: List[Dict]) -> str:
-        """Bewerte Code-Funktionalität"""
-        prompt = f"""
+    def _failure_text(self, error: Exception) -> str:
+        """Formatiere eine fehlgeschlagene Bewertung"""
+        # Sanitize the error message to prevent encoding issues
+        sanitized_error = self._sanitize_text(str(error))
+        return f"LLM Bewertung fehlgeschlagen: {sanitized_error}"
+    
+    def build_code_functionality_prompt(self, code: str, test_cases: List[Dict]) -> str:
+        """Erstelle den Prompt für die Bewertung der Code-Funktionalität"""
+        return f"""
         Bewerte den folgenden Code auf Funktionalität:
         
         Code:
@@ -95,8 +215,310 @@ class LLMClient:
         - "Code funktioniert nicht" wenn der Code Fehler hat
         - Erkläre kurz warum
         """
+
+class LLMClient(_BaseLLMClient):
+    """LLM Client für Bewertungsanfragen"""
+    
+    def __init__(self, service: str):
+        super().__init__(service)
+        self.client = client_registry.get_client_for(service, owner="evaluator")
+    
+    def request_text(self, prompt: str, context: str = "") -> str:
+        """Bewerte Text mit LLM und löse bei einer fehlgeschlagenen Anfrage eine Exception aus"""
+        messages = self._build_messages(prompt, context)
+        cache_key = self._cache_key(messages)
+        cached = judge_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        response = telemetry.chat(
+            self.client, "judge",
+            model=self.model,
+            messages=messages,
+            **self.sampling_params
+        )
+        
+        result = self._sanitize_text(response.choices[0].message.content.strip())
+        judge_cache.put(cache_key, result)
+        return result
+    
+    def evaluate_text(self, prompt: str, context: str = "") -> str:
+        """Bewerte Text mit LLM"""
+        try:
+            return self.request_text(prompt, context)
+        except Exception as e:
+            return self._failure_text(e)
+    
+    def evaluate_text_streaming(self, prompt: str, context: str = "") -> str:
+        """Bewerte Text mit LLM und beende den Stream, sobald das Urteil vorliegt"""
+        try:
+            messages, cache_key = self._build_stream_request(prompt, context)
+            cached = judge_cache.get(cache_key)
+            if cached is not None:
+                return cached
+            
+            if telemetry.stream_supported(self.client):
+                timer = StreamTimer("judge", self.model)
+                try:
+                    stream = self.client.chat.completions.create(
+                        model=self.model,
+                        messages=messages,
+                        stream=True,
+                        stream_options={"include_usage": True},
+                        **self.sampling_params
+                    )
+                except Exception as e:
+                    if not telemetry.disable_stream(self.client, e):
+                        timer.finish(e)
+                        raise
+                else:
+                    state = {"text": "", "verdict_end": None}
+                    try:
+                        with stream:
+                            for chunk in stream:
+                                timer.feed(chunk)
+                                if self._feed_stream_chunk(state, chunk):
+                                    break
+                    except Exception as e:
+                        timer.finish(e)
+                        raise
+                    timer.finish()
+                    
+                    result = self._sanitize_text(state["text"].strip())
+                    judge_cache.put(cache_key, result)
+                    return result
+            
+            # Endpunkt ohne Streaming: vollständige Antwort mit derselben Urteilszeile
+            response = telemetry.chat(
+                self.client, "judge",
+                streamable=False,
+                model=self.model,
+                messages=messages,
+                **self.sampling_params
+            )
+            result = self._sanitize_text(response.choices[0].message.content.strip())
+            judge_cache.put(cache_key, result)
+            return result
+        
+        except Exception as e:
+            return self._failure_text(e)
+    
+    def evaluate_score(self, prompt: str, context: str = "") -> Optional[Tuple[float, float]]:
+        """Bewerte mit einem einzelnen Score-Token und Logprobs
+        
+        Gibt None zurück, wenn keine Logprobs verfügbar sind; der Aufrufer fällt
+        dann auf evaluate_text zurück.
+        """
+        if not self.logprobs_supported:
+            return None
+        
+        try:
+            messages = self._build_score_messages(prompt, context)
+            cache_key = self._cache_key(messages, self.score_params)
+            cached = judge_cache.get(cache_key)
+            if cached is not None:
+                return tuple(json.loads(cached))
+            
+            response = telemetry.chat(
+                self.client, "judge", streamable=False,
+                model=self.model,
+                messages=messages,
+                **self.score_params
+            )
+            
+            scored = self._score_from_logprobs(response.choices[0])
+            if scored is not None:
+                judge_cache.put(cache_key, json.dumps(scored))
+            return scored
+        
+        except Exception as e:
+            if isinstance(e, get_openai().BadRequestError):
+                self._disable_logprobs(self._sanitize_text(str(e)))
+                return None
+            print(f"Logprob Bewertung fehlgeschlagen, verwende Textbewertung: {self._sanitize_text(str(e))}")
+            return None
+    
+    def evaluate_code_functionality(self, code: str, test_cases: List[Dict]) -> str:
+        """Bewerte Code-Funktionalität"""
+        return self.evaluate_text(self.build_code_functionality_prompt(code, test_cases))
+
+class AsyncLLMClient(_BaseLLMClient):
+    """Asynchroner LLM Client für parallele Bewertungsanfragen"""
+    
+    def __init__(self, service: str):
+        super().__init__(service)
+        # Wiederholungen und Circuit Breaker übernimmt der Transport, nicht das SDK
+        self.client = get_openai().AsyncOpenAI(
+            api_key=key_manager.get_key(service),
+            base_url=self.base_url,
+            timeout=key_manager.get_timeout(service),
+            max_retries=0,
+            http_client=client_registry.create_async_http_client(
+                self.base_url, key_manager.get_max_retries(service), pool=pool_for_service(service)
+            )
+        )
+    
+    async def request_text(self, prompt: str, context: str = "") -> str:
+        """Bewerte Text mit LLM und löse bei einer fehlgeschlagenen Anfrage eine Exception aus (asynchron)"""
+        messages = self._build_messages(prompt, context)
+        cache_key = self._cache_key(messages)
+        cached = judge_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        response = await telemetry.achat(
+            self.client, "judge",
+            model=self.model,
+            messages=messages,
+            **self.sampling_params
+        )
+        
+        result = self._sanitize_text(response.choices[0].message.content.strip())
+        judge_cache.put(cache_key, result)
+        return result
+    
+    async def evaluate_text(self, prompt: str, context: str = "") -> str:
+        """Bewerte Text mit LLM (asynchron)"""
+        try:
+            return await self.request_text(prompt, context)
+        except Exception as e:
+            return self._failure_text(e)
+    
+    async def evaluate_text_streaming(self, prompt: str, context: str = "") -> str:
+        """Bewerte Text mit LLM und beende den Stream, sobald das Urteil vorliegt (asynchron)"""
+        try:
+            messages, cache_key = self._build_stream_request(prompt, context)
+            cached = judge_cache.get(cache_key)
+            if cached is not None:
+                return cached
+            
+            if telemetry.stream_supported(self.client):
+                timer = StreamTimer("judge", self.model)
+                try:
+                    stream = await self.client.chat.completions.create(
+                        model=self.model,
+                        messages=messages,
+                        stream=True,
+                        stream_options={"include_usage": True},
+                        **self.sampling_params
+                    )
+                except Exception as e:
+                    if not telemetry.disable_stream(self.client, e):
+                        timer.finish(e)
+                        raise
+                else:
+                    state = {"text": "", "verdict_end": None}
+                    try:
+                        async with stream:
+                            async for chunk in stream:
+                                timer.feed(chunk)
+                                if self._feed_stream_chunk(state, chunk):
+                                    break
+                    except Exception as e:
+                        timer.finish(e)
+                        raise
+                    timer.finish()
+                    
+                    result = self._sanitize_text(state["text"].strip())
+                    judge_cache.put(cache_key, result)
+                    return result
+            
+            # Endpunkt ohne Streaming: vollständige Antwort mit derselben Urteilszeile
+            response = await telemetry.achat(
+                self.client, "judge",
+                streamable=False,
+                model=self.model,
+                messages=messages,
+                **self.sampling_params
+            )
+            result = self._sanitize_text(response.choices[0].message.content.strip())
+            judge_cache.put(cache_key, result)
+            return result
+        
+        except Exception as e:
+            return self._failure_text(e)
+    
+    async def evaluate_score(self, prompt: str, context: str = "") -> Optional[Tuple[float, float]]:
+        """Bewerte mit einem einzelnen Score-Token und Logprobs (asynchron)"""
+        if not self.logprobs_supported:
+            return None
         
-        return self.evaluate_text(prompt)
+        try:
+            messages = self._build_score_messages(prompt, context)
+            cache_key = self._cache_key(messages, self.score_params)
+            cached = judge_cache.get(cache_key)
+            if cached is not None:
+                return tuple(json.loads(cached))
+            
+            response = await telemetry.achat(
+                self.client, "judge", streamable=False,
+                model=self.model,
+                messages=messages,
+                **self.score_params
+            )
+            
+            scored = self._score_from_logprobs(response.choices[0])
+            if scored is not None:
+                judge_cache.put(cache_key, json.dumps(scored))
+            return scored
+        
+        except Exception as e:
+            if isinstance(e, get_openai().BadRequestError):
+                self._disable_logprobs(self._sanitize_text(str(e)))
+                return None
+            print(f"Logprob Bewertung fehlgeschlagen, verwende Textbewertung: {self._sanitize_text(str(e))}")
+            return None
+    
+    async def close(self) -> None:
+        """Schließe die Verbindungen des Clients"""
+        await self.client.close()
+
+def evaluate_code_execution(code: str, test_cases: List[Dict]) -> Tuple[float, str]:
+    """Führe Code aus und bewerte das Ergebnis (läuft bei CPU_WORKERS > 0 in einem Worker-Prozess)"""
+    try:
+        # Sichere Codeausführung in einem separaten Namespace
+        namespace = {}
+        exec(code, namespace)
+
+        # Suche nach der Hauptfunktion
+        function_name = None
+        for name in namespace:
+            if callable(namespace[name]) and not name.startswith('_'):
+                function_name = name
+                break
+
+        if not function_name:
+            return 0.0, "Keine ausführbare Funktion gefunden"
+
+        # Führe Testfälle aus
+        passed_tests = 0
+        total_tests = len(test_cases)
+        details = []
+
+        for test_case in test_cases:
+            try:
+                if 'input' in test_case:
+                    result = namespace[function_name](**test_case['input'])
+                else:
+                    result = namespace[function_name]()
+
+                expected = test_case.get('expected')
+                if expected == result:
+                    passed_tests += 1
+                    details.append(f"Test bestanden: {test_case}")
+                else:
+                    details.append(f"Test fehlgeschlagen: Erwartet {expected}, erhalten {result}")
+
+            except Exception as e:
+                details.append(f"Test fehlgeschlagen mit Fehler: {str(e)}")
+
+        score = passed_tests / total_tests if total_tests > 0 else 0.0
+        details_str = "\n".join(details)
+
+        return score, details_str
+
+    except Exception as e:
+        return 0.0, f"Codeausführung fehlgeschlagen: {str(e)}"
 
 class TextComparator:
     """Vergleichswerkzeuge für Texte"""
@@ -104,49 +526,125 @@ class TextComparator:
     @staticmethod
     def calculate_cosine_similarity(text1: str, text2: str) -> float:
         """Berechne Cosine Ähnlichkeit zwischen zwei Texten"""
+        return TextComparator.calculate_cosine_similarity_batch([(text1, text2)])[0]
+    
+    @staticmethod
+    def calculate_cosine_similarity_batch(pairs: List[Tuple[str, str]]) -> List[float]:
+        """Berechne Cosine Ähnlichkeiten für viele Textpaare auf einmal
+        
+        Der TF-IDF Vectorizer wird einmal über alle Texte angepasst. Die Zeilen
+        bleiben als dünn besetzte CSR-Matrix erhalten und sind L2-normiert, sodass
+        die Cosine Ähnlichkeit das zeilenweise Skalarprodukt ist.
+        """
+        similarities = [0.0] * len(pairs)
+        
         try:
             # Vorverarbeitung
-            text1 = re.sub(r'\s+', ' ', text1.lower().strip())
-            text2 = re.sub(r'\s+', ' ', text2.lower().strip())
+            left_texts, right_texts, indices = [], [], []
+            for index, (text1, text2) in enumerate(pairs):
+                text1 = re.sub(r'\s+', ' ', text1.lower().strip())
+                text2 = re.sub(r'\s+', ' ', text2.lower().strip())
+                if text1 and text2:
+                    left_texts.append(text1)
+                    right_texts.append(text2)
+                    indices.append(index)
             
-            if not text1 or not text2:
-                return 0.0
+            if not indices:
+                return similarities
             
             # TF-IDF Vektoren erstellen
-            vectorizer = TfidfVectorizer().fit_transform([text1, text2])
-            vectors = vectorizer.toarray()
+            matrix = get_tfidf_vectorizer()().fit_transform(left_texts + right_texts).tocsr()
+            left = matrix[:len(indices)]
+            right = matrix[len(indices):]
             
-            # Cosine Ähnlichkeit berechnen
-            similarity = cosine_similarity([vectors[0]], [vectors[1]])[0][0]
-            return float(similarity)
+            # Cosine Ähnlichkeit als zeilenweises Skalarprodukt
+            row_similarities = get_numpy().asarray(left.multiply(right).sum(axis=1)).ravel()
+            for index, similarity in zip(indices, row_similarities):
+                similarities[index] = float(similarity)
+            return similarities
         
         except Exception as e:
             print(f"Fehler bei der Ähnlichkeitsberechnung: {e}")
-            return 0.0
+            return [0.0] * len(pairs)
     
     @staticmethod
-    def calculate_bleu_score(reference: str, candidate: str) -> float:
-        """Berechne BLEU Score für Übersetzungen"""
+    def calculate_reference_similarity(candidate: str, reference: str) -> float:
+        """Berechne die Cosine Ähnlichkeit einer Antwort zu einem indizierten Referenztext
+        
+        Liefert dasselbe Ergebnis wie calculate_cosine_similarity, verarbeitet aber
+        nur die Antwort. Bei zwei Dokumenten hat ein gemeinsamer Term die IDF 1,
+        ein Term aus nur einem Dokument die IDF ln(3/2) + 1. Die Norm der Referenz
+        lässt sich daher aus ihrer vorberechneten Quadratsumme und den gemeinsamen
+        Termen bestimmen.
+        """
         try:
-            from nltk.translate.bleu_score import sentence_bleu, SmoothingFunction
-            from nltk.tokenize import word_tokenize
-            
-            # Tokenisierung
-            reference_tokens = word_tokenize(reference.lower())
-            candidate_tokens = word_tokenize(candidate.lower())
+            candidate = normalize_text(candidate)
+            if not candidate or not reference.strip():
+                return 0.0
             
-            if not candidate_tokens:
+            entry = reference_index.get(reference)
+            candidate_terms = Counter(TERM_PATTERN.findall(candidate))
+            if not candidate_terms or not entry.terms:
                 return 0.0
             
-            # BLEU Score berechnen
-            smoothing_function = SmoothingFunction().method1
-            bleu_score = sentence_bleu(
-                [reference_tokens], 
-                candidate_tokens, 
-                smoothing_function=smoothing_function
-            )
+            unique_weight = (math.log(1.5) + 1.0) ** 2
+            dot_product = 0.0
+            shared_reference_squares = 0.0
+            candidate_norm = 0.0
+            for term, count in candidate_terms.items():
+                reference_count = entry.terms.get(term)
+                if reference_count is None:
+                    candidate_norm += unique_weight * count * count
+                else:
+                    candidate_norm += count * count
+                    dot_product += count * reference_count
+                    shared_reference_squares += reference_count * reference_count
+            
+            reference_norm = (unique_weight * (entry.term_square_sum - shared_reference_squares)
+                              + shared_reference_squares)
+            return float(dot_product / math.sqrt(candidate_norm * reference_norm))
+        
+        except Exception as e:
+            print(f"Fehler bei der Ähnlichkeitsberechnung: {e}")
+            return 0.0
+    
+    @staticmethod
+    def calculate_corpus_similarity(candidate: str, reference: str) -> float:
+        """Berechne die Cosine Ähnlichkeit mit korpusweiter IDF
+        
+        Die Dokumenthäufigkeiten stammen aus allen Referenzen und den gespeicherten
+        Ergebnissen unter RESULTS_DIR, eingefroren auf den Stand vor dem Lauf.
+        Beide Texte werden in einem Durchlauf in den Hashing-Merkmalsraum
+        abgebildet, ein Anpassen pro Aufruf entfällt.
+        """
+        try:
+            if not candidate.strip() or not reference.strip():
+                return 0.0
             
-            return float(bleu_score)
+            corpus_stats.freeze(config.test_config.results_dir)
+            entry = reference_index.get(reference)
+            # Wirkt erst im nächsten Lauf, die Scores dieses Laufs nutzen den eingefrorenen Stand
+            corpus_stats.add_document(reference, entry.content_hash)
+            return corpus_stats.similarity(candidate, reference)
+        
+        except Exception as e:
+            print(f"Fehler bei der Ähnlichkeitsberechnung: {e}")
+            return 0.0
+    
+    @staticmethod
+    def calculate_text_similarity(candidate: str, reference: str) -> float:
+        """Berechne die primäre Ähnlichkeit je nach SIMILARITY_IDF (corpus oder pair)"""
+        if config.test_config.similarity_idf == "pair":
+            return cpu_pool.run(TextComparator.calculate_reference_similarity, candidate, reference)
+        # Die korpusweite Statistik wird für den nächsten Lauf erweitert und bleibt daher im Koordinator
+        return TextComparator.calculate_corpus_similarity(candidate, reference)
+    
+    @staticmethod
+    def calculate_bleu_score(reference: str, candidate: str) -> float:
+        """Berechne BLEU Score für Übersetzungen"""
+        try:
+            entry = reference_index.get(reference)
+            return metrics.bleu(entry.tokens, metrics.tokenize(candidate), entry.ngram_counts)
         
         except Exception as e:
             print(f"Fehler bei der BLEU Score Berechnung: {e}")
@@ -156,17 +654,23 @@ class TextComparator:
     def calculate_rouge_score(reference: str, candidate: str) -> float:
         """Berechne ROUGE Score für Zusammenfassungen"""
         try:
-            from rouge_score import rouge_scorer
-            
-            scorer = rouge_scorer.RougeScorer(['rougeL'], use_stemmer=True)
-            scores = scorer.score(candidate, reference)
-            
-            # ROUGE-L Score verwenden
-            return float(scores['rougeL'].fmeasure)
+            # ROUGE-L F-Maß mit Stemming
+            entry = reference_index.get(reference)
+            return metrics.rouge_l(entry.rouge_tokens, metrics.rouge_tokenize(candidate))
         
         except Exception as e:
             print(f"Fehler bei der ROUGE Score Berechnung: {e}")
             return 0.0
+    
+    @staticmethod
+    def calculate_bleu_score_batch(pairs: List[Tuple[str, str]]) -> List[float]:
+        """Berechne BLEU Scores für viele (Referenz, Antwort) Paare"""
+        return [TextComparator.calculate_bleu_score(reference, candidate) for reference, candidate in pairs]
+    
+    @staticmethod
+    def calculate_rouge_score_batch(pairs: List[Tuple[str, str]]) -> List[float]:
+        """Berechne ROUGE Scores für viele (Referenz, Antwort) Paare"""
+        return [TextComparator.calculate_rouge_score(reference, candidate) for reference, candidate in pairs]
 
 class TestEvaluator:
     """Hauptbewertungsklasse für Tests"""
@@ -183,15 +687,279 @@ class TestEvaluator:
                 self._llm_clients[service] = LLMClient(service)
             return self._llm_clients[service]
     
+    def _run_plan(self, plan: _JudgePlan, service: str = "evaluation") -> EvaluationResult:
+        """Führe eine vorbereitete Bewertung synchron aus"""
+        secondary_client = self._get_llm_client(service)
+        start_time = time.time()
+        
+        try:
+            mode = self._judge_mode(plan)
+            scored = secondary_client.evaluate_score(plan.prompt) if mode == "logprob" else None
+            if scored is not None:
+                evaluation = plan.finish_score(*scored)
+            elif mode == "stream":
+                evaluation = plan.finish(secondary_client.evaluate_text_streaming(plan.prompt))
+            else:
+                evaluation = plan.finish(secondary_client.evaluate_text(plan.prompt))
+        except Exception as e:
+            evaluation = plan.fail(e)
+        
+        evaluation.duration = time.time() - start_time
+        return evaluation
+    
+    @staticmethod
+    def _judge_mode(plan: _JudgePlan) -> str:
+        """Bestimme den Bewertungsmodus; Aufgaben ohne numerischen Score nutzen immer Freitext"""
+        if plan.finish_score is None:
+            return "text"
+        return config.judge_config.mode
+    
     def evaluate_general_llm(self, test_name: str, generated_text: str, 
                            expected_text: str, evaluation_prompt: str) -> EvaluationResult:
         """Bewerte allgemeine LLM Tests"""
+        return self._run_plan(self._plan_general_llm(test_name, generated_text, expected_text, evaluation_prompt))
+    
+    def evaluate_coding_task(self, test_name: str, code: str, test_cases: List[Dict]) -> EvaluationResult:
+        """Bewerte Coding Aufgaben"""
+        return self._run_plan(self._plan_coding_task(test_name, code, test_cases))
+    
+    def evaluate_audio_task(self, test_name: str, generated_text: str,
+                          expected_text: str, task_type: str) -> EvaluationResult:
+        """Bewerte Audio Aufgaben (Transkription, Übersetzung, Zusammenfassung)"""
+        return self._run_plan(self._plan_audio_task(test_name, generated_text, expected_text, task_type))
+    
+    def evaluate_many(self, jobs: List[JudgeJob]) -> List[EvaluationResult]:
+        """Bewerte mehrere Aufgaben gleichzeitig mit begrenzter Parallelität pro Endpunkt
+        
+        Die Ergebnisse werden in der Reihenfolge der übergebenen Aufträge zurückgegeben.
+        Jeder Auftrag läuft mit seinem time_budget; läuft es ab, wird die Bewertung
+        abgebrochen und das Ergebnis mit timed_out markiert.
+        """
+        if not jobs:
+            return []
+        return asyncio.run(self._evaluate_many_async(jobs))
+    
+    async def _evaluate_many_async(self, jobs: List[JudgeJob]) -> List[EvaluationResult]:
+        """Asynchrone Ausführung von evaluate_many"""
+        planners = {
+            "general_llm": self._plan_general_llm,
+            "coding": self._plan_coding_task,
+            "audio": self._plan_audio_task
+        }
+        
+        # Ein Client und ein Semaphor pro Endpunkt
+        clients: Dict[str, AsyncLLMClient] = {}
+        semaphores: Dict[str, asyncio.Semaphore] = {}
+        max_concurrency = config.judge_config.max_concurrency
+        if config.network_config.adaptive_concurrency:
+            # Das adaptive Fenster im Transport begrenzt, der Semaphor nur bis zu dessen Obergrenze
+            max_concurrency = max(max_concurrency, config.network_config.adaptive_max_concurrency)
+        for job in jobs:
+            if job.service not in clients:
+                clients[job.service] = AsyncLLMClient(job.service)
+            base_url = clients[job.service].base_url
+            if base_url not in semaphores:
+                semaphores[base_url] = asyncio.Semaphore(max(1, max_concurrency))
+        
+        if cpu_pool.enabled:
+            # Rechenintensive Schritte der Planung laufen im Prozesspool, die Threads warten nur darauf
+            loop = asyncio.get_running_loop()
+            plans = await asyncio.gather(*(
+                loop.run_in_executor(None, partial(planners[job.task], **job.arguments)) for job in jobs
+            ))
+        else:
+            plans = [planners[job.task](**job.arguments) for job in jobs]
+        results: List[Optional[EvaluationResult]] = [None] * len(jobs)
+        budgets = [job.time_budget for job in jobs]
+        
+        async def judge(client: AsyncLLMClient, plan: _JudgePlan) -> EvaluationResult:
+            mode = self._judge_mode(plan)
+            scored = await client.evaluate_score(plan.prompt) if mode == "logprob" else None
+            if scored is not None:
+                return plan.finish_score(*scored)
+            if mode == "stream":
+                return plan.finish(await client.evaluate_text_streaming(plan.prompt))
+            return plan.finish(await client.evaluate_text(plan.prompt))
+        
+        def timed_out_result(index: int) -> EvaluationResult:
+            evaluation = plans[index].fail(DeadlineExceeded("Zeitbudget während der Bewertung abgelaufen"))
+            evaluation.timed_out = True
+            return evaluation
+        
+        def charge_budgets(indices: List[int], duration: float, calls: List[Any]) -> List[int]:
+            """Ziehe die Dauer einer gemeinsamen Anfrage von den Budgets ab und gib die Aufträge mit Restbudget zurück"""
+            remaining = []
+            for index in indices:
+                if budgets[index] is not None:
+                    budgets[index] -= duration
+                if deadlines.run_expired() or (budgets[index] is not None and budgets[index] <= 0):
+                    results[index] = timed_out_result(index)
+                    results[index].duration = duration / len(indices)
+                    results[index].calls = [replace(call, shared=len(indices)) for call in calls]
+                else:
+                    remaining.append(index)
+            return remaining
+        
+        async def run_job(index: int) -> None:
+            client = clients[jobs[index].service]
+            plan = plans[index]
+            
+            async with semaphores[client.base_url]:
+                start_time = time.time()
+                # Jede Aufgabe hat ihren eigenen Kontext, die Messwerte und das Zeitbudget gehören zu diesem Auftrag
+                with telemetry.collect() as calls, deadlines.test_budget(budgets[index] or 0):
+                    try:
+                        # Die Transports kürzen Timeouts auf das Budget, wait_for bricht auch Wartezeiten ab
+                        evaluation = await asyncio.wait_for(judge(client, plan), deadlines.time_left())
+                    except Exception as e:
+                        evaluation = plan.fail(e)
+                    if deadlines.expired():
+                        evaluation = timed_out_result(index)
+                evaluation.duration = time.time() - start_time
+                evaluation.calls = calls
+                results[index] = evaluation
+        
+        async def run_batch(indices: List[int]) -> None:
+            if len(indices) == 1:
+                await run_job(indices[0])
+                return
+            
+            client = clients[jobs[indices[0]].service]
+            candidate_ids = [str(number) for number in range(1, len(indices) + 1)]
+            prompt = self._build_batch_prompt(
+                plans[indices[0]].rubric,
+                [plans[index].candidate for index in indices],
+                candidate_ids
+            )
+            
+            # Die gemeinsame Anfrage läuft mit dem knappsten Budget des Batches
+            batch_budget = min((budgets[index] for index in indices if budgets[index] is not None), default=0)
+            async with semaphores[client.base_url]:
+                start_time = time.time()
+                with telemetry.collect() as calls, deadlines.test_budget(batch_budget):
+                    error = None
+                    try:
+                        text = await asyncio.wait_for(client.request_text(prompt), deadlines.time_left())
+                    except Exception as e:
+                        error = e
+                    timed_out = deadlines.expired()
+                    verdicts = None if timed_out or error else self._parse_batch_verdicts(text, candidate_ids)
+                duration = time.time() - start_time
+            
+            if timed_out:
+                # Aufträge mit verbleibendem Budget werden einzeln bewertet, die übrigen sind abgelaufen
+                retry = charge_budgets(indices, duration, calls)
+                await asyncio.gather(*(run_job(index) for index in retry))
+                return
+            
+            if error is not None:
+                # Fehlgeschlagene Anfrage (Transportfehler, offener Circuit Breaker): nicht halbieren
+                for index in indices:
+                    results[index] = plans[index].fail(error)
+                    results[index].duration = duration / len(indices)
+                    results[index].calls = [replace(call, shared=len(indices)) for call in calls]
+                return
+            
+            if verdicts is None:
+                # Nicht auswertbare Antwort: Batch halbieren und mit dem Restbudget erneut bewerten
+                retry = charge_budgets(indices, duration, calls)
+                middle = len(retry) // 2
+                await asyncio.gather(*(run_batch(half) for half in (retry[:middle], retry[middle:]) if half))
+                return
+            
+            for index, candidate_id in zip(indices, candidate_ids):
+                score, reason = verdicts[candidate_id]
+                try:
+                    evaluation = plans[index].finish_score(score, None, reason)
+                except Exception as e:
+                    evaluation = plans[index].fail(e)
+                # Die Dauer der gemeinsamen Anfrage wird auf die Kandidaten verteilt
+                evaluation.duration = duration / len(indices)
+                evaluation.calls = [replace(call, shared=len(indices)) for call in calls]
+                results[index] = evaluation
+        
+        try:
+            await asyncio.gather(*(run_batch(group) for group in self._group_for_batching(jobs, plans)))
+            return results
+        finally:
+            for client in clients.values():
+                await client.close()
+    
+    def _group_for_batching(self, jobs: List[JudgeJob], plans: List[_JudgePlan]) -> List[List[int]]:
+        """Fasse Aufträge mit gleichem Bewertungsauftrag zu Gruppen von höchstens batch_size zusammen"""
+        batch_size = config.judge_config.batch_size
+        groups: Dict[Tuple[str, str], List[int]] = {}
+        singles: List[List[int]] = []
+        
+        for index, (job, plan) in enumerate(zip(jobs, plans)):
+            if batch_size > 1 and plan.rubric is not None and plan.finish_score is not None:
+                groups.setdefault((job.service, plan.rubric), []).append(index)
+            else:
+                singles.append([index])
+        
+        batches = []
+        for indices in groups.values():
+            for start in range(0, len(indices), batch_size):
+                batches.append(indices[start:start + batch_size])
+        return batches + singles
+    
+    def _build_batch_prompt(self, rubric: str, candidates: List[str], candidate_ids: List[str]) -> str:
+        """Erstelle den Prompt für die gemeinsame Bewertung mehrerer Kandidaten"""
+        sections = "\n\n".join(
+            f"### Kandidat {candidate_id}\n{candidate}"
+            for candidate_id, candidate in zip(candidate_ids, candidates)
+        )
+        return f"""{rubric}
+
+Bewerte jede der folgenden {len(candidates)} Antworten unabhängig voneinander mit einer Zahl von 0-1, wobei 1 perfekt ist.
+
+{sections}
+
+Antworte ausschließlich mit einem JSON-Array der Form
+[{{"id": "<Kandidat>", "score": <Zahl von 0 bis 1>, "begruendung": "<kurze Begründung>"}}]
+mit genau einem Eintrag pro Kandidat."""
+    
+    def _parse_batch_verdicts(self, text: str, candidate_ids: List[str]) -> Optional[Dict[str, Tuple[float, str]]]:
+        """Werte die strukturierte Antwort einer gebündelten Bewertung aus
+        
+        Gibt None zurück, wenn die Antwort kein gültiges JSON ist oder nicht
+        für jeden Kandidaten einen Score enthält.
+        """
+        start, end = text.find("["), text.rfind("]")
+        if start < 0 or end <= start:
+            return None
+        
+        try:
+            entries = json.loads(text[start:end + 1])
+            verdicts = {}
+            for entry in entries:
+                score = max(0.0, min(1.0, float(entry["score"])))
+                verdicts[str(entry["id"]).strip()] = (score, str(entry.get("begruendung", "")))
+        except (ValueError, TypeError, KeyError, AttributeError):
+            return None
+        
+        if not all(candidate_id in verdicts for candidate_id in candidate_ids):
+            return None
+        return verdicts
+    
+    def _plan_general_llm(self, test_name: str, generated_text: str,
+                          expected_text: str, evaluation_prompt: str) -> _JudgePlan:
+        """Bereite die Bewertung eines allgemeinen LLM Tests vor"""
         # Primäre Bewertung durch Ähnlichkeitsmetriken
-        primary_score = self.text_comparator.calculate_cosine_similarity(generated_text, expected_text)
+        primary_score = self.text_comparator.calculate_text_similarity(generated_text, expected_text)
         
-        # Sekundäre Bewertung durch anderes LLM
-        secondary_client = self._get_llm_client("evaluation")
+        # Bewertungsauftrag ohne Kandidat für gebündelte Bewertungen
+        rubric = f"""
+        Bitte bewerte Antworten auf Basis des erwarteten Ergebnisses:
         
+        Erwartetes Ergebnis:
+        {expected_text}
+        
+        Bewertungsauftrag:
+        {evaluation_prompt}
+        """
+        
+        # Sekundäre Bewertung durch anderes LLM
         evaluation_prompt = f"""
         Bitte bewerte die folgende Antwort auf Basis des erwarteten Ergebnisses:
         
@@ -207,9 +975,18 @@ class TestEvaluator:
         Bitte gib eine Bewertung von 0-1 ab, wobei 1 perfekt ist.
         """
         
-        try:
-            evaluation_result = secondary_client.evaluate_text(evaluation_prompt)
-            
+        def build(secondary_score: float, details: str, confidence: Optional[float] = None) -> EvaluationResult:
+            return EvaluationResult(
+                test_name=test_name,
+                primary_score=primary_score,
+                secondary_score=secondary_score,
+                evaluation_details=details,
+                confidence=confidence,
+                primary_model="text_similarity",
+                secondary_model=key_manager.get_model("evaluation")
+            )
+        
+        def finish(evaluation_result: str) -> EvaluationResult:
             # DEBUG: Log full evaluation result
             print(f"DEBUG: Full evaluation result for {test_name}: {repr(evaluation_result)}")
             
@@ -218,34 +995,32 @@ class TestEvaluator:
             
             print(f"DEBUG: Extracted secondary score: {secondary_score}")
             
-            return EvaluationResult(
-                test_name=test_name,
-                primary_score=primary_score,
-                secondary_score=secondary_score,
-                evaluation_details=evaluation_result,
-                primary_model="text_similarity",
-                secondary_model=key_manager.get_model("evaluation")
-            )
+            return build(secondary_score, evaluation_result)
         
-        except Exception as e:
+        def finish_score(secondary_score: float, confidence: Optional[float] = None,
+                         details: Optional[str] = None) -> EvaluationResult:
+            return build(secondary_score, details or self._format_score_details(secondary_score, confidence), confidence)
+        
+        def fail(e: Exception) -> EvaluationResult:
             return EvaluationResult(
                 test_name=test_name,
                 primary_score=primary_score,
                 evaluation_details=f"Sekundäre Bewertung fehlgeschlagen: {str(e)}",
                 primary_model="text_similarity"
             )
+        
+        return _JudgePlan(prompt=evaluation_prompt, finish=finish, fail=fail, finish_score=finish_score,
+                          rubric=rubric, candidate=generated_text)
     
-    def evaluate_coding_task(self, test_name: str, code: str, test_cases: List[Dict]) -> EvaluationResult:
-        """Bewerte Coding Aufgaben"""
+    def _plan_coding_task(self, test_name: str, code: str, test_cases: List[Dict]) -> _JudgePlan:
+        """Bereite die Bewertung einer Coding Aufgabe vor"""
         # Primäre Bewertung durch Code-Ausführung und Analyse
         primary_score, evaluation_details = self._evaluate_code_execution(code, test_cases)
         
         # Sekundäre Bewertung durch LLM
-        secondary_client = self._get_llm_client("evaluation")
+        prompt = self._get_llm_client("evaluation").build_code_functionality_prompt(code, test_cases)
         
-        try:
-            llm_evaluation = secondary_client.evaluate_code_functionality(code, test_cases)
-            
+        def finish(llm_evaluation: str) -> EvaluationResult:
             # Extrahiere Score aus der Bewertung
             secondary_score = 1.0 if "Code funktioniert" in llm_evaluation else 0.0
             
@@ -258,31 +1033,31 @@ class TestEvaluator:
                 secondary_model=key_manager.get_model("evaluation")
             )
         
-        except Exception as e:
+        def fail(e: Exception) -> EvaluationResult:
             return EvaluationResult(
                 test_name=test_name,
                 primary_score=primary_score,
                 evaluation_details=f"LLM Bewertung fehlgeschlagen: {str(e)}\n\nDetails: {evaluation_details}",
                 primary_model="code_execution"
             )
+        
+        return _JudgePlan(prompt=prompt, finish=finish, fail=fail)
     
-    def evaluate_audio_task(self, test_name: str, generated_text: str,
-                          expected_text: str, task_type: str) -> EvaluationResult:
-        """Bewerte Audio Aufgaben (Transkription, Übersetzung, Zusammenfassung)"""
+    def _plan_audio_task(self, test_name: str, generated_text: str,
+                         expected_text: str, task_type: str) -> _JudgePlan:
+        """Bereite die Bewertung einer Audio Aufgabe vor"""
         # Wähle die passende Metrik basierend auf dem Aufgabentyp
         if task_type == "transcription":
-            primary_score = self.text_comparator.calculate_cosine_similarity(generated_text, expected_text)
+            primary_score = self.text_comparator.calculate_text_similarity(generated_text, expected_text)
         elif task_type == "translation":
-            primary_score = self.text_comparator.calculate_bleu_score(expected_text, generated_text)
+            primary_score = cpu_pool.run(TextComparator.calculate_bleu_score, expected_text, generated_text)
         elif task_type == "summarization":
             # For summarization, use the evaluation model score as primary since ROUGE scores are typically low
             primary_score = None  # Will be set by evaluation model
         else:
-            primary_score = self.text_comparator.calculate_cosine_similarity(generated_text, expected_text)
+            primary_score = self.text_comparator.calculate_text_similarity(generated_text, expected_text)
         
         # Sekundäre Bewertung durch LLM
-        secondary_client = self._get_llm_client("evaluation")
-        
         evaluation_prompt = f"""
         Bitte bewerte die folgende {task_type} auf Qualität und Genauigkeit:
         
@@ -295,85 +1070,60 @@ class TestEvaluator:
         Bitte gib eine Bewertung von 0-1 ab, wobei 1 perfekt ist.
         """
         
-        try:
-            evaluation_result = secondary_client.evaluate_text(evaluation_prompt)
-            secondary_score = self._extract_score_from_text(evaluation_result)
-            
+        def build(secondary_score: float, details: str, confidence: Optional[float] = None) -> EvaluationResult:
             # For summarization, use the evaluation model score as primary
             if task_type == "summarization":
-                primary_score = secondary_score
+                final_primary_score = secondary_score
                 primary_model = "evaluation_model"
             else:
+                final_primary_score = primary_score
                 primary_model = f"{task_type}_metric"
             
             return EvaluationResult(
                 test_name=test_name,
-                primary_score=primary_score,
+                primary_score=final_primary_score,
                 secondary_score=secondary_score,
-                evaluation_details=evaluation_result,
+                evaluation_details=details,
+                confidence=confidence,
                 primary_model=primary_model,
                 secondary_model=key_manager.get_model("evaluation")
             )
         
-        except Exception as e:
+        def finish(evaluation_result: str) -> EvaluationResult:
+            return build(self._extract_score_from_text(evaluation_result), evaluation_result)
+        
+        def finish_score(secondary_score: float, confidence: Optional[float] = None,
+                         details: Optional[str] = None) -> EvaluationResult:
+            return build(secondary_score, details or self._format_score_details(secondary_score, confidence), confidence)
+        
+        def fail(e: Exception) -> EvaluationResult:
             # Fallback to metric-based score if evaluation fails
-            if primary_score is None:
-                primary_score = self.text_comparator.calculate_rouge_score(expected_text, generated_text)
+            fallback_score = primary_score
+            if fallback_score is None:
+                fallback_score = cpu_pool.run(TextComparator.calculate_rouge_score, expected_text, generated_text)
             
             return EvaluationResult(
                 test_name=test_name,
-                primary_score=primary_score,
+                primary_score=fallback_score,
                 evaluation_details=f"Sekundäre Bewertung fehlgeschlagen: {str(e)}",
                 primary_model=f"{task_type}_metric"
             )
+        
+        return _JudgePlan(prompt=evaluation_prompt, finish=finish, fail=fail, finish_score=finish_score)
     
     def _evaluate_code_execution(self, code: str, test_cases: List[Dict]) -> Tuple[float, str]:
-        """Führe Code aus und bewerte das Ergebnis"""
+        """Führe Code im Prozesspool aus und bewerte das Ergebnis"""
         try:
-            # Sichere Codeausführung in einem separaten Namespace
-            namespace = {}
-            exec(code, namespace)
-            
-            # Suche nach der Hauptfunktion
-            function_name = None
-            for name in namespace:
-                if callable(namespace[name]) and not name.startswith('_'):
-                    function_name = name
-                    break
-            
-            if not function_name:
-                return 0.0, "Keine ausführbare Funktion gefunden"
-            
-            # Führe Testfälle aus
-            passed_tests = 0
-            total_tests = len(test_cases)
-            details = []
-            
-            for test_case in test_cases:
-                try:
-                    if 'input' in test_case:
-                        result = namespace[function_name](**test_case['input'])
-                    else:
-                        result = namespace[function_name]()
-                    
-                    expected = test_case.get('expected')
-                    if expected == result:
-                        passed_tests += 1
-                        details.append(f"Test bestanden: {test_case}")
-                    else:
-                        details.append(f"Test fehlgeschlagen: Erwartet {expected}, erhalten {result}")
-                
-                except Exception as e:
-                    details.append(f"Test fehlgeschlagen mit Fehler: {str(e)}")
-            
-            score = passed_tests / total_tests if total_tests > 0 else 0.0
-            details_str = "\n".join(details)
-            
-            return score, details_str
-        
+            return cpu_pool.run(evaluate_code_execution, code, test_cases)
         except Exception as e:
             return 0.0, f"Codeausführung fehlgeschlagen: {str(e)}"
     
+    def _format_score_details(self, score: float, confidence: Optional[float]) -> str:
+        """Beschreibe eine direkt ermittelte Bewertung"""
+        if confidence is None:
+            return f"Bewertung: {score:.2f}"
+        return f"Logprob Bewertung: {score:.2f} (Konfidenz: {confidence:.2f})"
+    
     def _extract_score_from_text(self, text: str) -> float:
         """Extrahiere numerischen Score aus Text"""
         try:
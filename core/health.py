@@ -0,0 +1,136 @@
+"""
+Gleichzeitige, zwischengespeicherte Erreichbarkeitsprüfung der Modellendpunkte
+"""
+import time
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional, Tuple
+
+from config import config, key_manager
+from .client_registry import client_registry
+from .deadlines import deadlines
+
+ProbeKey = Tuple[str, str]
+
+@dataclass
+class ProbeResult:
+    """Ergebnis der Prüfung eines Modells"""
+    service: str
+    model_type: str
+    base_url: str
+    model: str
+    healthy: bool
+    latency: float
+    error: Optional[str] = None
+    checked_at: float = 0.0  # time.monotonic()
+
+class HealthProbe:
+    """Prüft Modelle mit einer Chat-Anfrage (max_tokens=1) und speichert das Ergebnis
+
+    Ergebnisse gelten pro (base_url, Modell) für ttl Sekunden, daher kostet die
+    zweite Validierung in run_suite_with_setup keine Anfrage mehr. Fragen
+    mehrere Suiten gleichzeitig nach demselben Modell, wartet die zweite auf
+    die laufende Prüfung. probe_many prüft alle Ziele gleichzeitig, jede
+    Prüfung endet spätestens nach timeout Sekunden (samt Wiederholungen).
+    """
+
+    def __init__(self, ttl: float = 120.0, timeout: float = 10.0):
+        self.ttl = ttl
+        self.timeout = timeout
+        self.probes = 0
+        self.cache_hits = 0
+        self._results: Dict[Tuple[str, str], ProbeResult] = {}
+        self._in_flight: Dict[Tuple[str, str], Future] = {}
+        self._lock = threading.Lock()
+
+    def probe(self, service: str, model_type: str = "default") -> ProbeResult:
+        """Prüfe ein Modell oder verwende ein noch gültiges Ergebnis"""
+        base_url = key_manager.get_base_url(service, model_type)
+        model = key_manager.get_model(service, model_type)
+        key = (base_url, model)
+
+        with self._lock:
+            cached = self._results.get(key)
+            if cached is not None and time.monotonic() - cached.checked_at < self.ttl:
+                self.cache_hits += 1
+                return cached
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = self._in_flight[key] = Future()
+                self.probes += 1
+
+        if not owner:
+            return future.result()
+
+        try:
+            result = self._send_probe(service, model_type, base_url, model)
+        except BaseException as e:
+            with self._lock:
+                del self._in_flight[key]
+            future.set_exception(e)
+            raise
+        with self._lock:
+            self._results[key] = result
+            del self._in_flight[key]
+        future.set_result(result)
+        return result
+
+    def _send_probe(self, service: str, model_type: str, base_url: str, model: str) -> ProbeResult:
+        """Sende die Prüfanfrage"""
+        start_time = time.monotonic()
+        error = None
+        try:
+            with deadlines.test_budget(self.timeout):
+                client = client_registry.get_client_for(service, model_type, owner="health")
+                client.chat.completions.create(
+                    model=model,
+                    messages=[{"role": "user", "content": "Test"}],
+                    max_tokens=1
+                )
+        except Exception as e:
+            error = str(e) or type(e).__name__
+        checked_at = time.monotonic()
+        return ProbeResult(
+            service=service,
+            model_type=model_type,
+            base_url=base_url,
+            model=model,
+            healthy=error is None,
+            latency=checked_at - start_time,
+            error=error,
+            checked_at=checked_at
+        )
+
+    def probe_many(self, targets: List[ProbeKey]) -> Dict[ProbeKey, ProbeResult]:
+        """Prüfe mehrere (Dienst, Modelltyp) Ziele gleichzeitig"""
+        targets = list(dict.fromkeys(targets))
+        if len(targets) <= 1:
+            return {target: self.probe(*target) for target in targets}
+        with ThreadPoolExecutor(max_workers=len(targets), thread_name_prefix="health") as executor:
+            futures = {target: executor.submit(self.probe, *target) for target in targets}
+            return {target: future.result() for target, future in futures.items()}
+
+    def is_healthy(self, service: str, model_type: str = "default") -> bool:
+        """Prüfe ob ein Modell erreichbar ist (aus dem Zwischenspeicher, falls gültig)"""
+        return self.probe(service, model_type).healthy
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hole Anzahl der Prüfungen, Cachetreffer und nicht erreichbare Modelle"""
+        with self._lock:
+            return {
+                "ttl": self.ttl,
+                "probes": self.probes,
+                "cache_hits": self.cache_hits,
+                "unhealthy": {
+                    f"{model}@{base_url}": result.error
+                    for (base_url, model), result in self._results.items() if not result.healthy
+                }
+            }
+
+# Globale Prüfinstanz
+health_probe = HealthProbe(
+    ttl=config.network_config.health_probe_ttl,
+    timeout=config.network_config.health_probe_timeout
+)
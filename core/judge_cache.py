@@ -0,0 +1,127 @@
+"""
+Persistenter Cache für Bewertungen des Judge-Modells
+"""
+import json
+import sqlite3
+import hashlib
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+from config import config
+
+class JudgeCache:
+    """SQLite-basierter Bewertungscache mit größenbegrenzter LRU-Verdrängung"""
+
+    def __init__(self, path: str, max_entries: int = 10000, enabled: bool = True):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._connection = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(model: str, messages: List[Dict[str, Any]], params: Dict[str, Any]) -> str:
+        """Erstelle den Cache-Schlüssel aus Modell, Nachrichten und Sampling-Parametern"""
+        payload = json.dumps(
+            {"model": model, "messages": messages, "params": params},
+            ensure_ascii=False,
+            sort_keys=True
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _get_connection(self) -> sqlite3.Connection:
+        """Öffne die Datenbank beim ersten Zugriff"""
+        if self._connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._connection = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS verdicts ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "created REAL NOT NULL, last_access REAL NOT NULL)"
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS idx_verdicts_last_access ON verdicts (last_access)"
+            )
+            self._connection.commit()
+        return self._connection
+
+    def get(self, key: str) -> Optional[str]:
+        """Hole eine gespeicherte Bewertung und aktualisiere den Zugriffszeitpunkt"""
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            try:
+                connection = self._get_connection()
+                row = connection.execute("SELECT value FROM verdicts WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    self.misses += 1
+                    return None
+
+                connection.execute("UPDATE verdicts SET last_access = ? WHERE key = ?", (time.time(), key))
+                connection.commit()
+                self.hits += 1
+                return row[0]
+            except sqlite3.Error as e:
+                print(f"Fehler beim Lesen des Bewertungscaches: {e}")
+                self.misses += 1
+                return None
+
+    def put(self, key: str, value: str) -> None:
+        """Speichere eine Bewertung und verdränge die ältesten Einträge bei Überlauf"""
+        if not self.enabled:
+            return
+
+        with self._lock:
+            try:
+                connection = self._get_connection()
+                now = time.time()
+                connection.execute(
+                    "INSERT OR REPLACE INTO verdicts (key, value, created, last_access) VALUES (?, ?, ?, ?)",
+                    (key, value, now, now)
+                )
+
+                # LRU Verdrängung
+                count = connection.execute("SELECT COUNT(*) FROM verdicts").fetchone()[0]
+                overflow = count - self.max_entries
+                if overflow > 0:
+                    connection.execute(
+                        "DELETE FROM verdicts WHERE key IN "
+                        "(SELECT key FROM verdicts ORDER BY last_access ASC LIMIT ?)",
+                        (overflow,)
+                    )
+                connection.commit()
+            except sqlite3.Error as e:
+                print(f"Fehler beim Schreiben des Bewertungscaches: {e}")
+
+    def disable(self) -> None:
+        """Deaktiviere den Cache für diesen Lauf"""
+        self.enabled = False
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hole Treffer- und Fehlzugriffszähler"""
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / lookups) if lookups > 0 else 0.0
+        }
+
+    def close(self) -> None:
+        """Schließe die Datenbankverbindung"""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+# Globale Cache-Instanz
+judge_cache = JudgeCache(
+    path=config.judge_config.cache_path,
+    max_entries=config.judge_config.cache_max_entries,
+    enabled=config.judge_config.cache_enabled
+)
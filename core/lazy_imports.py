@@ -0,0 +1,112 @@
+"""
+Verzögertes Laden schwerer Abhängigkeiten beim ersten Gebrauch
+"""
+import importlib
+import re
+import subprocess
+import sys
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Any, List
+
+@lru_cache(maxsize=None)
+def lazy_module(name: str):
+    """Importiere ein Modul beim ersten Zugriff"""
+    return importlib.import_module(name)
+
+def get_numpy():
+    """NumPy"""
+    return lazy_module("numpy")
+
+def get_yaml():
+    """PyYAML"""
+    return lazy_module("yaml")
+
+def get_openai():
+    """OpenAI SDK"""
+    return lazy_module("openai")
+
+def get_tfidf_vectorizer():
+    """TfidfVectorizer aus scikit-learn"""
+    return lazy_module("sklearn.feature_extraction.text").TfidfVectorizer
+
+def get_mistral_common():
+    """Nachrichten- und Audioklassen aus mistral_common"""
+    messages = lazy_module("mistral_common.protocol.instruct.messages")
+    audio = lazy_module("mistral_common.audio")
+    return messages, audio
+
+IMPORTTIME_PATTERN = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+def profile_startup(module: str) -> Dict[str, Any]:
+    """Miss die Importzeit eines Moduls in einem frischen Interpreter (python -X importtime)
+
+    Gibt die Gesamtdauer, die Eigenzeit pro Top-Level-Paket und die direkten
+    Importe des gemessenen Moduls nach kumulierter Zeit sortiert zurück.
+    """
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        cwd=str(Path(__file__).resolve().parent.parent)
+    )
+
+    entries: List[Dict[str, Any]] = []
+    for line in completed.stderr.splitlines():
+        match = IMPORTTIME_PATTERN.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            entries.append({
+                "module": name,
+                "depth": len(indent) // 2,
+                "self_us": int(self_us),
+                "cumulative_ms": int(cumulative_us) / 1000
+            })
+
+    # Kinder stehen vor ihrem Elternmodul; nur den Teilbaum des gemessenen Moduls auswerten
+    end = next((i for i in range(len(entries) - 1, -1, -1)
+                if entries[i]["module"] == module and entries[i]["depth"] == 0), len(entries) - 1)
+    start = end
+    while start > 0 and entries[start - 1]["depth"] > 0:
+        start -= 1
+    subtree = entries[start:end + 1]
+
+    packages: Dict[str, int] = {}
+    for entry in subtree:
+        package = entry["module"].split(".")[0]
+        packages[package] = packages.get(package, 0) + entry["self_us"]
+
+    return {
+        "module": module,
+        "total_ms": subtree[-1]["cumulative_ms"] if subtree else 0.0,
+        "packages": sorted(
+            ({"package": package, "self_ms": us / 1000} for package, us in packages.items()),
+            key=lambda item: item["self_ms"],
+            reverse=True
+        ),
+        "slowest_imports": sorted(
+            (entry for entry in subtree if entry["depth"] == 1),
+            key=lambda item: item["cumulative_ms"],
+            reverse=True
+        ),
+        "returncode": completed.returncode
+    }
+
+def print_startup_profile(module: str, limit: int = 15) -> None:
+    """Gib eine zusammengefasste Übersicht der Importzeiten aus"""
+    profile = profile_startup(module)
+
+    print(f"\n{'='*60}")
+    print(f"STARTZEIT-PROFIL: import {profile['module']}")
+    print(f"{'='*60}")
+    print(f"Gesamte Importzeit: {profile['total_ms']:.1f} ms")
+    print("\nEigenzeit pro Paket:")
+    for item in profile["packages"][:limit]:
+        share = item["self_ms"] / profile["total_ms"] * 100 if profile["total_ms"] > 0 else 0.0
+        print(f"  {item['package']:<30} {item['self_ms']:>9.1f} ms  ({share:5.1f}%)")
+    print("\nLangsamste direkte Importe (kumuliert):")
+    for item in profile["slowest_imports"][:limit]:
+        print(f"  {item['module']:<45} {item['cumulative_ms']:>9.1f} ms")
+    if profile["returncode"] != 0:
+        print("\nWarnung: Der Import ist fehlgeschlagen, das Profil ist unvollständig")
+    print(f"{'='*60}\n")
@@ -2,7 +2,6 @@
 Umfassendes Ergebnisdokumentationssystem
 """
 import json
-import yaml
 import logging
 import os
 from datetime import datetime
@@ -13,13 +12,15 @@ from dataclasses import dataclass, asdict
 
 # Importiere die Konfiguration
 from config import config
+from .lazy_imports import get_yaml
+from .run_manifest import run_manifest
 
 @dataclass
 class TestResult:
     """Datenklasse für Testergebnisse"""
     test_name: str
     test_type: str
-    status: str  # "success", "failed", "error"
+    status: str  # "success", "failed", "error", "timeout"
     start_time: datetime
     end_time: Optional[datetime] = None
     duration: Optional[float] = None
@@ -108,10 +109,16 @@ class TestSuiteLogger:
     
     def log_test_result(self, result: TestResult, output_data: Dict[str, Any] = None,
                        score: float = None, details: str = None, error_message: str = None,
-                       input_data: Dict[str, Any] = None):
-        """Logge das Ergebnis eines Tests"""
+                       input_data: Dict[str, Any] = None, duration: float = None):
+        """Logge das Ergebnis eines Tests
+        
+        Wird keine Dauer übergeben, gilt die Zeit seit dem Teststart.
+        """
         result.end_time = datetime.now()
-        result.duration = (result.end_time - result.start_time).total_seconds()
+        if duration is not None:
+            result.duration = duration
+        else:
+            result.duration = (result.end_time - result.start_time).total_seconds()
         result.output_data = output_data
         result.score = score
         result.details = details
@@ -143,8 +150,28 @@ class TestSuiteLogger:
                         result.status = "failed"
                         self.logger.warning(f"Test nicht bestanden: {result.test_name} - Score: {score} (Schwellenwert: {threshold})")
         
-        # Speichere Ergebnis in Datei
-        self._save_result_to_file(result)
+        # Speichere Ergebnis in Datei und vermerke es im Laufmanifest
+        filepath = self._save_result_to_file(result)
+        run_manifest.record(result.test_name, result.test_type, result.status, filepath)
+    
+    def log_test_timeout(self, result: TestResult, reason: str, output_data: Dict[str, Any] = None,
+                         input_data: Dict[str, Any] = None, duration: float = None):
+        """Logge einen Test, dessen Zeitbudget abgelaufen ist oder der wegen des Laufbudgets nicht mehr startet"""
+        result.end_time = datetime.now()
+        if duration is not None:
+            result.duration = duration
+        else:
+            result.duration = (result.end_time - result.start_time).total_seconds()
+        result.output_data = output_data
+        result.score = 0.0
+        result.error_message = reason
+        result.input_data = input_data or {}
+        result.status = "timeout"
+        self.logger.warning(f"Zeitüberschreitung: {result.test_name} - {reason}")
+        
+        # Zeitüberschreitungen gelten im Laufmanifest nicht als abgeschlossen und werden bei --resume wiederholt
+        filepath = self._save_result_to_file(result)
+        run_manifest.record(result.test_name, result.test_type, result.status, filepath)
     
     def _get_threshold_for_test(self, test_name: str, score: float) -> float:
         """Bestimme den passenden Schwellenwert basierend auf dem Testtyp"""
@@ -166,8 +193,8 @@ class TestSuiteLogger:
         
         return threshold
     
-    def _save_result_to_file(self, result: TestResult, format: str = "json"):
-        """Speichere einzelnes Ergebnis in Datei"""
+    def _save_result_to_file(self, result: TestResult, format: str = "json") -> Path:
+        """Speichere einzelnes Ergebnis in Datei und gib den Pfad zurück"""
         timestamp = result.start_time.strftime("%Y%m%d_%H%M%S")
         filename = f"{result.test_name}_{timestamp}.{format}"
         filepath = self.model_log_dir / filename
@@ -181,7 +208,27 @@ class TestSuiteLogger:
                 json.dump(sanitized_dict, f, ensure_ascii=False, indent=2, default=str)
         elif format == "yaml":
             with open(filepath, 'w', encoding='utf-8') as f:
-                yaml.dump(sanitized_dict, f, default_flow_style=False, allow_unicode=True)
+                get_yaml().dump(sanitized_dict, f, default_flow_style=False, allow_unicode=True)
+        return filepath
+    
+    def restore_result(self, result_file: Path) -> Optional[TestResult]:
+        """Lade ein gespeichertes Ergebnis eines früheren Laufs in die Ergebnisliste"""
+        try:
+            with open(result_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            for key in ("start_time", "end_time"):
+                if data.get(key):
+                    data[key] = datetime.fromisoformat(data[key])
+            result = TestResult(**data)
+        except (OSError, ValueError, TypeError) as e:
+            self.logger.warning(f"Ergebnis {result_file} konnte nicht geladen werden: {e}")
+            return None
+        
+        with self._lock:
+            self._results.append(result)
+        
+        self.logger.info(f"Test übernommen: {self._sanitize_text(result.test_name)} ({result.status})")
+        return result
     
     def _sanitize_dict_for_encoding(self, obj):
         """Recursively sanitize a dictionary for encoding"""
@@ -208,13 +255,14 @@ class TestSuiteLogger:
         results = self.get_results()
         
         if not results:
-            return {"total": 0, "success": 0, "failed": 0, "error": 0}
+            return {"total": 0, "success": 0, "failed": 0, "error": 0, "timeout": 0}
         
         summary = {
             "total": len(results),
             "success": len([r for r in results if r.status == "success"]),
             "failed": len([r for r in results if r.status == "failed"]),
             "error": len([r for r in results if r.status == "error"]),
+            "timeout": len([r for r in results if r.status == "timeout"]),
             "average_score": sum(r.score for r in results if r.score is not None) / len([r for r in results if r.score is not None]) if any(r.score is not None for r in results) else 0,
             "total_duration": sum(r.duration for r in results if r.duration is not None)
         }
@@ -240,6 +288,7 @@ class TestSuiteLogger:
         report.append(f"Erfolgreich: {summary['success']}")
         report.append(f"Fehlgeschlagen: {summary['failed']}")
         report.append(f"Fehler: {summary['error']}")
+        report.append(f"Zeitüberschreitungen: {summary['timeout']}")
         report.append(f"Durchschnittlicher Score: {summary['average_score']:.2f}")
         report.append(f"Gesamtdauer: {summary['total_duration']:.2f} Sekunden")
         report.append("")
@@ -278,7 +327,7 @@ class TestSuiteLogger:
                 }, f, ensure_ascii=False, indent=2, default=str)
         elif format == "yaml":
             with open(filepath, 'w', encoding='utf-8') as f:
-                yaml.dump({
+                get_yaml().dump({
                     "report": self.generate_comprehensive_report(),
                     "summary": self.get_summary(),
                     "results": [asdict(r) for r in self.get_results()]
@@ -0,0 +1,136 @@
+"""
+Schnelle Textmetriken (BLEU, ROUGE-L) ohne Scorer-Aufbau pro Aufruf
+"""
+import re
+import math
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from .lazy_imports import get_numpy
+
+# Wort-Tokenizer für BLEU: Wörter (inkl. Bindestrich/Apostroph) und einzelne Satzzeichen
+WORD_TOKEN_PATTERN = re.compile(r"\w+(?:[-'.]\w+)*|[^\w\s]")
+
+# Tokenisierung wie rouge_score: nur a-z und 0-9, alles andere trennt
+ROUGE_NON_ALPHANUM = re.compile(r"[^a-z0-9]+")
+
+BLEU_MAX_ORDER = 4
+BLEU_EPSILON = 0.1  # Glättung wie NLTK SmoothingFunction().method1
+
+def tokenize(text: str) -> List[str]:
+    """Zerlege einen Text in kleingeschriebene Wort-Token"""
+    return WORD_TOKEN_PATTERN.findall(text.lower())
+
+@lru_cache(maxsize=1)
+def _get_stemmer():
+    """Porter Stemmer einmal pro Prozess erstellen (wie rouge_score, None ohne NLTK)"""
+    try:
+        from nltk.stem import porter
+        return porter.PorterStemmer()
+    except ImportError:
+        return None
+
+@lru_cache(maxsize=65536)
+def _stem(token: str) -> str:
+    """Stamme ein Token einmal und merke das Ergebnis"""
+    stemmer = _get_stemmer()
+    return stemmer.stem(token) if stemmer is not None else token
+
+def rouge_tokenize(text: str) -> List[str]:
+    """Tokenisiere wie rouge_score mit Stemming (nur Token länger als drei Zeichen)"""
+    tokens = ROUGE_NON_ALPHANUM.sub(" ", text.lower()).split()
+    return [_stem(token) if len(token) > 3 else token for token in tokens]
+
+def count_ngrams(tokens: List[str], max_order: int = BLEU_MAX_ORDER) -> Dict[int, Counter]:
+    """Zähle alle N-Gramme der Ordnung 1 bis max_order"""
+    return {
+        order: Counter(tuple(tokens[i:i + order]) for i in range(len(tokens) - order + 1))
+        for order in range(1, max_order + 1)
+    }
+
+def bleu(reference_tokens: List[str], candidate_tokens: List[str],
+         reference_ngrams: Optional[Dict[int, Counter]] = None) -> float:
+    """Satz-BLEU-4 mit gleichen Gewichten und Glättung method1 (wie NLTK sentence_bleu)
+
+    reference_ngrams kann aus dem Referenzindex übergeben werden, damit nur die
+    Antwort gezählt werden muss.
+    """
+    if not candidate_tokens:
+        return 0.0
+    if reference_ngrams is None:
+        reference_ngrams = count_ngrams(reference_tokens)
+
+    np = get_numpy()
+    candidate_ngrams = count_ngrams(candidate_tokens)
+    numerators = np.zeros(BLEU_MAX_ORDER)
+    denominators = np.zeros(BLEU_MAX_ORDER)
+    for order in range(1, BLEU_MAX_ORDER + 1):
+        counts = candidate_ngrams[order]
+        reference_counts = reference_ngrams[order]
+        numerators[order - 1] = sum(min(count, reference_counts.get(ngram, 0)) for ngram, count in counts.items())
+        denominators[order - 1] = max(1, sum(counts.values()))
+
+    # Ohne übereinstimmende Unigramme gibt es keine Übereinstimmung höherer Ordnung
+    if numerators[0] == 0:
+        return 0.0
+
+    precisions = np.where(numerators == 0, BLEU_EPSILON, numerators) / denominators
+
+    candidate_length = len(candidate_tokens)
+    reference_length = len(reference_tokens)
+    brevity_penalty = 1.0 if candidate_length > reference_length else math.exp(1 - reference_length / candidate_length)
+
+    return float(brevity_penalty * math.exp(np.log(precisions).mean()))
+
+def lcs_length(first: List[str], second: List[str]) -> int:
+    """Länge der längsten gemeinsamen Teilfolge (bitparallel nach Hyyrö)
+
+    Jede Zeile der LCS-Tabelle wird als Bitvektor über second dargestellt und
+    mit einer Addition pro Token von first aktualisiert.
+    """
+    if not first or not second:
+        return 0
+
+    match_masks: Dict[str, int] = {}
+    for position, token in enumerate(second):
+        match_masks[token] = match_masks.get(token, 0) | (1 << position)
+
+    full_mask = (1 << len(second)) - 1
+    row = full_mask
+    for token in first:
+        matches = row & match_masks.get(token, 0)
+        row = ((row + matches) | (row - matches)) & full_mask
+
+    return len(second) - bin(row).count("1")
+
+def rouge_l(reference_tokens: List[str], candidate_tokens: List[str]) -> float:
+    """ROUGE-L F-Maß auf bereits tokenisierten Texten"""
+    lcs = lcs_length(reference_tokens, candidate_tokens)
+    if lcs == 0:
+        return 0.0
+    precision = lcs / len(candidate_tokens)
+    recall = lcs / len(reference_tokens)
+    return 2 * precision * recall / (precision + recall)
+
+def bleu_batch(pairs: List[Tuple[str, str]]) -> List[float]:
+    """BLEU für viele (Referenz, Antwort) Paare; gleiche Referenzen werden nur einmal gezählt"""
+    references: Dict[str, Tuple[List[str], Dict[int, Counter]]] = {}
+    scores = []
+    for reference, candidate in pairs:
+        if reference not in references:
+            reference_tokens = tokenize(reference)
+            references[reference] = (reference_tokens, count_ngrams(reference_tokens))
+        reference_tokens, reference_ngrams = references[reference]
+        scores.append(bleu(reference_tokens, tokenize(candidate), reference_ngrams))
+    return scores
+
+def rouge_l_batch(pairs: List[Tuple[str, str]]) -> List[float]:
+    """ROUGE-L für viele (Referenz, Antwort) Paare; gleiche Referenzen werden nur einmal tokenisiert"""
+    references: Dict[str, List[str]] = {}
+    scores = []
+    for reference, candidate in pairs:
+        if reference not in references:
+            references[reference] = rouge_tokenize(reference)
+        scores.append(rouge_l(references[reference], rouge_tokenize(candidate)))
+    return scores
@@ -1,16 +1,33 @@
 """
 Haupt Test Orchestrator für das TestSuite System
 """
+import sys
 import time
 import threading
+import contextvars
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 import json
-import yaml
 from pathlib import Path
 
 from config import config
 from core.logger import get_suite_logger
+from core.judge_cache import judge_cache
+from core.client_registry import client_registry
+from core.scheduler import work_scheduler
+from core.run_manifest import run_manifest
+from core.worker_pool import cpu_pool
+from core.deadlines import deadlines
+from core.health import health_probe
+from core.warmup import warmup
+from core.planner import run_planner
+from core.sharding import (
+    load_shard, copy_result_tree, merge_suite_results, merge_judge_cache_stats, merge_scheduler_stats,
+    shard_judge_cache_stats
+)
+from core.lazy_imports import get_yaml
 from test_suites import (
     GeneralLLMTestSuite,
     CodingModelTestSuite, 
@@ -18,22 +35,96 @@ from test_suites import (
     VLMTestSuite
 )
 
+class _LazySuiteMap(Mapping):
+    """Test Suiten, die erst beim ersten Zugriff instanziiert werden"""
+    
+    def __init__(self, suite_classes: Dict[str, type]):
+        self._suite_classes = suite_classes
+        self._instances = {}
+        self._lock = threading.Lock()
+    
+    def __getitem__(self, suite_name: str):
+        with self._lock:
+            if suite_name not in self._instances:
+                self._instances[suite_name] = self._suite_classes[suite_name]()
+            return self._instances[suite_name]
+    
+    def __iter__(self):
+        return iter(self._suite_classes)
+    
+    def __len__(self) -> int:
+        return len(self._suite_classes)
+
+# Name der Suite, deren Ausgabe im aktuellen Thread entsteht (nur bei paralleler Ausführung)
+_current_suite: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("current_suite", default=None)
+
+class _PrefixedOutput:
+    """Ersatz für sys.stdout, der jede Zeile paralleler Suiten mit dem Suite-Namen versieht
+    
+    Teilzeilen werden pro Thread gepuffert und erst als vollständige Zeile
+    geschrieben, damit sich die Ausgaben der Suiten nicht mischen.
+    """
+    
+    def __init__(self, stream):
+        self._stream = stream
+        self._pending: Dict[int, str] = {}
+        self._lock = threading.Lock()
+    
+    def write(self, text: str) -> int:
+        prefix = _current_suite.get()
+        with self._lock:
+            if prefix is None:
+                return self._stream.write(text)
+            
+            thread_id = threading.get_ident()
+            lines = (self._pending.pop(thread_id, "") + text).split("\n")
+            if lines[-1]:
+                self._pending[thread_id] = lines[-1]
+            for line in lines[:-1]:
+                self._stream.write(f"[{prefix}] {line}\n")
+            return len(text)
+    
+    def flush(self) -> None:
+        with self._lock:
+            self._stream.flush()
+    
+    def finish(self):
+        """Schreibe verbliebene Teilzeilen und gib den ursprünglichen Strom zurück"""
+        with self._lock:
+            for line in self._pending.values():
+                self._stream.write(f"{line}\n")
+            self._pending.clear()
+            self._stream.flush()
+        return self._stream
+    
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
 class TestSuiteOrchestrator:
     """Haupt Orchestrator für die Test Suite Ausführung"""
     
     def __init__(self):
-        self.test_suites = {
-            "general_llm": GeneralLLMTestSuite(),
-            "coding_model": CodingModelTestSuite(),
-            "audio_model": AudioModelTestSuite(),
-            "vlm": VLMTestSuite()
-        }
+        # Suiten werden erst bei Bedarf erstellt, damit ein Lauf mit einer Suite
+        # nicht die Clients und Abhängigkeiten aller anderen Suiten lädt
+        self.test_suites = _LazySuiteMap({
+            "general_llm": GeneralLLMTestSuite,
+            "coding_model": CodingModelTestSuite,
+            "audio_model": AudioModelTestSuite,
+            "vlm": VLMTestSuite
+        })
         self.execution_results = {}
+        self.overall_duration = 0.0
         self._lock = threading.Lock()
         self._stop_execution = False
     
     def validate_environment(self, suites_to_validate: List[str] = None) -> Dict[str, bool]:
-        """Validiere die Testumgebung für spezifische Suiten"""
+        """Validiere die Testumgebung für spezifische Suiten
+        
+        Die Suiten werden gleichzeitig validiert, ihre Erreichbarkeitsprüfungen
+        laufen damit parallel über alle Endpunkte. Die Ergebnisse bleiben im
+        health_probe gespeichert, sodass die erneute Validierung beim Start
+        einer Suite keine Anfragen mehr sendet.
+        """
         validation_results = {}
         
         if suites_to_validate is None:
@@ -41,36 +132,47 @@ class TestSuiteOrchestrator:
         
         print("Validiere Testumgebung...")
         
-        for suite_name in suites_to_validate:
-            if suite_name not in self.test_suites:
-                continue
-                
-            suite = self.test_suites[suite_name]
-            try:
-                validation_results[suite_name] = suite.validate_prerequisites()
-                status = "OK" if validation_results[suite_name] else "FAIL"
-                print(f"  {suite_name}: {status}")
-            except Exception as e:
-                validation_results[suite_name] = False
-                print(f"  {suite_name}: FAIL - Fehler: {e}")
+        suites = {
+            suite_name: self.test_suites[suite_name]
+            for suite_name in suites_to_validate if suite_name in self.test_suites
+        }
+        if suites:
+            with ThreadPoolExecutor(max_workers=len(suites), thread_name_prefix="validate") as executor:
+                futures = {
+                    suite_name: executor.submit(suite.validate_prerequisites)
+                    for suite_name, suite in suites.items()
+                }
+                for suite_name, future in futures.items():
+                    try:
+                        validation_results[suite_name] = future.result()
+                        status = "OK" if validation_results[suite_name] else "FAIL"
+                        print(f"  {suite_name}: {status}")
+                    except Exception as e:
+                        validation_results[suite_name] = False
+                        print(f"  {suite_name}: FAIL - Fehler: {e}")
         
         all_valid = all(validation_results.values())
         print(f"\nGesamtstatus: {'OK Alle Voraussetzungen erfüllt' if all_valid else 'FAIL Einige Voraussetzungen nicht erfüllt'}")
         
         return validation_results
     
-    def setup_environment(self) -> None:
-        """Richte die Testumgebung ein"""
+    def setup_environment(self, suite_names: List[str] = None) -> None:
+        """Richte die Testumgebung für die ausgewählten Test Suiten ein (ohne Angabe: alle)"""
         print("Richte Testumgebung ein...")
         
         # Erstelle Ergebnisse Verzeichnis
         results_dir = Path(config.test_config.results_dir)
         results_dir.mkdir(parents=True, exist_ok=True)
         
-        # Setup aller Test Suiten
-        for suite_name, suite in self.test_suites.items():
+        if suite_names is None:
+            suite_names = list(self.test_suites.keys())
+        
+        # Nur ausgewählte Suiten erstellen, die übrigen bleiben ungeladen
+        for suite_name in suite_names:
+            if suite_name not in self.test_suites:
+                continue
             try:
-                suite.setup_suite()
+                self.test_suites[suite_name].setup_suite()
                 print(f"  {suite_name}: SETUP ERFOLGREICH")
             except Exception as e:
                 print(f"  {suite_name}: SETUP FEHLGESCHLAGEN - {e}")
@@ -111,6 +213,7 @@ class TestSuiteOrchestrator:
                 "duration": duration,
                 "summary": summary,
                 "results_count": len(results),
+                "judge_cache": judge_cache.get_stats(),
                 "status": suite_status
             }
             
@@ -120,7 +223,11 @@ class TestSuiteOrchestrator:
             print(f"  - Erfolgreich: {summary['passed']}")
             print(f"  - Fehlgeschlagen: {summary['failed']}")
             print(f"  - Fehler: {summary['errors']}")
+            if summary["timeouts"]:
+                print(f"  - Zeitüberschreitungen: {summary['timeouts']}")
             print(f"  - Durchschnittlicher Score: {summary['average_score']:.2f}")
+            self._display_telemetry(summary.get("telemetry") or {})
+            self._display_judge_cache_stats(result_data["judge_cache"])
             
             return result_data
         
@@ -136,8 +243,8 @@ class TestSuiteOrchestrator:
                 "status": "failed"
             }
     
-    def run_all_suites(self, suite_order: List[str] = None) -> Dict[str, Any]:
-        """Führe alle Test Suiten aus"""
+    def run_all_suites(self, suite_order: List[str] = None, parallel: bool = False) -> Dict[str, Any]:
+        """Führe alle Test Suiten aus (nacheinander oder mit parallel=True gleichzeitig)"""
         if suite_order is None:
             suite_order = list(self.test_suites.keys())
         
@@ -146,7 +253,10 @@ class TestSuiteOrchestrator:
         print(f"{'='*80}")
         print(f"Startzeit: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         print(f"Anzahl Test Suiten: {len(suite_order)}")
-        print(f"Reihenfolge: {' -> '.join(suite_order)}")
+        if parallel:
+            print(f"Parallel: {', '.join(suite_order)}")
+        else:
+            print(f"Reihenfolge: {' -> '.join(suite_order)}")
         print(f"{'='*80}")
         
         # Validiere Umgebung
@@ -155,28 +265,37 @@ class TestSuiteOrchestrator:
             print("\n⚠️  Nicht alle Voraussetzungen sind erfüllt. Einige Tests könnten fehlschlagen.")
         
         # Setup Umgebung
-        self.setup_environment()
+        self.setup_environment(suite_order)
         
         # Führe Test Suiten aus
         overall_start_time = time.time()
         self.execution_results = {}
         
-        for suite_name in suite_order:
-            if self._stop_execution:
-                print("\n⚠️  Ausführung wurde gestoppt")
-                break
-            
-            print(f"\n{'-'*60}")
-            print(f"NACHSTE TEST SUITE: {suite_name.upper()}")
-            print(f"{'-'*60}")
-            
-            suite_result = self.run_single_suite(suite_name)
-            self.execution_results[suite_name] = suite_result
-            
-            # Kurze Pause zwischen den Suiten
-            time.sleep(1)
+        if parallel:
+            self._run_suites_parallel(suite_order)
+        else:
+            for position, suite_name in enumerate(suite_order):
+                if self._stop_execution:
+                    print("\n⚠️  Ausführung wurde gestoppt")
+                    break
+                if deadlines.run_expired():
+                    # Die Reihenfolge (--order) legt die Priorität fest, spätere Suiten entfallen
+                    print(f"\n⚠️  Laufzeitbudget erschöpft, überspringe: {', '.join(suite_order[position:])}")
+                    break
+                
+                print(f"\n{'-'*60}")
+                print(f"NACHSTE TEST SUITE: {suite_name.upper()}")
+                print(f"{'-'*60}")
+                
+                suite_result = self.run_single_suite(suite_name)
+                with self._lock:
+                    self.execution_results[suite_name] = suite_result
+                
+                # Kurze Pause zwischen den Suiten
+                time.sleep(1)
         
         overall_duration = time.time() - overall_start_time
+        self.overall_duration = overall_duration
         
         # Erstelle Gesamtergebnis
         overall_result = self._create_overall_result(overall_duration)
@@ -192,9 +311,47 @@ class TestSuiteOrchestrator:
         
         return overall_result
     
+    def _run_suites_parallel(self, suite_order: List[str]) -> None:
+        """Führe Suiten gleichzeitig aus, jede in einem eigenen Thread
+        
+        Gemeinsame Endpunkte werden über die Begrenzung pro base_url im
+        Client-Register geschützt. Die Konsolenausgabe erhält den Suite-Namen
+        als Präfix, die Ergebnisse behalten die angeforderte Reihenfolge.
+        """
+        output = _PrefixedOutput(sys.stdout)
+        sys.stdout = output
+        try:
+            with ThreadPoolExecutor(max_workers=len(suite_order), thread_name_prefix="suite") as executor:
+                futures = [executor.submit(self._run_suite_worker, suite_name) for suite_name in suite_order]
+                for future in futures:
+                    future.result()
+        finally:
+            sys.stdout = output.finish()
+        
+        with self._lock:
+            self.execution_results = {
+                suite_name: self.execution_results[suite_name]
+                for suite_name in suite_order if suite_name in self.execution_results
+            }
+        if self._stop_execution:
+            print("\n⚠️  Ausführung wurde gestoppt")
+    
+    def _run_suite_worker(self, suite_name: str) -> None:
+        """Führe eine Suite in einem Worker-Thread aus und sammle ihr Ergebnis"""
+        if self._stop_execution:
+            return
+        _current_suite.set(suite_name)
+        suite_result = self.run_single_suite(suite_name)
+        with self._lock:
+            self.execution_results[suite_name] = suite_result
+    
     def run_specific_suite(self, suite_name: str) -> Dict[str, Any]:
         """Führe eine spezifische Test Suite aus"""
-        return self.run_single_suite(suite_name)
+        suite_result = self.run_single_suite(suite_name)
+        with self._lock:
+            self.execution_results[suite_name] = suite_result
+        self.overall_duration = suite_result["duration"]
+        return suite_result
     
     def stop_execution(self) -> None:
         """Stoppe die Ausführung"""
@@ -207,6 +364,7 @@ class TestSuiteOrchestrator:
         total_passed = 0
         total_failed = 0
         total_errors = 0
+        total_timeouts = 0
         total_score = 0.0
         completed_suites = 0
         
@@ -217,6 +375,7 @@ class TestSuiteOrchestrator:
                 total_passed += summary["passed"]
                 total_failed += summary["failed"]
                 total_errors += summary["errors"]
+                total_timeouts += summary.get("timeouts", 0)
                 total_score += summary["average_score"]
                 completed_suites += 1
         
@@ -235,9 +394,18 @@ class TestSuiteOrchestrator:
                 "total_passed": total_passed,
                 "total_failed": total_failed,
                 "total_errors": total_errors,
+                "total_timeouts": total_timeouts,
                 "success_rate": (total_passed / total_tests * 100) if total_tests > 0 else 0,
                 "average_score": average_score
             },
+            "judge_cache": judge_cache.get_stats(),
+            "circuit_breakers": client_registry.get_stats()["circuit_breakers"],
+            "scheduler": work_scheduler.get_stats(),
+            "run": run_manifest.get_stats(),
+            "cpu_pool": cpu_pool.get_stats(),
+            "deadlines": deadlines.get_stats(),
+            "health": health_probe.get_stats(),
+            "warmup": warmup.get_stats(),
             "suite_results": self.execution_results,
             "detailed_results": []  # Ergebnisse werden direkt von den Test Suites geholt
         }
@@ -259,12 +427,153 @@ class TestSuiteOrchestrator:
         print(f"Erfolgreich: {summary['total_passed']}")
         print(f"Fehlgeschlagen: {summary['total_failed']}")
         print(f"Fehler: {summary['total_errors']}")
+        print(f"Zeitüberschreitungen: {summary['total_timeouts']}")
         print(f"Erfolgsrate: {summary['success_rate']:.1f}%")
         print(f"Durchschnittlicher Score: {summary['average_score']:.2f}")
+        self._display_judge_cache_stats(overall_result["judge_cache"])
+        self._display_circuit_breakers(overall_result["circuit_breakers"])
+        self._display_scheduler_stats(overall_result["scheduler"])
+        if overall_result["cpu_pool"]["workers"] > 0:
+            cpu_stats = overall_result["cpu_pool"]
+            print(f"CPU Worker-Prozesse: {cpu_stats['workers']}, {cpu_stats['tasks']} Aufgaben, "
+                  f"{cpu_stats['failures']} fehlgeschlagen, {cpu_stats['timeouts']} abgebrochen")
+        warmup_stats = overall_result["warmup"]
+        if warmup_stats["total_requests"]:
+            print(f"Aufwärmphase: {len(warmup_stats['models'])} Modelle, {warmup_stats['total_requests']} Anfragen "
+                  f"({warmup_stats['total_failures']} fehlgeschlagen), {warmup_stats['total_duration']:.2f}s "
+                  f"(nicht in den Testdauern enthalten)")
+        for model, error in overall_result["health"]["unhealthy"].items():
+            print(f"Nicht erreichbar (übersprungen): {model} - {error}")
+        if overall_result["deadlines"]["run_expired"]:
+            print(f"Laufzeitbudget von {overall_result['deadlines']['run_duration']}s abgelaufen, "
+                  f"verbleibende Tests wurden übersprungen")
+        print(f"{'='*60}")
+    
+    def _display_telemetry(self, telemetry_summary: Dict[str, Any]) -> None:
+        """Zeige Latenz, Zeit bis zum ersten Token und Durchsatz pro Anfrageart an"""
+        labels = {"generation": "Generierung", "judge": "Bewertung"}
+        for kind, stats in telemetry_summary.items():
+            ttft = f"{stats['ttft_mean']:.2f}s" if stats["ttft_mean"] is not None else "-"
+            rate = f"{stats['tokens_per_second']:.1f}" if stats["tokens_per_second"] is not None else "-"
+            print(f"  - {labels.get(kind, kind)}: {stats['calls']:g} Anfragen, Latenz p50 {stats['latency_p50']:.2f}s / "
+                  f"p95 {stats['latency_p95']:.2f}s, erstes Token {ttft}, {rate} Token/s, "
+                  f"{stats['prompt_tokens']} + {stats['completion_tokens']} Tokens")
+    
+    def _display_judge_cache_stats(self, cache_stats: Dict[str, Any]) -> None:
+        """Zeige Treffer und Fehlzugriffe des Bewertungscaches an"""
+        if not cache_stats["enabled"]:
+            print("Bewertungscache: deaktiviert")
+            return
+        print(f"Bewertungscache: {cache_stats['hits']} Treffer, {cache_stats['misses']} Fehlzugriffe "
+              f"({cache_stats['hit_rate']*100:.1f}% Trefferquote)")
+    
+    def _display_circuit_breakers(self, breakers: Dict[str, Dict[str, Any]]) -> None:
+        """Zeige Endpunkte an, deren Circuit Breaker ausgelöst hat"""
+        for base_url, stats in breakers.items():
+            if stats["state"] != "closed" or stats["rejected_requests"] > 0:
+                print(f"Circuit Breaker {base_url}: {stats['state']}, "
+                      f"{stats['rejected_requests']} Anfragen abgelehnt")
+    
+    def _display_scheduler_stats(self, scheduler_stats: Dict[str, Any]) -> None:
+        """Zeige Plätze, Spitzenauslastung und Durchsatz pro Endpunkt an"""
+        for endpoint, stats in scheduler_stats["endpoints"].items():
+            slots = stats["slots"] if stats["slots"] > 0 else "unbegrenzt"
+            print(f"Endpunkt {endpoint}: {stats['completed']} Aufträge, "
+                  f"maximal {stats['peak_active']} gleichzeitig (Plätze: {slots})")
+        for name, limiter_stats in scheduler_stats["request_pools"].items():
+            if not isinstance(limiter_stats, Mapping) or not limiter_stats.get("adaptive"):
+                continue
+            p95 = f"{limiter_stats['p95_latency']:.2f}s" if limiter_stats["p95_latency"] is not None else "-"
+            print(f"Adaptives Fenster {name}: {limiter_stats['window']} "
+                  f"({limiter_stats['min_window']}-{limiter_stats['max_window']}), "
+                  f"{limiter_stats['increases']} Erhöhungen, {limiter_stats['decreases']} Senkungen, p95 {p95}")
+    
+    def plan_run(self, suite_order: List[str], parallel: bool = False) -> Dict[str, Any]:
+        """Erstelle die Arbeitsmatrix eines Laufs (--plan) ohne ein Modell aufzurufen und zeige sie an"""
+        suites = {
+            suite_name: self.test_suites[suite_name]
+            for suite_name in suite_order if suite_name in self.test_suites
+        }
+        planned = {suite_name: suite.plan_tests() for suite_name, suite in suites.items()}
+        # Frühere Ergebnisse liegen in den Verzeichnissen der Suite-Logger
+        suite_dirs = [suite.model_logger.model_log_dir for suite in suites.values()]
+        plan = run_planner.plan(planned, suite_dirs=suite_dirs, parallel=parallel)
+        self._display_plan(plan)
+        return plan
+    
+    def _display_plan(self, plan: Dict[str, Any]) -> None:
+        """Zeige Tests, Anfragen pro Endpunkt, Bewertungsanfragen und die geschätzte Laufzeit an"""
+        print(f"\n{'='*60}")
+        print("TROCKENLAUF (keine Modellaufrufe)")
         print(f"{'='*60}")
+        for suite_name, suite_plan in plan["suites"].items():
+            estimate = f"~{suite_plan['estimated_duration']:.0f}s" if suite_plan["estimated_duration"] else "unbekannt"
+            print(f"{suite_name}: {suite_plan['tests']} Tests, {suite_plan['models']} Modelle/Kombinationen, "
+                  f"{suite_plan['requests']} Anfragen, {suite_plan['judge_calls']} Bewertungen, Dauer {estimate}")
+        print(f"{'='*60}")
+        for endpoint, stats in plan["endpoints"].items():
+            slots = stats["slots"] if stats["slots"] > 0 else "unbegrenzt"
+            print(f"Endpunkt {endpoint}: {stats['requests']} Anfragen, {stats['tests']} Tests (Plätze: {slots})")
+        judge = plan["judge"]
+        judge_slots = judge["slots"] if judge["slots"] > 0 else "unbegrenzt"
+        print(f"Bewertungsmodell {judge['endpoint']}: höchstens {judge['calls']} Anfragen (Plätze: {judge_slots}, "
+              f"Bewertungscache: {'an' if judge_cache.enabled else 'aus'})")
+        if warmup.enabled:
+            print(f"Aufwärmphase: zusätzlich {warmup.requests} Anfragen pro Modell")
+        print(f"{'='*60}")
+        print(f"Gesamt: {plan['total_tests']} Tests, {plan['total_requests']} Anfragen, {judge['calls']} Bewertungen")
+        print(f"Geschätzte Laufzeit: ~{plan['estimated_duration']:.0f}s "
+              f"({'parallele Suiten, Untergrenze' if plan['parallel'] else 'Suiten nacheinander'}), "
+              f"Vergleichswerte aus {plan['history_tests']} Tests früherer Läufe")
+        if plan["without_history"]:
+            print(f"Ohne Vergleichswerte (nicht in der Schätzung): {plan['without_history']} Tests")
+        print(f"{'='*60}")
+    
+    def merge_shards(self, shard_dirs: List[str]) -> Dict[str, Any]:
+        """Führe die Ergebnisverzeichnisse mehrerer Shards (--shard i/N) zu einem Gesamtergebnis zusammen
+        
+        Die Ergebnisdateien der Suiten werden nach RESULTS_DIR kopiert, die
+        Suite-Ergebnisse werden addiert. Das Gesamtergebnis hat dieselbe Form
+        wie bei einem Lauf auf einem Rechner, die Dauer ist die des längsten Shards.
+        """
+        shards = [load_shard(Path(shard_dir)) for shard_dir in shard_dirs]
+        results_dir = Path(config.test_config.results_dir)
+        results_dir.mkdir(parents=True, exist_ok=True)
+        
+        for shard in shards:
+            copied = copy_result_tree(shard["dir"], results_dir)
+            print(f"  {shard['dir']}: {shard['detail_file'].name}, {copied} Ergebnisdateien übernommen")
+        
+        self.execution_results = merge_suite_results([shard["execution_results"] for shard in shards])
+        self.overall_duration = max(
+            shard["overall"].get("execution_info", {}).get("overall_duration")
+            or sum(result.get("duration", 0.0) for result in shard["execution_results"].values())
+            for shard in shards
+        )
+        
+        overall_result = self._create_overall_result(self.overall_duration)
+        overalls = [shard["overall"] for shard in shards]
+        overall_result["judge_cache"] = merge_judge_cache_stats(
+            [shard_judge_cache_stats(shard) for shard in shards]
+        ) or overall_result["judge_cache"]
+        overall_result["circuit_breakers"] = {
+            base_url: stats for overall in overalls for base_url, stats in overall.get("circuit_breakers", {}).items()
+        }
+        overall_result["scheduler"] = merge_scheduler_stats([overall.get("scheduler", {}) for overall in overalls])
+        overall_result["run"] = {
+            "run_id": ",".join(filter(None, (overall.get("run", {}).get("run_id") for overall in overalls))) or None,
+            "path": None,
+            "resumed": any(overall.get("run", {}).get("resumed") for overall in overalls),
+            "recorded": sum(overall.get("run", {}).get("recorded", 0) for overall in overalls),
+            "completed": sum(overall.get("run", {}).get("completed", 0) for overall in overalls)
+        }
+        
+        self._display_overall_result(overall_result)
+        return overall_result
     
-    def save_results(self, filename: str = None, format: str = "json") -> str:
-        """Speichere die Ergebnisse in einer Datei"""
+    def save_results(self, filename: str = None, format: str = "json",
+                     overall_result: Optional[Dict[str, Any]] = None) -> str:
+        """Speichere die Ergebnisse in einer Datei (overall_result ersetzt das berechnete Gesamtergebnis)"""
         if not filename:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = f"testsuite_results_{timestamp}.{format}"
@@ -279,7 +588,7 @@ class TestSuiteOrchestrator:
                     json.dump(self.execution_results, f, ensure_ascii=False, indent=2, default=str)
             elif format == "yaml":
                 with open(filepath, 'w', encoding='utf-8') as f:
-                    yaml.dump(self.execution_results, f, default_flow_style=False, allow_unicode=True)
+                    get_yaml().dump(self.execution_results, f, default_flow_style=False, allow_unicode=True)
             print(f"\nErgebnisse gespeichert:")
             print(f"  - Detaillierte Ergebnisse: {filepath}")
         else:
@@ -287,7 +596,8 @@ class TestSuiteOrchestrator:
             return ""
         
         # Speichere Gesamtergebnis nur wenn es nicht leer ist
-        overall_result = self._create_overall_result(0)  # Dauer wird im Logger gespeichert
+        if overall_result is None:
+            overall_result = self._create_overall_result(self.overall_duration)
         if overall_result and overall_result.get("overall_summary", {}).get("total_tests", 0) > 0:
             overall_filename = f"overall_{filename}"
             overall_filepath = results_dir / overall_filename
@@ -297,7 +607,7 @@ class TestSuiteOrchestrator:
                     json.dump(overall_result, f, ensure_ascii=False, indent=2, default=str)
             elif format == "yaml":
                 with open(overall_filepath, 'w', encoding='utf-8') as f:
-                    yaml.dump(overall_result, f, default_flow_style=False, allow_unicode=True)
+                    get_yaml().dump(overall_result, f, default_flow_style=False, allow_unicode=True)
             print(f"  - Gesamtergebnis: {overall_filepath}")
         else:
             print(f"  - Kein Gesamtergebnis zum Speichern vorhanden")
@@ -0,0 +1,162 @@
+"""
+Trockenlauf: Arbeitsmatrix eines Testlaufs und Zeitschätzung aus früheren Ergebnissen
+"""
+import json
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+from config import config, key_manager
+from .scheduler import work_scheduler, JUDGE_POOL
+
+# Nur abgeschlossene Tests liefern aussagekräftige Dauern
+_HISTORY_STATUSES = {"success", "failed"}
+
+@dataclass(frozen=True)
+class PlannedTest:
+    """Ein Eintrag der Arbeitsmatrix: ein Test eines Modells bzw. einer Modellkombination"""
+    suite: str
+    test_name: str  # Vollständiger Name wie im Laufmanifest (suite_test_modell)
+    endpoint: str  # base_url, über deren Plätze der WorkScheduler den Test einplant
+    group: str  # Modell bzw. Modellkombination (Gruppe im WorkScheduler)
+    requests: Dict[str, int] = field(default_factory=dict)  # Modellanfragen pro base_url
+    judge_calls: int = 0  # Bewertungsanfragen an den Evaluationsdienst
+
+class RunPlanner:
+    """Erstellt aus den geplanten Tests aller Suiten eine Übersicht ohne ein Modell aufzurufen
+
+    Gezählt werden Modellanfragen pro Endpunkt und Bewertungsanfragen. Die
+    Laufzeit wird aus den Dauern gleichnamiger Tests in den Ergebnisdateien
+    früherer Läufe geschätzt (ohne eigene Werte: Mittel der Suite) und über
+    die Plätze der Endpunkte, max_workers und max_model_workers auf die
+    gleichzeitige Ausführung umgerechnet.
+    Bewertungscache und Bündelung können die Zahl der Bewertungsanfragen
+    senken, die Angaben sind daher Obergrenzen.
+    """
+
+    def __init__(self):
+        self._history: Optional[Dict[str, List[float]]] = None
+        self._suite_history: Dict[str, List[float]] = {}
+
+    def load_history(self, suite_dirs: Optional[List[Path]] = None) -> Dict[str, List[float]]:
+        """Lese die Dauern abgeschlossener Tests aus den Ergebnisverzeichnissen der Suiten
+
+        Ohne suite_dirs werden alle Unterverzeichnisse von RESULTS_DIR gelesen.
+        """
+        if suite_dirs is None:
+            results_path = Path(config.test_config.results_dir)
+            suite_dirs = [path for path in results_path.iterdir()
+                          if path.is_dir() and path.name != "runs"] if results_path.is_dir() else []
+        history = defaultdict(list)
+        suite_history = defaultdict(list)
+        for suite_dir in suite_dirs:
+            for result_file in Path(suite_dir).glob("*.json"):
+                try:
+                    with open(result_file, "r", encoding="utf-8") as f:
+                        data = json.load(f)
+                except (OSError, ValueError):
+                    continue
+                if not isinstance(data, dict) or data.get("status") not in _HISTORY_STATUSES:
+                    continue
+                duration = data.get("duration")
+                if not isinstance(duration, (int, float)) or duration <= 0:
+                    continue
+                history[data.get("test_name")].append(float(duration))
+                suite_history[data.get("test_type") or Path(suite_dir).name].append(float(duration))
+        self._history = dict(history)
+        self._suite_history = dict(suite_history)
+        return self._history
+
+    def estimate_duration(self, test: PlannedTest) -> Tuple[Optional[float], str]:
+        """Geschätzte Dauer eines Tests und ihre Quelle ("test", "suite" oder "none")"""
+        if self._history is None:
+            self.load_history()
+        durations = self._history.get(test.test_name)
+        if durations:
+            return sum(durations) / len(durations), "test"
+        durations = self._suite_history.get(test.suite)
+        if durations:
+            return sum(durations) / len(durations), "suite"
+        return None, "none"
+
+    @staticmethod
+    def _parallelism(tests: List[PlannedTest], slots: int) -> int:
+        """Gleichzeitig laufende Tests einer Suite auf einem Endpunkt"""
+        groups = len({test.group for test in tests})
+        max_model_workers = config.test_config.max_model_workers
+        if max_model_workers > 0:
+            groups = min(groups, max_model_workers)
+        max_workers = config.test_config.max_workers
+        per_group = max_workers if max_workers > 0 else len(tests)
+        parallelism = min(len(tests), groups * per_group)
+        if slots > 0:
+            parallelism = min(parallelism, slots)
+        return max(1, parallelism)
+
+    def plan(self, planned: Dict[str, List[PlannedTest]], suite_dirs: Optional[List[Path]] = None,
+             parallel: bool = False) -> Dict[str, Any]:
+        """Fasse die geplanten Tests pro Suite und Endpunkt zusammen und schätze die Laufzeit"""
+        self.load_history(suite_dirs)
+
+        endpoints: Dict[str, Dict[str, Any]] = {}
+        suites: Dict[str, Dict[str, Any]] = {}
+        for suite_name, tests in planned.items():
+            suite_plan = {
+                "tests": len(tests),
+                "requests": sum(sum(test.requests.values()) for test in tests),
+                "judge_calls": sum(test.judge_calls for test in tests),
+                "models": len({test.group for test in tests}),
+                "estimated_duration": 0.0,
+                "without_history": 0
+            }
+            by_endpoint: Dict[str, List[PlannedTest]] = defaultdict(list)
+            for test in tests:
+                by_endpoint[test.endpoint].append(test)
+                for base_url, count in test.requests.items():
+                    endpoint = endpoints.setdefault(base_url, {
+                        "tests": 0, "requests": 0, "slots": work_scheduler.slots_for(base_url)
+                    })
+                    endpoint["requests"] += count
+                endpoints.setdefault(test.endpoint, {
+                    "tests": 0, "requests": 0, "slots": work_scheduler.slots_for(test.endpoint)
+                })["tests"] += 1
+
+            # Endpunkte arbeiten gleichzeitig, die Suite dauert so lange wie der langsamste
+            for endpoint, endpoint_tests in by_endpoint.items():
+                durations = []
+                for test in endpoint_tests:
+                    duration, _ = self.estimate_duration(test)
+                    if duration is None:
+                        suite_plan["without_history"] += 1
+                    else:
+                        durations.append(duration)
+                if not durations:
+                    continue
+                parallelism = self._parallelism(endpoint_tests, work_scheduler.slots_for(endpoint))
+                estimate = max(sum(durations) / parallelism, max(durations))
+                suite_plan["estimated_duration"] = max(suite_plan["estimated_duration"], estimate)
+            suites[suite_name] = suite_plan
+
+        suite_durations = [suite["estimated_duration"] for suite in suites.values()]
+        judge_url = key_manager.get_base_url("evaluation")
+        return {
+            "suites": suites,
+            "endpoints": endpoints,
+            "judge": {
+                "endpoint": judge_url,
+                "calls": sum(suite["judge_calls"] for suite in suites.values()),
+                "slots": work_scheduler.slots_for(judge_url, JUDGE_POOL)
+            },
+            "total_tests": sum(suite["tests"] for suite in suites.values()),
+            "total_requests": sum(suite["requests"] for suite in suites.values()),
+            "without_history": sum(suite["without_history"] for suite in suites.values()),
+            "history_tests": len(self._history),
+            "parallel": parallel,
+            # Parallele Suiten teilen sich die Endpunkte, die Schätzung ist dann eine Untergrenze
+            "estimated_duration": (max(suite_durations, default=0.0) if parallel
+                                   else sum(suite_durations))
+        }
+
+# Globale Instanz
+run_planner = RunPlanner()
@@ -0,0 +1,174 @@
+"""
+Vorberechneter Index für Referenztexte
+"""
+import re
+import json
+import atexit
+import hashlib
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+from config import config
+from .metrics import tokenize, rouge_tokenize, count_ngrams
+
+# Token-Muster des TfidfVectorizer (Standardeinstellung)
+TERM_PATTERN = re.compile(r"(?u)\b\w\w+\b")
+
+# Wird erhöht, sobald sich die gespeicherten Felder ändern
+INDEX_VERSION = 2
+
+def normalize_text(text: str) -> str:
+    """Normalisiere einen Text wie vor dem Vergleich (Kleinschreibung, Leerraum)"""
+    return re.sub(r'\s+', ' ', text.lower().strip())
+
+@dataclass
+class ReferenceEntry:
+    """Vorverarbeitete Referenz: normalisierter Text, Termvektor, Token und N-Gramme"""
+    content_hash: str
+    text: str
+    normalized: str
+    terms: Dict[str, int]  # Termhäufigkeiten im Merkmalsraum des TfidfVectorizer
+    term_square_sum: float
+    tokens: List[str]  # Wort-Token für BLEU
+    ngram_counts: Dict[int, Counter]
+    rouge_tokens: List[str]  # Gestemmte Token für ROUGE-L
+
+    @classmethod
+    def build(cls, text: str, content_hash: str) -> "ReferenceEntry":
+        """Verarbeite einen Referenztext vollständig vor"""
+        normalized = normalize_text(text)
+        terms = Counter(TERM_PATTERN.findall(normalized))
+        tokens = tokenize(text)
+
+        return cls(
+            content_hash=content_hash,
+            text=text,
+            normalized=normalized,
+            terms=dict(terms),
+            term_square_sum=float(sum(count * count for count in terms.values())),
+            tokens=tokens,
+            ngram_counts=count_ngrams(tokens),
+            rouge_tokens=rouge_tokenize(text)
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialisiere den Eintrag für die persistente Ablage"""
+        return {
+            "text": self.text,
+            "normalized": self.normalized,
+            "terms": self.terms,
+            "term_square_sum": self.term_square_sum,
+            "tokens": self.tokens,
+            "rouge_tokens": self.rouge_tokens
+        }
+
+    @classmethod
+    def from_dict(cls, content_hash: str, data: Dict[str, Any]) -> "ReferenceEntry":
+        """Stelle einen gespeicherten Eintrag wieder her (N-Gramme werden aus den Token gezählt)"""
+        tokens = data["tokens"]
+        return cls(
+            content_hash=content_hash,
+            text=data["text"],
+            normalized=data["normalized"],
+            terms=data["terms"],
+            term_square_sum=data["term_square_sum"],
+            tokens=tokens,
+            ngram_counts=count_ngrams(tokens),
+            rouge_tokens=data["rouge_tokens"]
+        )
+
+class ReferenceIndex:
+    """Index der Referenztexte, einmal pro Lauf aufgebaut und nach Inhalts-Hash gespeichert
+
+    Referenzdateien und erwartete Texte werden nur einmal gelesen und vorverarbeitet.
+    Vergleiche müssen danach nur noch die generierte Antwort verarbeiten.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self._entries: Dict[str, ReferenceEntry] = {}
+        self._stored: Optional[Dict[str, Any]] = None
+        self._files: Dict[Tuple[str, float], str] = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def content_hash(text: str) -> str:
+        """Berechne den Inhalts-Hash eines Referenztexts"""
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def _load_stored(self) -> Dict[str, Any]:
+        """Lade die gespeicherten Einträge beim ersten Zugriff"""
+        if self._stored is None:
+            self._stored = {}
+            if self.path.exists():
+                try:
+                    with open(self.path, "r", encoding="utf-8") as f:
+                        data = json.load(f)
+                    if data.get("version") == INDEX_VERSION:
+                        self._stored = data.get("entries", {})
+                except (OSError, ValueError) as e:
+                    print(f"Fehler beim Laden des Referenzindex {self.path}: {e}")
+        return self._stored
+
+    def get(self, text: str) -> ReferenceEntry:
+        """Hole den vorverarbeiteten Eintrag eines Referenztexts"""
+        content_hash = self.content_hash(text)
+
+        with self._lock:
+            entry = self._entries.get(content_hash)
+            if entry is not None:
+                return entry
+
+            stored = self._load_stored().get(content_hash)
+            if stored is not None:
+                entry = ReferenceEntry.from_dict(content_hash, stored)
+            else:
+                entry = ReferenceEntry.build(text, content_hash)
+                self._dirty = True
+
+            self._entries[content_hash] = entry
+            return entry
+
+    def read_file(self, filename: str) -> str:
+        """Lese eine Referenzdatei einmal pro Lauf und nimm sie in den Index auf"""
+        file_key = (str(Path(filename).resolve()), Path(filename).stat().st_mtime)
+
+        with self._lock:
+            text = self._files.get(file_key)
+        if text is None:
+            with open(filename, 'r', encoding='utf-8') as f:
+                text = f.read().strip()
+            with self._lock:
+                self._files[file_key] = text
+
+        self.get(text)
+        return text
+
+    def save(self) -> None:
+        """Speichere neu aufgenommene Einträge"""
+        with self._lock:
+            if not self._dirty:
+                return
+            entries = dict(self._load_stored())
+            entries.update({content_hash: entry.to_dict() for content_hash, entry in self._entries.items()})
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.path, "w", encoding="utf-8") as f:
+                    json.dump({"version": INDEX_VERSION, "entries": entries}, f, ensure_ascii=False)
+                self._stored = entries
+                self._dirty = False
+            except OSError as e:
+                print(f"Fehler beim Speichern des Referenzindex {self.path}: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hole die Anzahl der Einträge und gelesenen Dateien"""
+        with self._lock:
+            return {"entries": len(self._entries), "files": len(self._files)}
+
+# Globale Indexinstanz
+reference_index = ReferenceIndex(config.test_config.reference_index_path)
+atexit.register(reference_index.save)
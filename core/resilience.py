@@ -0,0 +1,382 @@
+"""
+Wiederholungen, Backoff und Circuit Breaker für alle Modellaufrufe
+"""
+import time
+import random
+import asyncio
+import threading
+from dataclasses import dataclass
+from functools import partial
+from typing import Dict, Any, Optional
+
+import httpx
+
+from .deadlines import deadlines
+from .adaptive_limiter import AdaptiveLimiter
+
+# HTTP Status Codes, bei denen eine Anfrage wiederholt wird
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# HTTP Status Codes, mit denen ein Endpunkt Überlastung meldet (verkleinern das adaptive Fenster)
+OVERLOAD_STATUS_CODES = {429, 503}
+
+# Verbindungsfehler, bei denen eine Anfrage wiederholt wird
+RETRYABLE_EXCEPTIONS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.RemoteProtocolError)
+
+class CircuitOpenError(httpx.TransportError):
+    """Endpunkt ist als nicht erreichbar markiert, die Anfrage wird sofort abgelehnt"""
+
+class DeadlineExceededError(httpx.TimeoutException):
+    """Das Zeitbudget des Tests oder des Laufs ist abgelaufen, die Anfrage wird abgebrochen"""
+
+@dataclass
+class RetryPolicy:
+    """Wiederholungsstrategie mit exponentiellem Backoff und Jitter"""
+    max_retries: int = 3
+    backoff_base: float = 0.5  # Sekunden
+    backoff_max: float = 20.0  # Sekunden
+
+    def get_delay(self, attempt: int, response: Optional[httpx.Response] = None) -> float:
+        """Berechne die Wartezeit vor dem nächsten Versuch (Full Jitter, Retry-After wird beachtet)"""
+        if response is not None:
+            retry_after = response.headers.get("retry-after")
+            if retry_after:
+                try:
+                    return min(self.backoff_max, max(0.0, float(retry_after)))
+                except ValueError:
+                    pass
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+class CircuitBreaker:
+    """Circuit Breaker pro Endpunkt mit Half-Open Probing
+
+    closed:    Anfragen laufen normal, aufeinanderfolgende Fehler werden gezählt
+    open:      Anfragen werden sofort abgelehnt, bis reset_timeout abgelaufen ist
+    half_open: Eine einzelne Probeanfrage entscheidet über Schließen oder erneutes Öffnen
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.rejected_requests = 0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def before_request(self) -> None:
+        """Prüfe ob eine Anfrage erlaubt ist, sonst CircuitOpenError"""
+        with self._lock:
+            if self.state == "open":
+                if time.time() - self.opened_at < self.reset_timeout:
+                    self.rejected_requests += 1
+                    raise CircuitOpenError(f"Circuit Breaker offen für {self.name}")
+                self.state = "half_open"
+                print(f"Circuit Breaker {self.name}: half-open, sende Probeanfrage")
+
+            if self.state == "half_open":
+                if self._probe_in_flight:
+                    self.rejected_requests += 1
+                    raise CircuitOpenError(f"Circuit Breaker half-open für {self.name}, Probeanfrage läuft")
+                self._probe_in_flight = True
+
+    def record_success(self) -> None:
+        """Erfolgreiche Antwort des Endpunkts"""
+        with self._lock:
+            if self.state != "closed":
+                print(f"Circuit Breaker {self.name}: geschlossen, Endpunkt wieder erreichbar")
+            self.state = "closed"
+            self.consecutive_failures = 0
+            self._probe_in_flight = False
+
+    def cancel_request(self) -> None:
+        """Anfrage wurde abgebrochen, ohne den Endpunkt zu bewerten"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        """Fehlgeschlagene Anfrage (Verbindungsfehler, Timeout oder 5xx)"""
+        with self._lock:
+            self.consecutive_failures += 1
+            self._probe_in_flight = False
+            if self.state == "half_open" or self.consecutive_failures >= self.failure_threshold:
+                if self.state != "open":
+                    print(f"Circuit Breaker {self.name}: geöffnet nach {self.consecutive_failures} Fehlern")
+                self.state = "open"
+                self.opened_at = time.time()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hole den Zustand des Circuit Breakers"""
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.consecutive_failures,
+                "rejected_requests": self.rejected_requests
+            }
+
+class _SlotReleasingStream(httpx.SyncByteStream):
+    """Antwortstrom, der den Endpunkt-Platz erst nach dem Lesen oder Schließen freigibt
+
+    finish wird beim Schließen genau einmal aufgerufen, mit dem Fehler beim
+    Lesen oder None. Erst dann ist auch eine gestreamte Antwort vollständig.
+    """
+
+    def __init__(self, stream: httpx.SyncByteStream, finish):
+        self._stream = stream
+        self._finish = finish
+        self._error: Optional[BaseException] = None
+
+    def __iter__(self):
+        try:
+            yield from self._stream
+        except Exception as e:
+            self._error = e
+            raise
+
+    def close(self) -> None:
+        try:
+            self._stream.close()
+        finally:
+            finish, self._finish = self._finish, None
+            if finish is not None:
+                finish(self._error)
+
+class _AsyncSlotReleasingStream(httpx.AsyncByteStream):
+    """Asynchroner Antwortstrom, der den Endpunkt-Platz erst nach dem Lesen oder Schließen freigibt"""
+
+    def __init__(self, stream: httpx.AsyncByteStream, finish):
+        self._stream = stream
+        self._finish = finish
+        self._error: Optional[BaseException] = None
+
+    async def __aiter__(self):
+        try:
+            async for chunk in self._stream:
+                yield chunk
+        except Exception as e:
+            self._error = e
+            raise
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            finish, self._finish = self._finish, None
+            if finish is not None:
+                finish(self._error)
+
+async def _acquire_async(limiter: AdaptiveLimiter, timeout: Optional[float] = None) -> bool:
+    """Belege einen Platz einer threadübergreifenden Begrenzung ohne die Ereignisschleife zu blockieren"""
+    if limiter.acquire(blocking=False):
+        return True
+    acquired = asyncio.get_running_loop().run_in_executor(None, partial(limiter.acquire, timeout=timeout))
+    try:
+        return await asyncio.shield(acquired)
+    except asyncio.CancelledError:
+        # Der wartende Thread belegt den Platz trotzdem; sofort wieder freigeben
+        acquired.add_done_callback(lambda future: future.result() and limiter.release())
+        raise
+
+class _ResilienceMixin:
+    """Gemeinsame Entscheidungslogik der synchronen und asynchronen Transports"""
+
+    def _record_response(self, response: httpx.Response) -> bool:
+        """Werte eine Antwort aus und gib zurück, ob sie wiederholt werden soll"""
+        if response.status_code >= 500:
+            self.breaker.record_failure()
+        else:
+            # Auch 429 und andere 4xx zeigen, dass der Endpunkt erreichbar ist
+            self.breaker.record_success()
+        return response.status_code in RETRYABLE_STATUS_CODES
+
+    def _observe(self, started: float, response: Optional[httpx.Response] = None,
+                 error: Optional[BaseException] = None) -> None:
+        """Melde Latenz bzw. Überlastung eines Versuchs an die adaptive Begrenzung
+
+        Bei einer Antwort erst nach dem Lesen des Körpers aufrufen, sonst wäre
+        die Latenz gestreamter Antworten nur die Zeit bis zu den Headern.
+        """
+        if error is not None:
+            # Nur echte Timeouts zeigen Überlastung, nicht das Ende des Zeitbudgets
+            if isinstance(error, httpx.TimeoutException) and not deadlines.expired():
+                self.limiter.record(started, None, overloaded=True)
+            return
+        overloaded = response.status_code in OVERLOAD_STATUS_CODES
+        latency = time.monotonic() - started if response.status_code < 400 else None
+        self.limiter.record(started, latency, overloaded=overloaded)
+
+    def _finish_callback(self, started: float, response: httpx.Response):
+        """Abschluss einer Antwort: Latenz bis zum Ende des Körpers melden und den Platz freigeben"""
+        def finish(error: Optional[BaseException] = None) -> None:
+            try:
+                self._observe(started, response, error)
+            finally:
+                self.limiter.release()
+        return finish
+
+    @staticmethod
+    def _apply_deadline(request: httpx.Request) -> Optional[float]:
+        """Begrenze die Timeouts der Anfrage auf das verbleibende Zeitbudget (None = unbegrenzt)"""
+        time_left = deadlines.time_left()
+        if time_left is None:
+            return None
+        if time_left <= 0:
+            raise DeadlineExceededError("Zeitbudget abgelaufen, Anfrage wird nicht gesendet", request=request)
+
+        timeout = request.extensions.get("timeout", {})
+        request.extensions["timeout"] = {
+            key: time_left if timeout.get(key) is None else min(timeout[key], time_left)
+            for key in ("connect", "read", "write", "pool")
+        }
+        return time_left
+
+    @staticmethod
+    def _fits_deadline(delay: float) -> bool:
+        """Prüfe ob nach einer Wartezeit noch Zeitbudget für einen weiteren Versuch bleibt"""
+        time_left = deadlines.time_left()
+        return time_left is None or delay < time_left
+
+class ResilientTransport(_ResilienceMixin, httpx.BaseTransport):
+    """httpx Transport mit Wiederholungen und Circuit Breaker über einem gemeinsamen Verbindungspool"""
+
+    def __init__(self, transport: httpx.BaseTransport, breaker: CircuitBreaker,
+                 policy: RetryPolicy, owns_transport: bool = False,
+                 limiter: Optional[AdaptiveLimiter] = None):
+        self._transport = transport
+        self.breaker = breaker
+        self.policy = policy
+        self._owns_transport = owns_transport
+        self.limiter = limiter
+
+    def _send(self, request: httpx.Request) -> httpx.Response:
+        """Sende einen Versuch und belege dabei einen Platz des Endpunkts (bis die Antwort gelesen ist)"""
+        time_left = self._apply_deadline(request)
+        if self.limiter is None:
+            return self._transport.handle_request(request)
+
+        if not self.limiter.acquire(timeout=time_left):
+            raise DeadlineExceededError("Zeitbudget beim Warten auf einen Endpunkt-Platz abgelaufen", request=request)
+        started = time.monotonic()
+        try:
+            response = self._transport.handle_request(request)
+        except BaseException as e:
+            self._observe(started, error=e)
+            self.limiter.release()
+            raise
+        response.stream = _SlotReleasingStream(response.stream, self._finish_callback(started, response))
+        return response
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        attempt = 0
+        while True:
+            self.breaker.before_request()
+            try:
+                response = self._send(request)
+            except DeadlineExceededError:
+                self.breaker.cancel_request()
+                raise
+            except httpx.TransportError as e:
+                if deadlines.expired():
+                    # Ein durch das Zeitbudget verkürzter Timeout zählt nicht als Fehler des Endpunkts
+                    self.breaker.cancel_request()
+                    raise DeadlineExceededError(f"Zeitbudget während der Anfrage abgelaufen ({type(e).__name__})", request=request) from e
+                self.breaker.record_failure()
+                delay = self.policy.get_delay(attempt)
+                if (not isinstance(e, RETRYABLE_EXCEPTIONS) or attempt >= self.policy.max_retries
+                        or not self._fits_deadline(delay)):
+                    raise
+                time.sleep(delay)
+                attempt += 1
+                continue
+            except BaseException:
+                self.breaker.cancel_request()
+                raise
+
+            if not self._record_response(response) or attempt >= self.policy.max_retries:
+                return response
+
+            delay = self.policy.get_delay(attempt, response)
+            if not self._fits_deadline(delay):
+                # Kein Budget für einen weiteren Versuch, die letzte Antwort zählt
+                return response
+            response.close()
+            time.sleep(delay)
+            attempt += 1
+
+    def close(self) -> None:
+        # Der gemeinsame Pool wird vom Client-Register geschlossen
+        if self._owns_transport:
+            self._transport.close()
+
+class ResilientAsyncTransport(_ResilienceMixin, httpx.AsyncBaseTransport):
+    """Asynchroner httpx Transport mit Wiederholungen und Circuit Breaker"""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, breaker: CircuitBreaker,
+                 policy: RetryPolicy, owns_transport: bool = True,
+                 limiter: Optional[AdaptiveLimiter] = None):
+        self._transport = transport
+        self.breaker = breaker
+        self.policy = policy
+        self._owns_transport = owns_transport
+        self.limiter = limiter
+
+    async def _send(self, request: httpx.Request) -> httpx.Response:
+        """Sende einen Versuch und belege dabei einen Platz des Endpunkts (bis die Antwort gelesen ist)"""
+        time_left = self._apply_deadline(request)
+        if self.limiter is None:
+            return await self._transport.handle_async_request(request)
+
+        if not await _acquire_async(self.limiter, time_left):
+            raise DeadlineExceededError("Zeitbudget beim Warten auf einen Endpunkt-Platz abgelaufen", request=request)
+        started = time.monotonic()
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException as e:
+            self._observe(started, error=e)
+            self.limiter.release()
+            raise
+        response.stream = _AsyncSlotReleasingStream(response.stream, self._finish_callback(started, response))
+        return response
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        attempt = 0
+        while True:
+            self.breaker.before_request()
+            try:
+                response = await self._send(request)
+            except DeadlineExceededError:
+                self.breaker.cancel_request()
+                raise
+            except httpx.TransportError as e:
+                if deadlines.expired():
+                    # Ein durch das Zeitbudget verkürzter Timeout zählt nicht als Fehler des Endpunkts
+                    self.breaker.cancel_request()
+                    raise DeadlineExceededError(f"Zeitbudget während der Anfrage abgelaufen ({type(e).__name__})", request=request) from e
+                self.breaker.record_failure()
+                delay = self.policy.get_delay(attempt)
+                if (not isinstance(e, RETRYABLE_EXCEPTIONS) or attempt >= self.policy.max_retries
+                        or not self._fits_deadline(delay)):
+                    raise
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            except BaseException:
+                self.breaker.cancel_request()
+                raise
+
+            if not self._record_response(response) or attempt >= self.policy.max_retries:
+                return response
+
+            delay = self.policy.get_delay(attempt, response)
+            if not self._fits_deadline(delay):
+                # Kein Budget für einen weiteren Versuch, die letzte Antwort zählt
+                return response
+            await response.aclose()
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def aclose(self) -> None:
+        if self._owns_transport:
+            await self._transport.aclose()
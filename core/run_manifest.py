@@ -0,0 +1,114 @@
+"""
+Laufmanifest für das Fortsetzen unterbrochener Testläufe
+"""
+import os
+import json
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+from config import config
+
+# Status, die beim Fortsetzen als abgeschlossen gelten; Tests mit Fehlern werden wiederholt
+COMPLETED_STATUSES = ("success", "failed")
+
+class RunManifest:
+    """Hält pro Lauf fest, welche (Suite, Modell, Test) Einträge abgeschlossen sind
+
+    Nach jedem geloggten Testergebnis wird das Manifest unter
+    RESULTS_DIR/runs/<run_id>.json atomar neu geschrieben. Bricht ein Lauf ab,
+    überspringt main.py --resume <run_id> die abgeschlossenen Tests und lädt
+    deren Ergebnisse aus den gespeicherten Ergebnisdateien.
+    """
+
+    def __init__(self):
+        self.run_id: Optional[str] = None
+        self.path: Optional[Path] = None
+        self.resumed = False
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._created: Optional[str] = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def manifest_path(run_id: str) -> Path:
+        """Pfad des Manifests eines Laufs"""
+        return Path(config.test_config.results_dir) / "runs" / f"{run_id}.json"
+
+    def start(self, run_id: Optional[str] = None, resume: bool = False) -> str:
+        """Beginne einen neuen Lauf oder lade das Manifest eines abgebrochenen Laufs"""
+        run_id = run_id or datetime.now().strftime("%Y%m%d_%H%M%S")
+        path = self.manifest_path(run_id)
+
+        with self._lock:
+            self.run_id = run_id
+            self.path = path
+            self.resumed = resume
+            self._entries = {}
+            self._created = datetime.now().isoformat()
+
+            if resume:
+                if not path.exists():
+                    raise ValueError(f"Kein Laufmanifest für {run_id} gefunden: {path}")
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                self._created = data.get("created", self._created)
+                self._entries = data.get("completed", {})
+        return run_id
+
+    def record(self, test_name: str, suite_name: str, status: str, result_file: Path) -> None:
+        """Vermerke ein geloggtes Testergebnis und schreibe das Manifest"""
+        if self.run_id is None:
+            return
+
+        with self._lock:
+            self._entries[test_name] = {
+                "suite": suite_name,
+                "status": status,
+                "result_file": str(result_file),
+                "recorded": datetime.now().isoformat()
+            }
+            self._write_locked()
+
+    def completed_result_file(self, test_name: str) -> Optional[Path]:
+        """Ergebnisdatei eines im fortgesetzten Lauf bereits abgeschlossenen Tests (sonst None)"""
+        if not self.resumed:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(test_name)
+        if entry is None or entry["status"] not in COMPLETED_STATUSES:
+            return None
+        result_file = Path(entry["result_file"])
+        return result_file if result_file.exists() else None
+
+    def _write_locked(self) -> None:
+        """Schreibe das Manifest über eine temporäre Datei, damit ein Abbruch es nicht beschädigt"""
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = self.path.with_suffix(".tmp")
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump({
+                    "run_id": self.run_id,
+                    "created": self._created,
+                    "updated": datetime.now().isoformat(),
+                    "completed": self._entries
+                }, f, ensure_ascii=False, indent=2)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            print(f"Fehler beim Schreiben des Laufmanifests {self.path}: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hole Lauf-ID und Anzahl der vermerkten Tests"""
+        with self._lock:
+            statuses: List[str] = [entry["status"] for entry in self._entries.values()]
+            return {
+                "run_id": self.run_id,
+                "path": str(self.path) if self.path else None,
+                "resumed": self.resumed,
+                "recorded": len(statuses),
+                "completed": sum(status in COMPLETED_STATUSES for status in statuses)
+            }
+
+# Globale Manifestinstanz
+run_manifest = RunManifest()
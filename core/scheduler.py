@@ -0,0 +1,204 @@
+"""
+Endpunktbezogene Ablaufsteuerung für Testaufträge
+"""
+import threading
+import contextvars
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Callable, Hashable, Tuple
+
+from config import config
+from .adaptive_limiter import AdaptiveLimiter
+
+# Eigener Kapazitätspool für Anfragen an das Bewertungsmodell
+JUDGE_POOL = "judge"
+
+def pool_for_service(service: str) -> Optional[str]:
+    """Bestimme den Kapazitätspool der Anfragen eines Dienstes (None = Pool des Endpunkts)"""
+    return JUDGE_POOL if service == "evaluation" else None
+
+@dataclass
+class _WorkItem:
+    """Ein eingereihter Auftrag mit seinem Ergebnis-Future"""
+    func: Callable
+    args: Tuple[Any, ...]
+    group: Hashable
+    group_limit: int
+    context: contextvars.Context
+    future: Future = field(default_factory=Future)
+
+class EndpointPool:
+    """Kapazität eines Endpunkts: Plätze, Warteschlangen pro Gruppe und Zähler"""
+
+    def __init__(self, name: str, slots: int, limiter: Optional[AdaptiveLimiter] = None):
+        self.name = name
+        self.slots = slots  # 0 = unbegrenzt
+        self.limiter = limiter  # Adaptive Begrenzung der Anfragen: deren Fenster ersetzt slots
+        self.active = 0
+        self.peak_active = 0
+        self.completed = 0
+        self._queues: "OrderedDict[Hashable, deque]" = OrderedDict()
+        self._group_active: Dict[Hashable, int] = {}
+
+    @property
+    def current_slots(self) -> int:
+        """Plätze des Endpunkts, bei adaptiver Begrenzung das aktuelle Fenster"""
+        if self.limiter is not None and self.limiter.adaptive:
+            return self.limiter.limit
+        return self.slots
+
+    def has_free_slot(self) -> bool:
+        slots = self.current_slots
+        return slots <= 0 or self.active < slots
+
+    def enqueue(self, item: _WorkItem) -> None:
+        self._queues.setdefault(item.group, deque()).append(item)
+
+    def next_item(self) -> Optional[_WorkItem]:
+        """Wähle reihum den nächsten Auftrag einer Gruppe, die ihr eigenes Limit nicht erreicht hat"""
+        for group, queue in self._queues.items():
+            item = queue[0]
+            if item.group_limit > 0 and self._group_active.get(group, 0) >= item.group_limit:
+                continue
+            queue.popleft()
+            if queue:
+                # Gruppe ans Ende stellen, damit sich Suiten und Modelle einen Endpunkt fair teilen
+                self._queues.move_to_end(group)
+            else:
+                del self._queues[group]
+            return item
+        return None
+
+    def start(self, item: _WorkItem) -> None:
+        self.active += 1
+        self.peak_active = max(self.peak_active, self.active)
+        self._group_active[item.group] = self._group_active.get(item.group, 0) + 1
+
+    def finish(self, item: _WorkItem) -> None:
+        self.active -= 1
+        self.completed += 1
+        self._group_active[item.group] -= 1
+        if not self._group_active[item.group]:
+            del self._group_active[item.group]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "slots": self.current_slots,
+            "active": self.active,
+            "queued": sum(len(queue) for queue in self._queues.values()),
+            "completed": self.completed,
+            "peak_active": self.peak_active
+        }
+
+class WorkScheduler:
+    """Globale Warteschlange für (Suite, Modell, Test) Aufträge, eingeteilt nach base_url
+
+    Jeder Endpunkt hat eine eigene Anzahl an Plätzen. Ein Auftrag startet, sobald
+    sein Endpunkt einen freien Platz hat, unabhängig von anderen Endpunkten. So
+    wartet kein Host, während ein anderer ausgelastet ist. Innerhalb eines
+    Endpunkts werden die Gruppen (Suite und Modell) reihum bedient.
+
+    Zusätzlich verwaltet der Scheduler die Begrenzung gleichzeitiger HTTP-Anfragen
+    pro base_url. Das Bewertungsmodell hat dafür einen eigenen Pool, auch wenn es
+    auf demselben Host wie ein getestetes Modell läuft. Mit ADAPTIVE_CONCURRENCY
+    passen sich diese Begrenzungen per AIMD an (siehe AdaptiveLimiter), und die
+    Plätze der Endpunkte folgen ihrem Fenster.
+    """
+
+    def __init__(self):
+        self._pools: Dict[str, EndpointPool] = {}
+        self._limiters: Dict[Tuple[Optional[str], str], AdaptiveLimiter] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def slots_for(base_url: str, pool: Optional[str] = None) -> int:
+        """Anzahl der Plätze eines Endpunkts bzw. Pools (0 = unbegrenzt)"""
+        if pool == JUDGE_POOL:
+            return config.judge_config.max_concurrency
+        network_config = config.network_config
+        return network_config.endpoint_slots.get(base_url.rstrip("/"), network_config.endpoint_max_concurrency)
+
+    def submit(self, endpoint: str, group: Hashable, func: Callable, *args,
+               group_limit: int = 0) -> Future:
+        """Reihe einen Auftrag für einen Endpunkt ein (group_limit begrenzt die laufenden Aufträge der Gruppe)"""
+        item = _WorkItem(
+            func=func,
+            args=args,
+            group=group,
+            group_limit=group_limit,
+            context=contextvars.copy_context()
+        )
+        with self._lock:
+            pool = self._pools.get(endpoint)
+            if pool is None:
+                pool = self._pools[endpoint] = EndpointPool(
+                    endpoint, self.slots_for(endpoint), self._get_limiter_locked(endpoint, None)
+                )
+            pool.enqueue(item)
+            self._dispatch_locked(pool)
+        return item.future
+
+    def map(self, endpoint: str, group: Hashable, func: Callable, items: List[Any],
+            group_limit: int = 0) -> List[Any]:
+        """Führe func für alle Elemente über den Endpunkt aus, Reihenfolge bleibt erhalten"""
+        futures = [self.submit(endpoint, group, func, item, group_limit=group_limit) for item in items]
+        return [future.result() for future in futures]
+
+    def _dispatch_locked(self, pool: EndpointPool) -> None:
+        """Starte Aufträge, solange der Endpunkt freie Plätze hat"""
+        while pool.has_free_slot():
+            item = pool.next_item()
+            if item is None:
+                return
+            pool.start(item)
+            threading.Thread(
+                target=self._run, args=(pool, item), name=f"work-{pool.name}", daemon=True
+            ).start()
+
+    def _run(self, pool: EndpointPool, item: _WorkItem) -> None:
+        """Führe einen Auftrag im Kontext seines Aufrufers aus und gib den Platz danach frei"""
+        try:
+            if item.future.set_running_or_notify_cancel():
+                try:
+                    item.future.set_result(item.context.run(item.func, *item.args))
+                except BaseException as e:
+                    item.future.set_exception(e)
+        finally:
+            with self._lock:
+                pool.finish(item)
+                self._dispatch_locked(pool)
+
+    def request_limiter(self, base_url: str, pool: Optional[str] = None) -> Optional[AdaptiveLimiter]:
+        """Hole die Begrenzung gleichzeitiger HTTP-Anfragen für eine base_url bzw. den Bewertungspool"""
+        with self._lock:
+            return self._get_limiter_locked(base_url, pool)
+
+    def _get_limiter_locked(self, base_url: str, pool: Optional[str]) -> Optional[AdaptiveLimiter]:
+        network_config = config.network_config
+        slots = self.slots_for(base_url, pool)
+        if slots <= 0 and not network_config.adaptive_concurrency:
+            return None
+        key = (pool, base_url)
+        if key not in self._limiters:
+            self._limiters[key] = AdaptiveLimiter(
+                name=f"{pool or 'endpoint'}:{base_url}",
+                # Ohne feste Plätze beginnt das adaptive Fenster an der Obergrenze
+                limit=slots if slots > 0 else network_config.adaptive_max_concurrency,
+                adaptive=network_config.adaptive_concurrency,
+                min_limit=network_config.adaptive_min_concurrency,
+                max_limit=network_config.adaptive_max_concurrency,
+                latency_factor=network_config.adaptive_latency_factor
+            )
+        return self._limiters[key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hole Auslastung und Durchsatz pro Endpunkt sowie die Fenster der Anfragepools"""
+        with self._lock:
+            return {
+                "endpoints": {name: pool.get_stats() for name, pool in self._pools.items()},
+                "request_pools": {limiter.name: limiter.get_stats() for limiter in self._limiters.values()}
+            }
+
+# Globale Schedulerinstanz
+work_scheduler = WorkScheduler()
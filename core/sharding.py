@@ -0,0 +1,196 @@
+"""
+Deterministische Aufteilung eines Testlaufs auf mehrere Rechner und Zusammenführen der Ergebnisse
+"""
+import json
+import shutil
+import hashlib
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+from .telemetry import Telemetry
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """Lese eine Shard-Angabe der Form i/N (1 <= i <= N)"""
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise ValueError(f"Ungültige Shard-Angabe '{value}', erwartet i/N (z.B. 2/4)")
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"Ungültige Shard-Angabe '{value}', i muss zwischen 1 und N liegen")
+    return index, count
+
+class ShardSelector:
+    """Entscheidet, welche (Suite, Modell, Test) Einträge dieser Rechner ausführt
+
+    Jeder Eintrag wird über den SHA-256 seines vollständigen Testnamens einem
+    Shard zugeordnet. Die Zuordnung hängt weder von der Reihenfolge noch von
+    den übrigen Einträgen ab, daher teilen Rechner mit derselben Konfiguration
+    die Arbeit ohne Absprache lückenlos und überschneidungsfrei auf.
+    """
+
+    def __init__(self):
+        self.index = 1
+        self.count = 1
+
+    def configure(self, index: int, count: int) -> None:
+        self.index = index
+        self.count = count
+
+    @property
+    def enabled(self) -> bool:
+        return self.count > 1
+
+    @property
+    def label(self) -> str:
+        """Kennung für Dateinamen, z.B. shard2of4"""
+        return f"shard{self.index}of{self.count}"
+
+    def shard_of(self, full_test_name: str) -> int:
+        """Shard (1 bis N), dem ein Testeintrag zugeordnet ist"""
+        digest = hashlib.sha256(full_test_name.encode("utf-8")).digest()
+        return int.from_bytes(digest[:8], "big") % self.count + 1
+
+    def owns(self, full_test_name: str) -> bool:
+        """Prüfe ob dieser Rechner den Testeintrag ausführt"""
+        return not self.enabled or self.shard_of(full_test_name) == self.index
+
+def find_shard_result_files(shard_dir: Path) -> Tuple[Optional[Path], Optional[Path]]:
+    """Neueste Datei mit detaillierten Ergebnissen eines Shards und das zugehörige Gesamtergebnis"""
+    detail_files = sorted(
+        (path for path in shard_dir.glob("testsuite_results_*.json")),
+        key=lambda path: path.stat().st_mtime
+    )
+    if not detail_files:
+        return None, None
+    detail_file = detail_files[-1]
+    overall_file = detail_file.with_name(f"overall_{detail_file.name}")
+    return detail_file, overall_file if overall_file.exists() else None
+
+def copy_result_tree(shard_dir: Path, output_dir: Path) -> int:
+    """Kopiere die Ergebnisdateien der Suiten eines Shards in das gemeinsame Verzeichnis"""
+    copied = 0
+    for suite_dir in sorted(path for path in shard_dir.iterdir() if path.is_dir() and path.name != "runs"):
+        for source in suite_dir.rglob("*"):
+            if not source.is_file():
+                continue
+            target = output_dir / source.relative_to(shard_dir)
+            if target.exists():
+                if target.read_bytes() == source.read_bytes():
+                    continue
+                # Gleichnamige Dateien (z.B. test_suite.log) erhalten den Namen des Shards
+                target = target.with_name(f"{target.stem}_{shard_dir.name}{target.suffix}")
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(source, target)
+            copied += 1
+    return copied
+
+def merge_suite_results(shard_results: List[Dict[str, Dict[str, Any]]]) -> Dict[str, Dict[str, Any]]:
+    """Fasse die Suite-Ergebnisse (execution_results) mehrerer Shards zusammen
+
+    Zähler werden addiert, der Durchschnittsscore wird nach Testanzahl
+    gewichtet, die Telemetrie wie in Telemetry.merge_summaries zusammengefasst. Die Dauer einer Suite ist die längste Dauer eines Shards, da
+    die Shards gleichzeitig laufen.
+    """
+    merged: Dict[str, Dict[str, Any]] = {}
+    for execution_results in shard_results:
+        for suite_name, result in execution_results.items():
+            if suite_name not in merged:
+                merged[suite_name] = {
+                    "suite_name": suite_name,
+                    "start_time": result.get("start_time"),
+                    "duration": 0.0,
+                    "summary": {
+                        "suite_name": suite_name,
+                        "total_tests": 0,
+                        "passed": 0,
+                        "failed": 0,
+                        "errors": 0,
+                        "timeouts": 0,
+                        "average_score": 0.0,
+                        "telemetry": {},
+                        "description": result.get("summary", {}).get("description", "")
+                    },
+                    "results_count": 0,
+                    "judge_cache": None,
+                    "status": "completed",
+                    "shards": 0
+                }
+            target = merged[suite_name]
+            target["shards"] += 1
+            target["duration"] = max(target["duration"], result.get("duration", 0.0))
+            if result.get("start_time") and (not target["start_time"] or result["start_time"] < target["start_time"]):
+                target["start_time"] = result["start_time"]
+
+            if "summary" not in result:
+                # Suite ist auf diesem Shard abgebrochen
+                target["status"] = "failed"
+                target["error"] = "; ".join(filter(None, [target.get("error"), result.get("error")]))
+                continue
+
+            summary = result["summary"]
+            merged_summary = target["summary"]
+            tests_before = merged_summary["total_tests"]
+            for key in ("total_tests", "passed", "failed", "errors", "timeouts"):
+                merged_summary[key] += summary.get(key, 0)
+            if merged_summary["total_tests"] > 0:
+                merged_summary["average_score"] = (
+                    merged_summary["average_score"] * tests_before + summary["average_score"] * summary["total_tests"]
+                ) / merged_summary["total_tests"]
+            merged_summary["telemetry"] = Telemetry.merge_summaries([merged_summary["telemetry"], summary.get("telemetry")])
+            target["results_count"] += result.get("results_count", 0)
+            target["judge_cache"] = merge_judge_cache_stats([target["judge_cache"], result.get("judge_cache")])
+
+    for result in merged.values():
+        summary = result["summary"]
+        if result["status"] == "completed" and summary["passed"] != summary["total_tests"]:
+            result["status"] = "failed"
+    return merged
+
+def merge_judge_cache_stats(stats_list: List[Optional[Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+    """Addiere die Treffer und Fehlzugriffe der Bewertungscaches mehrerer Shards"""
+    stats_list = [stats for stats in stats_list if stats]
+    if not stats_list:
+        return None
+    merged = dict(stats_list[0])
+    merged["enabled"] = any(stats.get("enabled") for stats in stats_list)
+    merged["hits"] = sum(stats.get("hits", 0) for stats in stats_list)
+    merged["misses"] = sum(stats.get("misses", 0) for stats in stats_list)
+    lookups = merged["hits"] + merged["misses"]
+    merged["hit_rate"] = merged["hits"] / lookups if lookups else 0.0
+    return merged
+
+def shard_judge_cache_stats(shard: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Bewertungscache eines Shards (ohne Gesamtergebnis der letzte, also vollständigste Stand einer Suite)"""
+    if shard["overall"].get("judge_cache"):
+        return shard["overall"]["judge_cache"]
+    snapshots = [result["judge_cache"] for result in shard["execution_results"].values() if result.get("judge_cache")]
+    return max(snapshots, key=lambda stats: stats.get("hits", 0) + stats.get("misses", 0), default=None)
+
+def merge_scheduler_stats(stats_list: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Fasse die Endpunkt-Auslastung mehrerer Shards zusammen (Aufträge addiert, Spitzen pro Rechner)"""
+    endpoints: Dict[str, Dict[str, Any]] = {}
+    request_pools: Dict[str, Dict[str, Any]] = {}
+    for stats in stats_list:
+        request_pools.update(stats.get("request_pools", {}))
+        for endpoint, endpoint_stats in stats.get("endpoints", {}).items():
+            if endpoint not in endpoints:
+                endpoints[endpoint] = dict(endpoint_stats, active=0, queued=0, completed=0, peak_active=0)
+            endpoints[endpoint]["completed"] += endpoint_stats.get("completed", 0)
+            endpoints[endpoint]["peak_active"] = max(endpoints[endpoint]["peak_active"], endpoint_stats.get("peak_active", 0))
+    return {"endpoints": endpoints, "request_pools": request_pools}
+
+def load_shard(shard_dir: Path) -> Dict[str, Any]:
+    """Lade die gespeicherten Ergebnisse eines Shard-Verzeichnisses"""
+    detail_file, overall_file = find_shard_result_files(shard_dir)
+    if detail_file is None:
+        raise ValueError(f"Keine testsuite_results_*.json in {shard_dir} gefunden")
+    with open(detail_file, "r", encoding="utf-8") as f:
+        execution_results = json.load(f)
+    overall = {}
+    if overall_file is not None:
+        with open(overall_file, "r", encoding="utf-8") as f:
+            overall = json.load(f)
+    return {"dir": shard_dir, "detail_file": detail_file, "execution_results": execution_results, "overall": overall}
+
+# Globale Shard-Auswahl (wird von main.py --shard gesetzt)
+shard_selector = ShardSelector()
@@ -0,0 +1,361 @@
+"""
+Latenz- und Token-Telemetrie pro Modellanfrage
+"""
+import time
+import threading
+import contextvars
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict
+from typing import Dict, Any, List, Optional
+
+from config import config
+from .lazy_imports import get_openai, lazy_module
+
+# Sammelliste der Anfragen des Tests im aktuellen Kontext (None = nicht erfasst)
+_calls: contextvars.ContextVar[Optional[List["CallTelemetry"]]] = contextvars.ContextVar("telemetry_calls", default=None)
+
+CALL_KINDS = ("generation", "judge")
+
+# Textfelder der Antwort, die im Stream stückweise kommen und zusammengesetzt werden
+DELTA_TEXT_FIELDS = ("content", "refusal", "reasoning_content", "reasoning")
+
+# Anfragen mit diesen Parametern werden nie gestreamt: Tool-Aufrufe, Logprobs und
+# Audio kommen im Stream in Teilen, die ChatCompletion wäre nicht vollständig
+UNSTREAMABLE_PARAMS = ("tools", "tool_choice", "functions", "function_call", "logprobs", "top_logprobs", "audio")
+
+@dataclass
+class CallTelemetry:
+    """Messwerte einer Modellanfrage"""
+    kind: str  # "generation" oder "judge"
+    model: str
+    streamed: bool
+    latency: float  # Gesamtdauer der Anfrage in Sekunden
+    time_to_first_token: Optional[float] = None
+    inter_token_mean: Optional[float] = None
+    inter_token_p95: Optional[float] = None
+    inter_token_max: Optional[float] = None
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+    tokens_per_second: Optional[float] = None
+    error: Optional[str] = None
+    shared: int = 1  # Anzahl der Kandidaten einer gebündelten Bewertungsanfrage
+
+def _percentile(values: List[float], fraction: float) -> Optional[float]:
+    """Perzentil einer Werteliste (nächster Rang)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+def _mean(values: List[float]) -> Optional[float]:
+    return sum(values) / len(values) if values else None
+
+class StreamTimer:
+    """Misst einen Stream: Zeit bis zum ersten Token, Abstände zwischen Tokens und usage"""
+
+    def __init__(self, kind: str, model: str):
+        self.kind = kind
+        self.model = model
+        self.started = time.monotonic()
+        self.text = ""
+        self.fields: Dict[str, str] = {}
+        self.finish_reason = None
+        self.usage = None
+        self._first_chunk = None
+        self._token_times: List[float] = []
+
+    def feed(self, chunk) -> str:
+        """Werte einen Chunk aus und gib seinen Textanteil (content) zurück
+
+        Jedes Textfeld zählt als Token für die Zeitmessung, auch die
+        Begründung von Reasoning-Modellen vor der eigentlichen Antwort.
+        """
+        if self._first_chunk is None:
+            self._first_chunk = chunk
+        if getattr(chunk, "usage", None) is not None:
+            self.usage = chunk.usage
+        if not chunk.choices:
+            return ""
+        choice = chunk.choices[0]
+        if choice.finish_reason is not None:
+            self.finish_reason = choice.finish_reason
+        if choice.delta is None:
+            return ""
+        received = False
+        for name in DELTA_TEXT_FIELDS:
+            part = getattr(choice.delta, name, None)
+            if isinstance(part, str) and part:
+                self.fields[name] = self.fields.get(name, "") + part
+                received = True
+        if received:
+            self._token_times.append(time.monotonic())
+        content = choice.delta.content or ""
+        self.text += content
+        return content
+
+    def finish(self, error: Optional[Exception] = None) -> "CallTelemetry":
+        """Erstelle die Messwerte der Anfrage und vermerke sie im aktuellen Test"""
+        ended = time.monotonic()
+        gaps = [later - earlier for earlier, later in zip(self._token_times, self._token_times[1:])]
+        call = CallTelemetry(
+            kind=self.kind,
+            model=self.model,
+            streamed=True,
+            latency=ended - self.started,
+            time_to_first_token=self._token_times[0] - self.started if self._token_times else None,
+            inter_token_mean=_mean(gaps),
+            inter_token_p95=_percentile(gaps, 0.95),
+            inter_token_max=max(gaps, default=None),
+            error=_error_text(error)
+        )
+        _apply_usage(call, self.usage)
+        if call.completion_tokens and self._token_times:
+            # Dekodierrate ab dem ersten Token, die Wartezeit davor ist in time_to_first_token
+            decode_time = ended - self._token_times[0]
+            if decode_time > 0 and call.completion_tokens > 1:
+                call.tokens_per_second = (call.completion_tokens - 1) / decode_time
+        telemetry.record(call)
+        return call
+
+    def completion(self):
+        """Baue aus dem Stream eine ChatCompletion wie bei einer Anfrage ohne Stream"""
+        chat_types = lazy_module("openai.types.chat")
+        first = self._first_chunk
+        return chat_types.ChatCompletion.model_construct(
+            id=getattr(first, "id", ""),
+            object="chat.completion",
+            created=getattr(first, "created", None) or int(time.time()),
+            model=getattr(first, "model", None) or self.model,
+            system_fingerprint=getattr(first, "system_fingerprint", None),
+            choices=[chat_types.chat_completion.Choice.model_construct(
+                index=0,
+                finish_reason=self.finish_reason or "stop",
+                message=chat_types.ChatCompletionMessage.model_construct(
+                    role="assistant", **dict(self.fields, content=self.text)
+                )
+            )],
+            usage=self.usage
+        )
+
+def _error_text(error: Optional[Exception]) -> Optional[str]:
+    return None if error is None else (str(error) or type(error).__name__)
+
+def _apply_usage(call: CallTelemetry, usage) -> None:
+    """Übernimm die Tokenzahlen aus usage, falls der Server sie meldet"""
+    if usage is None:
+        return
+    call.prompt_tokens = getattr(usage, "prompt_tokens", None)
+    call.completion_tokens = getattr(usage, "completion_tokens", None)
+
+class Telemetry:
+    """Misst jede Modellanfrage und ordnet die Messwerte dem laufenden Test zu
+
+    Mit streaming werden Anfragen gestreamt (stream_options.include_usage),
+    damit Zeit bis zum ersten Token und die Abstände zwischen den Tokens
+    messbar sind; der Aufrufer erhält trotzdem eine vollständige
+    ChatCompletion. Lehnt ein Endpunkt das Streaming ab, wird für diese
+    base_url ohne Stream weitergemessen (nur Gesamtlatenz und Tokens).
+    Anfragen mit Tools, Logprobs, Audio oder n > 1 werden nie gestreamt, da die
+    ChatCompletion sonst nicht vollständig nachgebaut würde.
+    Die Messwerte landen in der Sammelliste des aktuellen Kontexts (collect).
+    """
+
+    def __init__(self, streaming: bool = True):
+        self.streaming = streaming
+        self._unstreamable: set = set()
+        self._lock = threading.Lock()
+
+    def configure(self, streaming: bool) -> None:
+        self.streaming = streaming
+
+    @contextmanager
+    def collect(self, calls: Optional[List[CallTelemetry]] = None):
+        """Sammle die Messwerte aller Anfragen im aktuellen Kontext in calls"""
+        calls = calls if calls is not None else []
+        token = _calls.set(calls)
+        try:
+            yield calls
+        finally:
+            _calls.reset(token)
+
+    def record(self, call: CallTelemetry) -> None:
+        """Vermerke die Messwerte einer Anfrage im aktuellen Test"""
+        calls = _calls.get()
+        if calls is not None:
+            calls.append(call)
+
+    def _use_stream(self, client, streamable: bool, request: Dict[str, Any]) -> bool:
+        if not (self.streaming and streamable):
+            return False
+        if any(request.get(name) for name in UNSTREAMABLE_PARAMS) or request.get("n", 1) > 1:
+            return False
+        return self.stream_supported(client)
+
+    def stream_supported(self, client) -> bool:
+        """Prüfe, ob der Endpunkt des Clients Streaming nicht bereits abgelehnt hat"""
+        with self._lock:
+            return str(client.base_url) not in self._unstreamable
+
+    def disable_stream(self, client, error: Exception) -> bool:
+        """Merke den Endpunkt als nicht streamfähig, falls error eine Ablehnung des Streamings ist"""
+        if not isinstance(error, get_openai().BadRequestError) or "stream" not in str(error).lower():
+            return False
+        with self._lock:
+            self._unstreamable.add(str(client.base_url))
+        print(f"Streaming für {client.base_url} nicht unterstützt, messe ohne Stream: {error}")
+        return True
+
+    def _unstreamed_call(self, kind: str, model: str, started: float, response=None,
+                         error: Optional[Exception] = None) -> CallTelemetry:
+        call = CallTelemetry(kind=kind, model=model, streamed=False,
+                             latency=time.monotonic() - started, error=_error_text(error))
+        _apply_usage(call, getattr(response, "usage", None))
+        if call.completion_tokens and call.latency > 0:
+            call.tokens_per_second = call.completion_tokens / call.latency
+        self.record(call)
+        return call
+
+    def chat(self, client, kind: str, streamable: bool = True, **request):
+        """Sende eine Chat-Anfrage und miss sie (gibt immer eine ChatCompletion zurück)"""
+        model = request.get("model", "")
+        if self._use_stream(client, streamable, request):
+            timer = StreamTimer(kind, model)
+            try:
+                stream = client.chat.completions.create(
+                    stream=True, stream_options={"include_usage": True}, **request
+                )
+            except Exception as e:
+                if not self.disable_stream(client, e):
+                    timer.finish(e)
+                    raise
+            else:
+                try:
+                    with stream:
+                        for chunk in stream:
+                            timer.feed(chunk)
+                except Exception as e:
+                    timer.finish(e)
+                    raise
+                timer.finish()
+                return timer.completion()
+
+        started = time.monotonic()
+        try:
+            response = client.chat.completions.create(**request)
+        except Exception as e:
+            self._unstreamed_call(kind, model, started, error=e)
+            raise
+        self._unstreamed_call(kind, model, started, response)
+        return response
+
+    async def achat(self, client, kind: str, streamable: bool = True, **request):
+        """Sende eine Chat-Anfrage über einen AsyncOpenAI Client und miss sie"""
+        model = request.get("model", "")
+        if self._use_stream(client, streamable, request):
+            timer = StreamTimer(kind, model)
+            try:
+                stream = await client.chat.completions.create(
+                    stream=True, stream_options={"include_usage": True}, **request
+                )
+            except Exception as e:
+                if not self.disable_stream(client, e):
+                    timer.finish(e)
+                    raise
+            else:
+                try:
+                    async with stream:
+                        async for chunk in stream:
+                            timer.feed(chunk)
+                except Exception as e:
+                    timer.finish(e)
+                    raise
+                timer.finish()
+                return timer.completion()
+
+        started = time.monotonic()
+        try:
+            response = await client.chat.completions.create(**request)
+        except Exception as e:
+            self._unstreamed_call(kind, model, started, error=e)
+            raise
+        self._unstreamed_call(kind, model, started, response)
+        return response
+
+    @staticmethod
+    def summarize(calls: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Fasse Messwerte (als dict) getrennt nach Generierung und Bewertung zusammen
+
+        Eine gebündelte Bewertungsanfrage steht bei jedem ihrer Kandidaten;
+        Anzahl und Tokens zählen dort anteilig (1/shared).
+        """
+        summary = {}
+        for kind in CALL_KINDS:
+            kind_calls = [call for call in calls if call.get("kind") == kind]
+            if not kind_calls:
+                continue
+            latencies = [call["latency"] for call in kind_calls]
+            ttfts = [call["time_to_first_token"] for call in kind_calls if call.get("time_to_first_token") is not None]
+            gaps = [call["inter_token_mean"] for call in kind_calls if call.get("inter_token_mean") is not None]
+            gap_p95s = [call["inter_token_p95"] for call in kind_calls if call.get("inter_token_p95") is not None]
+            completion_tokens = sum((call.get("completion_tokens") or 0) / call.get("shared", 1) for call in kind_calls)
+            # Durchsatz über alle Anfragen: Tokens / Zeit, die Anfragen mit Tokenangabe gedauert haben
+            rated = [call for call in kind_calls if call.get("tokens_per_second")]
+            decode_time = sum(call["completion_tokens"] / call["tokens_per_second"] / call.get("shared", 1) for call in rated)
+            summary[kind] = {
+                "calls": round(sum(1 / call.get("shared", 1) for call in kind_calls), 2),
+                "streamed_calls": len([call for call in kind_calls if call.get("streamed")]),
+                "errors": len([call for call in kind_calls if call.get("error")]),
+                "latency_mean": _mean(latencies),
+                "latency_p50": _percentile(latencies, 0.5),
+                "latency_p95": _percentile(latencies, 0.95),
+                "ttft_mean": _mean(ttfts),
+                "ttft_p50": _percentile(ttfts, 0.5),
+                "ttft_p95": _percentile(ttfts, 0.95),
+                "inter_token_mean": _mean(gaps),
+                "inter_token_p95": _percentile(gap_p95s, 0.95),
+                "prompt_tokens": round(sum((call.get("prompt_tokens") or 0) / call.get("shared", 1) for call in kind_calls)),
+                "completion_tokens": round(completion_tokens),
+                "tokens_per_second": (
+                    sum(call["completion_tokens"] / call.get("shared", 1) for call in rated) / decode_time
+                    if decode_time > 0 else None
+                )
+            }
+        return summary
+
+    def describe(self, calls: List[CallTelemetry]) -> Dict[str, Any]:
+        """Messwerte eines Tests für TestResult.metadata: einzelne Anfragen und Zusammenfassung"""
+        call_dicts = [asdict(call) for call in calls]
+        return {"calls": call_dicts, **self.summarize(call_dicts)}
+
+    @staticmethod
+    def merge_summaries(summaries: List[Optional[Dict[str, Any]]]) -> Dict[str, Any]:
+        """Fasse Zusammenfassungen mehrerer Shards zusammen
+
+        Zähler und Tokens werden addiert, Mittelwerte nach Anzahl gewichtet,
+        für Perzentile gilt der höchste Wert eines Shards.
+        """
+        merged: Dict[str, Any] = {}
+        for kind in CALL_KINDS:
+            parts = [summary[kind] for summary in summaries if summary and kind in summary]
+            if not parts:
+                continue
+            total = {key: sum(part.get(key, 0) for part in parts)
+                     for key in ("calls", "streamed_calls", "errors", "prompt_tokens", "completion_tokens")}
+            # Zeit bis zum ersten Token und Token-Abstände gibt es nur bei gestreamten Anfragen
+            for key, count in (("latency_mean", "calls"), ("ttft_mean", "streamed_calls"),
+                               ("inter_token_mean", "streamed_calls")):
+                weighted = [(part[key], part[count]) for part in parts if part.get(key) is not None]
+                weight = sum(calls for _, calls in weighted)
+                total[key] = sum(value * calls for value, calls in weighted) / weight if weight else None
+            for key in ("latency_p50", "latency_p95", "ttft_p50", "ttft_p95", "inter_token_p95"):
+                total[key] = max((part[key] for part in parts if part.get(key) is not None), default=None)
+            rated = [part for part in parts if part.get("tokens_per_second")]
+            decode_time = sum(part["completion_tokens"] / part["tokens_per_second"] for part in rated)
+            total["tokens_per_second"] = (
+                sum(part["completion_tokens"] for part in rated) / decode_time if decode_time > 0 else None
+            )
+            merged[kind] = total
+        return merged
+
+# Globale Instanz
+telemetry = Telemetry(streaming=config.test_config.telemetry_streaming)
@@ -0,0 +1,151 @@
+"""
+Aufwärmphase der Modelle vor der Messung
+"""
+import time
+import threading
+import contextvars
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Tuple
+
+from config import config, key_manager
+from .client_registry import client_registry
+from .deadlines import deadlines
+
+WarmupTarget = Tuple[str, str]
+
+@dataclass
+class WarmupResult:
+    """Kosten der Aufwärmphase eines Modells"""
+    service: str
+    model_type: str
+    base_url: str
+    model: str
+    requests: int = 0
+    failures: int = 0
+    duration: float = 0.0
+    latencies: List[float] = field(default_factory=list)
+
+class Warmup:
+    """Sendet vor der Messung Wegwerf-Anfragen an jedes Modell
+
+    Die ersten Anfragen nach einer Pause treffen oft kalte KV-Caches, verzögert
+    geladene Gewichte oder eine hochskalierende Instanz. Pro (base_url, Modell)
+    werden daher einmal pro Lauf requests Anfragen mit den Prompts der Suite
+    gleichzeitig gesendet. Ihre Dauer erscheint getrennt im Gesamtergebnis,
+    die Testdauern enthalten sie nicht. Fragen mehrere Suiten gleichzeitig nach
+    demselben Modell, wartet die zweite auf die laufende Aufwärmphase.
+    """
+
+    def __init__(self, requests: int = 0, max_tokens: int = 32):
+        self.requests = requests
+        self.max_tokens = max_tokens
+        self._runs: Dict[Tuple[str, str], Future] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.requests > 0
+
+    def configure(self, requests: int) -> None:
+        """Ändere die Anzahl der Anfragen pro Modell"""
+        self.requests = requests
+
+    def run(self, service: str, model_type: str, prompts: List[str]) -> WarmupResult:
+        """Wärme ein Modell auf, falls das in diesem Lauf noch nicht geschehen ist"""
+        base_url = key_manager.get_base_url(service, model_type)
+        model = key_manager.get_model(service, model_type)
+        key = (base_url, model)
+
+        with self._lock:
+            future = self._runs.get(key)
+            owner = future is None
+            if owner:
+                future = self._runs[key] = Future()
+
+        if not owner:
+            return future.result()
+
+        result = WarmupResult(service=service, model_type=model_type, base_url=base_url, model=model)
+        try:
+            self._warm_up(result, prompts)
+        except Exception as e:
+            print(f"Aufwärmphase {model_type} fehlgeschlagen: {e}")
+        finally:
+            future.set_result(result)
+        return result
+
+    def _warm_up(self, result: WarmupResult, prompts: List[str]) -> None:
+        """Sende die Anfragen eines Modells gleichzeitig (Zeitbudget wie ein Test)"""
+        client = client_registry.get_client_for(result.service, result.model_type, owner="warmup")
+        start_time = time.time()
+        with deadlines.test_budget(config.test_config.max_test_duration):
+            with ThreadPoolExecutor(max_workers=self.requests, thread_name_prefix="warmup") as executor:
+                # Jede Anfrage erhält eine Kopie des Kontexts mit dem Zeitbudget
+                futures = [
+                    executor.submit(
+                        contextvars.copy_context().run, self._send, client, result.model, prompts[index % len(prompts)]
+                    )
+                    for index in range(self.requests)
+                ]
+                for future in futures:
+                    latency = future.result()
+                    result.requests += 1
+                    if latency is None:
+                        result.failures += 1
+                    else:
+                        result.latencies.append(latency)
+        result.duration = time.time() - start_time
+        print(f"Aufwärmphase {result.model_type} ({result.base_url}): {result.requests} Anfragen "
+              f"in {result.duration:.2f}s, {result.failures} fehlgeschlagen")
+
+    def _send(self, client, model: str, prompt: str):
+        """Sende eine Wegwerf-Anfrage und gib ihre Latenz zurück (None bei Fehlern)"""
+        start_time = time.time()
+        try:
+            client.chat.completions.create(
+                model=model,
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=self.max_tokens,
+                temperature=0.0
+            )
+        except Exception:
+            return None
+        return time.time() - start_time
+
+    def run_many(self, targets: List[WarmupTarget], prompts: List[str]) -> List[WarmupResult]:
+        """Wärme mehrere (Dienst, Modelltyp) Ziele gleichzeitig auf"""
+        if not self.enabled or not targets or not prompts:
+            return []
+        targets = list(dict.fromkeys(targets))
+        with ThreadPoolExecutor(max_workers=len(targets), thread_name_prefix="warmup") as executor:
+            futures = [executor.submit(self.run, service, model_type, prompts) for service, model_type in targets]
+            return [future.result() for future in futures]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hole die Kosten der Aufwärmphase pro Modell und insgesamt"""
+        with self._lock:
+            results = [future.result() for future in self._runs.values() if future.done()]
+        models = {
+            f"{result.model}@{result.base_url}": {
+                "requests": result.requests,
+                "failures": result.failures,
+                "duration": result.duration,
+                "max_latency": max(result.latencies, default=None),
+                "average_latency": sum(result.latencies) / len(result.latencies) if result.latencies else None
+            }
+            for result in results
+        }
+        return {
+            "requests_per_model": self.requests,
+            "models": models,
+            "total_requests": sum(result.requests for result in results),
+            "total_failures": sum(result.failures for result in results),
+            "total_duration": sum(result.duration for result in results)
+        }
+
+# Globale Instanz der Aufwärmphase
+warmup = Warmup(
+    requests=config.test_config.warmup_requests,
+    max_tokens=config.test_config.warmup_max_tokens
+)
@@ -0,0 +1,192 @@
+"""
+Prozesspool für rechenintensive Arbeitsschritte
+"""
+import atexit
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, Future, TimeoutError as FutureTimeoutError, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Any, List, Optional, Callable, Set
+
+from config import config
+from .deadlines import deadlines, DeadlineExceeded
+
+def _initialize_worker() -> None:
+    """Worker-Prozesse schreiben keine gemeinsamen Caches und starten keine eigenen Worker"""
+    from .reference_index import reference_index
+    from .corpus_stats import corpus_stats
+    atexit.unregister(reference_index.save)
+    atexit.unregister(corpus_stats.finish_run)
+    cpu_pool.configure(0)
+
+class CpuWorkerPool:
+    """Koordinator für rechenintensive Schritte (Code-Ausführung, Audio, Bildkodierung, Metriken)
+
+    Der Hauptprozess plant und sendet die Netzwerkanfragen in Threads. Schritte,
+    die das GIL halten, laufen in einem ProcessPoolExecutor und geben nur ihr
+    kompaktes Ergebnis zurück, damit sie die Threads der Netzwerkaufrufe nicht
+    ausbremsen. Mit max_workers=0 werden die Schritte direkt im aufrufenden
+    Thread ausgeführt.
+
+    Die Funktionen müssen auf Modulebene definiert sein, Argumente und
+    Ergebnisse müssen sich mit pickle übertragen lassen.
+    """
+
+    def __init__(self, max_workers: int = 0, start_method: str = "spawn"):
+        self.max_workers = max_workers
+        self.start_method = start_method
+        self.tasks = 0
+        self.failures = 0
+        self.restarts = 0
+        self.timeouts = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pending: Dict[ProcessPoolExecutor, Set[Future]] = {}
+        self._stuck: Dict[ProcessPoolExecutor, Set[Future]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_workers > 0
+
+    def configure(self, max_workers: int) -> None:
+        """Ändere die Anzahl der Worker (vor dem ersten Einsatz)"""
+        with self._lock:
+            self.max_workers = max_workers
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Starte die Worker beim ersten Einsatz"""
+        with self._lock:
+            if self._executor is None:
+                # spawn statt fork: der Koordinator hat bereits Threads und offene Verbindungen
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context(self.start_method),
+                    initializer=_initialize_worker
+                )
+            return self._executor
+
+    def _discard_executor(self, executor: ProcessPoolExecutor) -> None:
+        """Verwirf einen Pool, dessen Worker abgestürzt ist; der nächste Aufruf startet neue Worker"""
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+                self.restarts += 1
+            self._pending.pop(executor, None)
+        executor.shutdown(wait=False)
+
+    def _submit(self, executor: ProcessPoolExecutor, func: Callable, *args, **kwargs) -> Future:
+        """Reiche eine Aufgabe ein und merke sie, solange sie im Pool offen ist"""
+        future = executor.submit(func, *args, **kwargs)
+        with self._lock:
+            self.tasks += 1
+            self._pending.setdefault(executor, set()).add(future)
+
+        def forget(done: Future) -> None:
+            with self._lock:
+                if executor in self._pending:
+                    self._pending[executor].discard(done)
+        future.add_done_callback(forget)
+        return future
+
+    def _retire_executor(self, executor: ProcessPoolExecutor, stuck: Future) -> None:
+        """Ersetze einen Pool, dessen Worker an einer abgelaufenen Aufgabe hängt
+
+        Neue Aufgaben laufen in einem neuen Pool. Die übrigen Aufgaben des alten
+        Pools laufen zu Ende; erst danach werden seine Worker beendet, sodass nur
+        die abgelaufenen Aufgaben abgebrochen werden.
+        """
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+                self.restarts += 1
+            retired = executor in self._stuck
+            self._stuck.setdefault(executor, set()).add(stuck)
+        if retired:
+            return
+
+        def terminate() -> None:
+            while True:
+                with self._lock:
+                    others = self._pending.get(executor, set()) - self._stuck[executor]
+                if not others:
+                    break
+                wait(others, timeout=1.0, return_when=FIRST_COMPLETED)
+            if hasattr(executor, "terminate_workers"):
+                executor.terminate_workers()
+            else:
+                for process in list((getattr(executor, "_processes", None) or {}).values()):
+                    process.terminate()
+            executor.shutdown(wait=False)
+            with self._lock:
+                self._pending.pop(executor, None)
+                self._stuck.pop(executor, None)
+
+        threading.Thread(target=terminate, name="cpu-pool-retire", daemon=True).start()
+
+    def run(self, func: Callable, *args, **kwargs) -> Any:
+        """Führe func in einem Worker-Prozess aus und warte auf das Ergebnis"""
+        if not self.enabled:
+            return func(*args, **kwargs)
+
+        executor = self._get_executor()
+        future = self._submit(executor, func, *args, **kwargs)
+        time_left = deadlines.time_left()
+        try:
+            return future.result(timeout=None if time_left is None else max(0.0, time_left))
+        except FutureTimeoutError:
+            # Noch nicht gestartete Aufgaben werden nur aus der Warteschlange genommen
+            if not future.cancel():
+                self._retire_executor(executor, future)
+            with self._lock:
+                self.timeouts += 1
+            raise DeadlineExceeded(f"Zeitbudget in {getattr(func, '__name__', func)} abgelaufen")
+        except BrokenProcessPool:
+            self._discard_executor(executor)
+            with self._lock:
+                self.failures += 1
+            raise
+        except Exception:
+            with self._lock:
+                self.failures += 1
+            raise
+
+    def map(self, func: Callable, items: List[Any]) -> List[Any]:
+        """Wende func in den Worker-Prozessen auf alle Elemente an, Reihenfolge bleibt erhalten"""
+        if not self.enabled or len(items) <= 1:
+            return [self.run(func, item) for item in items]
+
+        executor = self._get_executor()
+        futures = [self._submit(executor, func, item) for item in items]
+        try:
+            return [future.result() for future in futures]
+        except BrokenProcessPool:
+            self._discard_executor(executor)
+            with self._lock:
+                self.failures += 1
+            raise
+
+    def shutdown(self) -> None:
+        """Beende alle Worker-Prozesse"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hole Anzahl der Worker und ausgeführten Aufgaben"""
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "start_method": self.start_method,
+                "tasks": self.tasks,
+                "failures": self.failures,
+                "restarts": self.restarts,
+                "timeouts": self.timeouts
+            }
+
+# Globale Poolinstanz
+cpu_pool = CpuWorkerPool(
+    max_workers=config.worker_config.cpu_workers,
+    start_method=config.worker_config.start_method
+)
+atexit.register(cpu_pool.shutdown)
@@ -4,32 +4,60 @@ Haupt-Einstiegspunkt für das TestSuite System
 import sys
 import argparse
 import os
+from datetime import datetime
 from pathlib import Path
 
 # Füge das aktuelle Verzeichnis zum Python Path hinzu
 sys.path.insert(0, str(Path(__file__).parent))
 
-# NLTK Ressourcen vorbereiten
-try:
-    import nltk
-    # Prüfe ob punkt_tab bereits vorhanden ist
-    try:
-        nltk.data.find('tokenizers/punkt_tab')
-    except LookupError:
-        print("Lade NLTK punkt_tab Ressource...")
-        nltk.download('punkt_tab', quiet=True)
-        print("NLTK punkt_tab Ressource erfolgreich geladen.")
-except ImportError:
-    print("NLTK nicht installiert. Installiere mit: pip install nltk")
-except Exception as e:
-    print(f"Fehler beim Laden der NLTK Ressourcen: {e}")
-
+# Schwere Abhängigkeiten (scikit-learn, NumPy, NLTK, mistral_common, PyYAML, OpenAI SDK)
+# werden erst beim ersten Gebrauch über core.lazy_imports geladen
 from core.orchestrator import orchestrator
-from core import logger
+from core import logger, judge_cache, run_manifest, shard_selector, cpu_pool, deadlines, warmup, telemetry
+from core.sharding import parse_shard
+from core.lazy_imports import print_startup_profile
 from config import config
 
+def merge_main(argv) -> None:
+    """Unterbefehl merge: Ergebnisse mehrerer Shards zu einem Gesamtergebnis zusammenführen"""
+    parser = argparse.ArgumentParser(
+        prog='testsuite merge',
+        description='Ergebnisverzeichnisse mehrerer Shards (--shard i/N) zusammenführen'
+    )
+    parser.add_argument('shard_dirs',
+                       nargs='+',
+                       help='Ergebnisverzeichnisse der Shards (je ein data/results Baum)')
+    parser.add_argument('--results-dir', '-r',
+                       type=str,
+                       help='Zielverzeichnis für die zusammengeführten Ergebnisse')
+    parser.add_argument('--output', '-o',
+                       type=str,
+                       help='Dateiname des zusammengeführten Ergebnisses')
+    parser.add_argument('--format', '-f',
+                       choices=['json', 'yaml'],
+                       default='json',
+                       help='Ausgabeformat der Ergebnisse (default: json)')
+    args = parser.parse_args(argv)
+    
+    if args.results_dir:
+        config.test_config.results_dir = args.results_dir
+    
+    try:
+        print(f"Führe {len(args.shard_dirs)} Shards zusammen:")
+        overall_result = orchestrator.merge_shards(args.shard_dirs)
+        filename = args.output or f"testsuite_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}_merged.{args.format}"
+        saved_file = orchestrator.save_results(filename, format=args.format, overall_result=overall_result)
+        print(f"\nErgebnisse gespeichert in: {saved_file}")
+    except (OSError, ValueError) as e:
+        print(f"\n\nFEHLER beim Zusammenführen: {e}")
+        sys.exit(1)
+    sys.exit(0)
+
 def main():
     """Hauptfunktion"""
+    if len(sys.argv) > 1 and sys.argv[1] == 'merge':
+        merge_main(sys.argv[2:])
+    
     parser = argparse.ArgumentParser(description='TestSuite System - KI Modell Bewertung')
     parser.add_argument('--suite', '-s',
                        choices=['general_llm', 'coding_model', 'audio_model', 'vlm', 'all'],
@@ -58,6 +86,53 @@ def main():
                        choices=['json', 'yaml'],
                        default='json',
                        help='Ausgabeformat der Ergebnisse (default: json)')
+    parser.add_argument('--no-judge-cache',
+                       action='store_true',
+                       help='Bewertungscache deaktivieren (alle Bewertungen neu anfordern)')
+    parser.add_argument('--profile-startup',
+                       action='store_true',
+                       help='Importzeiten beim Start zusammengefasst ausgeben')
+    parser.add_argument('--judge-mode',
+                       choices=['text', 'logprob', 'stream'],
+                       help='Bewertungsmodus: Freitext, einzelnes Score-Token mit Logprobs oder Streaming mit Abbruch nach dem Urteil')
+    parser.add_argument('--judge-batch-size',
+                       type=int,
+                       help='Antworten auf denselben Prompt gebündelt in einer Bewertungsanfrage bewerten')
+    parser.add_argument('--parallel-suites',
+                       action='store_true',
+                       help='Mehrere Test Suiten gleichzeitig ausführen')
+    parser.add_argument('--max-workers',
+                       type=int,
+                       help='Anzahl gleichzeitig ausgeführter Tests pro Suite')
+    parser.add_argument('--max-model-workers',
+                       type=int,
+                       help='Anzahl gleichzeitig getesteter Modelle pro Suite (0 = alle, 1 = nacheinander)')
+    parser.add_argument('--cpu-workers',
+                       type=int,
+                       help='Worker-Prozesse für rechenintensive Schritte wie Code-Ausführung und Audio-Dekodierung (0 = aus)')
+    parser.add_argument('--resume',
+                       metavar='RUN_ID',
+                       type=str,
+                       help='Abgebrochenen Lauf fortsetzen: abgeschlossene Tests überspringen und ihre Ergebnisse laden')
+    parser.add_argument('--warmup',
+                       metavar='N',
+                       type=int,
+                       help='Wegwerf-Anfragen pro Modell vor der Messung (überschreibt WARMUP_REQUESTS, 0 = aus)')
+    parser.add_argument('--max-test-duration',
+                       metavar='SECONDS',
+                       type=int,
+                       help='Zeitbudget pro Test; danach wird der Test mit Status "timeout" abgebrochen (0 = unbegrenzt)')
+    parser.add_argument('--max-run-duration',
+                       metavar='SECONDS',
+                       type=int,
+                       help='Zeitbudget des gesamten Laufs; danach starten keine weiteren Tests (0 = unbegrenzt)')
+    parser.add_argument('--plan',
+                       action='store_true',
+                       help='Trockenlauf: Tests, Anfragen pro Endpunkt, Bewertungen und geschätzte Laufzeit ausgeben, ohne ein Modell aufzurufen')
+    parser.add_argument('--shard',
+                       metavar='i/N',
+                       type=str,
+                       help='Nur den i-ten von N deterministisch aufgeteilten Teilen ausführen (zusammenführen mit: testsuite merge)')
     
     args = parser.parse_args()
     
@@ -68,10 +143,48 @@ def main():
     print(f"Python: {sys.version}")
     print(f"{'='*80}")
     
+    if args.profile_startup:
+        print_startup_profile("main")
+    
     try:
         # Konfiguration anpassen
         if args.results_dir:
             config.test_config.results_dir = args.results_dir
+        if args.no_judge_cache:
+            judge_cache.disable()
+        if args.judge_mode:
+            config.judge_config.mode = args.judge_mode
+        if args.judge_batch_size:
+            config.judge_config.batch_size = args.judge_batch_size
+        if args.max_workers:
+            config.test_config.max_workers = args.max_workers
+        if args.max_model_workers is not None:
+            config.test_config.max_model_workers = args.max_model_workers
+        if args.cpu_workers is not None:
+            config.worker_config.cpu_workers = args.cpu_workers
+            cpu_pool.configure(args.cpu_workers)
+        
+        if args.warmup is not None:
+            config.test_config.warmup_requests = args.warmup
+            warmup.configure(args.warmup)
+        if args.max_test_duration is not None:
+            config.test_config.max_test_duration = args.max_test_duration
+        if args.max_run_duration is not None:
+            config.test_config.max_run_duration = args.max_run_duration
+        # Das Laufbudget beginnt mit dem Programmstart der Tests
+        deadlines.start_run(config.test_config.max_run_duration)
+        
+        if args.shard:
+            shard_selector.configure(*parse_shard(args.shard))
+            print(f"Shard {shard_selector.index}/{shard_selector.count}: führe nur die diesem Rechner zugeordneten Tests aus")
+        
+        # Laufmanifest anlegen bzw. für --resume laden (der Trockenlauf legt keinen Lauf an)
+        if args.resume or not args.plan:
+            run_id = run_manifest.start(args.resume, resume=bool(args.resume))
+            if args.resume:
+                print(f"Setze Lauf {run_id} fort ({run_manifest.get_stats()['completed']} Tests bereits abgeschlossen)")
+            else:
+                print(f"Lauf-ID: {run_id} (fortsetzen mit --resume {run_id})")
         
         # Zeige Konfiguration
         if args.verbose:
@@ -79,7 +192,16 @@ def main():
             print(f"  - Ergebnisse Verzeichnis: {config.test_config.results_dir}")
             print(f"  - Logging Level: {config.test_config.log_level}")
             print(f"  - Ähnlichkeitsschwelle: {config.test_config.similarity_threshold}")
-            print(f"  - Max Test Dauer: {config.test_config.max_test_duration}s")
+            print(f"  - Max Test Dauer: {f'{config.test_config.max_test_duration}s' if config.test_config.max_test_duration else 'unbegrenzt'}")
+            print(f"  - Max Laufdauer: {f'{config.test_config.max_run_duration}s' if config.test_config.max_run_duration else 'unbegrenzt'}")
+            print(f"  - Bewertungscache: {judge_cache.path if judge_cache.enabled else 'deaktiviert'}")
+            print(f"  - Bewertungsmodus: {config.judge_config.mode}")
+            print(f"  - Parallele Suiten: {'ja' if args.parallel_suites else 'nein'}")
+            print(f"  - Gleichzeitige Tests pro Suite: {config.test_config.max_workers}")
+            print(f"  - Gleichzeitige Modelle pro Suite: {config.test_config.max_model_workers or 'alle'}")
+            print(f"  - CPU Worker-Prozesse: {cpu_pool.max_workers or 'aus'}")
+            print(f"  - Aufwärmanfragen pro Modell: {warmup.requests or 'aus'}")
+            print(f"  - Telemetrie mit Streaming: {'ja' if telemetry.streaming else 'nein'}")
             print()
         
         # Bestimme welche Test Suiten ausgeführt werden sollen
@@ -93,17 +215,24 @@ def main():
         
         print(f"Auszuführende Test Suiten: {', '.join(suites_to_run)}")
         
+        # Trockenlauf: nur die Arbeitsmatrix ausgeben
+        if args.plan:
+            orchestrator.plan_run(suites_to_run, parallel=args.parallel_suites)
+            sys.exit(0)
+        
         # Führe Test Suiten aus
         if len(suites_to_run) == 1:
             # Einzelne Suite
             result = orchestrator.run_specific_suite(suites_to_run[0])
         else:
             # Mehrere Suiten
-            result = orchestrator.run_all_suites(suites_to_run)
+            result = orchestrator.run_all_suites(suites_to_run, parallel=args.parallel_suites)
         
-        # Speichere Ergebnisse wenn angefordert
-        if args.save_results or args.output:
+        # Speichere Ergebnisse wenn angefordert (Shards immer, damit sie zusammengeführt werden können)
+        if args.save_results or args.output or shard_selector.enabled:
             output_file = args.output or None
+            if output_file is None and shard_selector.enabled:
+                output_file = f"testsuite_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{shard_selector.label}.{args.format}"
             saved_file = orchestrator.save_results(output_file, format=args.format)
             print(f"\nErgebnisse gespeichert in: {saved_file}")
         
@@ -118,6 +247,7 @@ def main():
                 print(f"Erfolgreich: {summary['passed']}")
                 print(f"Fehlgeschlagen: {summary['failed']}")
                 print(f"Fehler: {summary['errors']}")
+                print(f"Zeitüberschreitungen: {summary.get('timeouts', 0)}")
                 print(f"Durchschnittlicher Score: {summary['average_score']:.2f}")
         else:
             # Gesamtergebnis
@@ -125,6 +255,7 @@ def main():
             total_passed = 0
             total_failed = 0
             total_errors = 0
+            total_timeouts = 0
             
             for suite_name, suite_result in orchestrator.execution_results.items():
                 if suite_result["status"] == "completed":
@@ -133,6 +264,7 @@ def main():
                     total_passed += summary["passed"]
                     total_failed += summary["failed"]
                     total_errors += summary["errors"]
+                    total_timeouts += summary.get("timeouts", 0)
                     print(f"  {suite_name}: {summary['passed']}/{summary['total_tests']} erfolgreich")
             
             print(f"\nGesamt:")
@@ -140,6 +272,7 @@ def main():
             print(f"  Erfolgreich: {total_passed}")
             print(f"  Fehlgeschlagen: {total_failed}")
             print(f"  Fehler: {total_errors}")
+            print(f"  Zeitüberschreitungen: {total_timeouts}")
             print(f"  Erfolgsrate: {(total_passed/total_tests*100):.1f}%" if total_tests > 0 else "  Erfolgsrate: 0%")
         
         # Beende mit passendem Exit Code
@@ -149,6 +282,8 @@ def main():
     except KeyboardInterrupt:
         print(f"\n\n⚠️  Ausführung durch Benutzer abgebrochen")
         orchestrator.stop_execution()
+        if run_manifest.run_id:
+            print(f"Fortsetzen mit: python main.py --resume {run_manifest.run_id}")
         sys.exit(1)
         
     except Exception as e:
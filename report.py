@@ -17,6 +17,7 @@ sys.path.insert(0, str(Path(__file__).parent))
 try:
     from config import config
     from core.evaluator import LLMClient
+    from core.judge_cache import judge_cache
     USE_EXTERNAL_LLM = True
 except ImportError as e:
     print(f"Warning: Could not import external modules: {e}")
@@ -603,9 +604,20 @@ if __name__ == "__main__":
     parser.add_argument('--prompt-type', '-p', choices=['detailed_analysis', 'comprehensive_memo'],
                        default='comprehensive_memo',
                        help='Typ des zu verwendenden Prompts')
+    parser.add_argument('--no-judge-cache', action='store_true',
+                       help='Bewertungscache deaktivieren')
+    parser.add_argument('--profile-startup', action='store_true',
+                       help='Importzeiten beim Start zusammengefasst ausgeben')
     
     args = parser.parse_args()
     
+    if args.profile_startup:
+        from core.lazy_imports import print_startup_profile
+        print_startup_profile("report")
+    
+    if args.no_judge_cache and USE_EXTERNAL_LLM:
+        judge_cache.disable()
+    
     # Override results directory if specified
     custom_results_dir = args.results_dir
     
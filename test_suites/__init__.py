@@ -1,7 +1,7 @@
 """
 Test Suiten Modul für das TestSuite System
 """
-from .base_suite import BaseTestSuite
+from .base_suite import BaseTestSuite, ModelContext
 from .general_llm import GeneralLLMTestSuite
 from .coding_model import CodingModelTestSuite
 from .audio_model import AudioModelTestSuite
@@ -9,6 +9,7 @@ from .vlm_suite import VLMTestSuite
 
 __all__ = [
     'BaseTestSuite',
+    'ModelContext',
     'GeneralLLMTestSuite',
     'CodingModelTestSuite', 
     'AudioModelTestSuite',
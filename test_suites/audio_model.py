@@ -4,30 +4,47 @@ Audio Model Tests mit Voxtral API und mistral_common Vorverarbeitung
 import os
 import time
 import tempfile
-from typing import Dict, Any, List
-from openai import OpenAI
+from typing import Dict, Any, List, TYPE_CHECKING
 from pathlib import Path
 
-from mistral_common.protocol.instruct.messages import UserMessage, AssistantMessage
-from mistral_common.protocol.instruct.messages import TextChunk, AudioChunk
-from mistral_common.audio import Audio
-
 from config import key_manager
 from .base_suite import BaseTestSuite
-from core import logger, evaluator, TestResult
+from core import logger, evaluator, TestResult, client_registry, reference_index, cpu_pool, health_probe, PlannedTest, telemetry
+from core.lazy_imports import get_mistral_common
+
+def load_audio_chunk(file_path: str) -> "AudioChunk":
+    """Dekodiere eine Audiodatei zu einem AudioChunk (läuft bei CPU_WORKERS > 0 in einem Worker-Prozess)"""
+    messages, audio_module = get_mistral_common()
+    audio = audio_module.Audio.from_file(file_path, strict=False)
+    return messages.AudioChunk.from_audio(audio)
+
+if TYPE_CHECKING:
+    from openai import OpenAI
+    from mistral_common.protocol.instruct.messages import AudioChunk
 
 class AudioModelTestSuite(BaseTestSuite):
     """Test Suite für Audio Model Tests mit Voxtral API und mistral_common Vorverarbeitung"""
     
+    # Tests mit je einer Voxtral Anfrage und einer Bewertung (Methode test_<Name>)
+    TEST_NAMES = [
+        "transcription_voxtral",
+        "translation_voxtral",
+        "summarization_voxtral",
+        "multimodal_audio_analysis"
+    ]
+    
+    # Audiodateien des Robustheitstests (eine Anfrage pro vorhandener Datei)
+    ROBUSTNESS_FILES = ["Audio/1.wav", "Audio/2.wav"]
+    
     def __init__(self):
         super().__init__("audio_model")
-        self.voxtral_client = OpenAI(
-            api_key=key_manager.get_key("voxtral"),
-            base_url=key_manager.get_base_url("voxtral"),
-            timeout=key_manager.get_timeout("voxtral")
-        )
         self.voxtral_model = key_manager.get_model("voxtral")
     
+    @property
+    def voxtral_client(self) -> "OpenAI":
+        """Hole den Voxtral Client aus dem gemeinsamen Client-Register"""
+        return client_registry.get_client_for("voxtral", owner=self.suite_name)
+    
     def get_test_description(self) -> str:
         """Gib eine Beschreibung der Test Suite zurück"""
         return "Bewertung von Transkription, Übersetzung und Zusammenfassung mit Voxtral API und mistral_common Vorverarbeitung"
@@ -35,25 +52,22 @@ class AudioModelTestSuite(BaseTestSuite):
     def validate_prerequisites(self) -> bool:
         """Validiere Voraussetzungen für die Test Suite"""
         try:
-            # Teste Voxtral Verbindung
-            response = self.voxtral_client.chat.completions.create(
-                model=self.voxtral_model,
-                messages=[{"role": "user", "content": "Test"}],
-                max_tokens=1
-            )
-            return True
+            # Teste Voxtral Verbindung (Ergebnis wird zwischengespeichert)
+            probe = health_probe.probe("voxtral")
+            if not probe.healthy:
+                print(f"Voxtral Verbindung fehlgeschlagen: {probe.error}")
+            return probe.healthy
         except Exception as e:
             print(f"Voxtral Verbindung fehlgeschlagen: {e}")
             return False
     
-    def file_to_chunk(self, file_path: str) -> AudioChunk:
+    def file_to_chunk(self, file_path: str) -> "AudioChunk":
         """Konvertiere Audiodatei zu AudioChunk für API-Anfragen"""
         if file_path is None:
             return None
         
         try:
-            audio = Audio.from_file(file_path, strict=False)
-            return AudioChunk.from_audio(audio)
+            return cpu_pool.run(load_audio_chunk, file_path)
         except Exception as e:
             print(f"Fehler bei der Verarbeitung der Audiodatei: {e}")
             return None
@@ -67,10 +81,11 @@ class AudioModelTestSuite(BaseTestSuite):
                 return None
             
             # Erstelle TextChunk
-            text_chunk = TextChunk(text=text_prompt)
+            messages, _ = get_mistral_common()
+            text_chunk = messages.TextChunk(text=text_prompt)
             
             # Erstelle UserMessage mit mistral_common
-            user_msg = UserMessage(content=[audio_chunk, text_chunk]).to_openai()
+            user_msg = messages.UserMessage(content=[audio_chunk, text_chunk]).to_openai()
             
             return [user_msg]
         except Exception as e:
@@ -80,8 +95,7 @@ class AudioModelTestSuite(BaseTestSuite):
     def read_reference_text(self, filename: str) -> str:
         """Lese Referenztext aus Datei"""
         try:
-            with open(filename, 'r', encoding='utf-8') as f:
-                return f.read().strip()
+            return reference_index.read_file(filename)
         except Exception as e:
             print(f"Fehler beim Lesen der Referenzdatei {filename}: {e}")
             return ""
@@ -111,7 +125,8 @@ class AudioModelTestSuite(BaseTestSuite):
                 }
             
             # Sende Anfrage an Voxtral API
-            response = self.voxtral_client.chat.completions.create(
+            response = telemetry.chat(
+                self.voxtral_client, "generation",
                 model=self.voxtral_model,
                 messages=messages,
                 temperature=0.2,
@@ -170,7 +185,8 @@ class AudioModelTestSuite(BaseTestSuite):
                 }
             
             # Sende Anfrage an Voxtral API
-            response = self.voxtral_client.chat.completions.create(
+            response = telemetry.chat(
+                self.voxtral_client, "generation",
                 model=self.voxtral_model,
                 messages=messages,
                 temperature=0.2,
@@ -229,7 +245,8 @@ class AudioModelTestSuite(BaseTestSuite):
                 }
             
             # Sende Anfrage an Voxtral API
-            response = self.voxtral_client.chat.completions.create(
+            response = telemetry.chat(
+                self.voxtral_client, "generation",
                 model=self.voxtral_model,
                 messages=messages,
                 temperature=0.3,
@@ -295,7 +312,8 @@ class AudioModelTestSuite(BaseTestSuite):
                 }
             
             # Sende Anfrage an Voxtral API
-            response = self.voxtral_client.chat.completions.create(
+            response = telemetry.chat(
+                self.voxtral_client, "generation",
                 model=self.voxtral_model,
                 messages=messages,
                 temperature=0.3,
@@ -333,10 +351,9 @@ class AudioModelTestSuite(BaseTestSuite):
     def test_audio_quality_robustness(self) -> Dict[str, Any]:
         """Teste Robustheit bei verschiedenen Audioqualitäten mit mistral_common"""
         # Teste mit verschiedenen Audioformaten und Qualitäten
-        test_files = ["Audio/1.wav", "Audio/2.wav"]
         results = []
         
-        for audio_file in test_files:
+        for audio_file in self.ROBUSTNESS_FILES:
             if not os.path.exists(audio_file):
                 continue
             
@@ -355,7 +372,8 @@ class AudioModelTestSuite(BaseTestSuite):
                     continue
                 
                 # Sende Anfrage an Voxtral API
-                response = self.voxtral_client.chat.completions.create(
+                response = telemetry.chat(
+                    self.voxtral_client, "generation",
                     model=self.voxtral_model,
                     messages=messages,
                     temperature=0.2,
@@ -393,20 +411,21 @@ class AudioModelTestSuite(BaseTestSuite):
             "test_type": "quality_robustness_mistral_common"
         }
     
+    def plan_tests(self) -> List[PlannedTest]:
+        """Eine Anfrage und eine Bewertung pro Test, der Robustheitstest fragt je Audiodatei ohne Bewertung"""
+        base_url = key_manager.get_base_url("voxtral")
+        tests = [self.plan_test(test_name, base_url, "voxtral") for test_name in self.TEST_NAMES]
+        tests.append(self.plan_test(
+            "audio_quality_robustness", base_url, "voxtral",
+            requests=len([audio_file for audio_file in self.ROBUSTNESS_FILES if os.path.exists(audio_file)]),
+            judge_calls=0
+        ))
+        return self.select_planned_tests(tests)
+    
     def run_all_tests(self) -> List[TestResult]:
         """Führe alle Tests in der Suite aus"""
-        tests = [
-            ("transcription_voxtral", self.test_transcription_voxtral),
-            ("translation_voxtral", self.test_translation_voxtral),
-            ("summarization_voxtral", self.test_summarization_voxtral),
-            ("multimodal_audio_analysis", self.test_multimodal_audio_analysis),
-            ("audio_quality_robustness", self.test_audio_quality_robustness)
-        ]
-        
-        results = []
-        
-        for test_name, test_func in tests:
-            result = self.run_single_test(test_name, test_func)
-            results.append(result)
+        tests = [(test_name, getattr(self, f"test_{test_name}")) for test_name in self.TEST_NAMES]
+        tests.append(("audio_quality_robustness", self.test_audio_quality_robustness))
         
-        return results
\ No newline at end of file
+        self.warm_up_models([("voxtral", "default")])
+        return self.run_tests_concurrently(tests, endpoint=key_manager.get_base_url("voxtral"), group="voxtral")
\ No newline at end of file
@@ -2,19 +2,68 @@
 Basisklasse für alle Test Suiten
 """
 import time
+import contextvars
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Callable, Tuple, TYPE_CHECKING
 from datetime import datetime
 
-from core import logger, evaluator, TestResult
-from config import config
+from core import logger, evaluator, TestResult, client_registry, work_scheduler, run_manifest, shard_selector, deadlines, DeadlineExceeded, health_probe, warmup, PlannedTest, telemetry, CallTelemetry
+from config import config, key_manager
+
+if TYPE_CHECKING:
+    from openai import OpenAI
+
+@dataclass(frozen=True)
+class ModelContext:
+    """Explizite Modellauswahl eines Tests: Client, Modellname und Generierungsparameter
+    
+    Tests erhalten ihren Kontext als Argument statt Client und Modell aus
+    Attributen der Suite zu lesen, daher können mehrere Modelle gleichzeitig
+    getestet werden.
+    """
+    service: str
+    model_type: str
+    model: str
+    client: "OpenAI"
+    base_url: str = ""
+    params: Dict[str, Any] = field(default_factory=dict)
+    
+    @classmethod
+    def create(cls, service: str, model_type: str, owner: str, **params) -> "ModelContext":
+        """Erstelle den Kontext eines konfigurierten Modells"""
+        return cls(
+            service=service,
+            model_type=model_type,
+            model=key_manager.get_model(service, model_type),
+            client=client_registry.get_client_for(service, model_type, owner=owner),
+            base_url=key_manager.get_base_url(service, model_type),
+            params=params
+        )
+    
+    def chat(self, messages: List[Dict[str, Any]], **kwargs):
+        """Sende eine Chat-Anfrage an das Modell (kwargs überschreiben params), gemessen als Generierung"""
+        return telemetry.chat(
+            self.client, "generation",
+            model=self.model,
+            messages=messages,
+            **{**self.params, **kwargs}
+        )
 
 class BaseTestSuite(ABC):
     """Abstrakte Basisklasse für alle Test Suiten"""
     
-    def __init__(self, suite_name: str):
+    # Prompts der Aufwärmphase, Suiten mit festen Testprompts verwenden diese
+    WARMUP_PROMPTS = ["Erkläre in wenigen Sätzen, wie ein Sprachmodell eine Antwort erzeugt."]
+    
+    def __init__(self, suite_name: str, max_workers: Optional[int] = None):
         self.suite_name = suite_name
         self.test_results = []
+        # Anzahl gleichzeitig ausgeführter Tests (1 = nacheinander)
+        self.max_workers = max_workers if max_workers is not None else config.test_config.max_workers
+        # Anzahl gleichzeitig getesteter Modelle (0 = alle)
+        self.max_model_workers = config.test_config.max_model_workers
         # Create model-specific logger
         from core.logger import get_suite_logger
         # Create a new logger instance for this suite
@@ -30,8 +79,54 @@ class BaseTestSuite(ABC):
         """Gib eine Beschreibung der Test Suite zurück"""
         pass
     
+    def in_shard(self, test_name: str) -> bool:
+        """Prüfe ob dieser Rechner den Test ausführt (--shard i/N, test_name enthält das Modell)"""
+        return shard_selector.owns(f"{self.suite_name}_{test_name}")
+    
+    def plan_tests(self) -> List[PlannedTest]:
+        """Arbeitsmatrix der Suite für den Trockenlauf (--plan), ohne ein Modell aufzurufen"""
+        return []
+    
+    def plan_test(self, test_name: str, endpoint: str, group: str, requests: int = 1,
+                  judge_calls: int = 1) -> PlannedTest:
+        """Planeintrag eines Tests (test_name enthält das Modell, requests gehen an endpoint)"""
+        return PlannedTest(
+            suite=self.suite_name,
+            test_name=f"{self.suite_name}_{test_name}",
+            endpoint=endpoint,
+            group=group,
+            requests={endpoint: requests} if requests else {},
+            judge_calls=judge_calls
+        )
+    
+    def select_planned_tests(self, tests: List[PlannedTest]) -> List[PlannedTest]:
+        """Behalte die Tests dieses Shards, die im (fortgesetzten) Lauf noch offen sind"""
+        return [
+            test for test in tests
+            if shard_selector.owns(test.test_name) and run_manifest.completed_result_file(test.test_name) is None
+        ]
+    
+    def restore_completed_test(self, full_test_name: str) -> Optional[TestResult]:
+        """Übernimm das Ergebnis eines Tests, der im fortgesetzten Lauf bereits abgeschlossen wurde"""
+        result_file = run_manifest.completed_result_file(full_test_name)
+        if result_file is None:
+            return None
+        result = self.model_logger.restore_result(result_file)
+        if result is not None:
+            print(f"Überspringe abgeschlossenen Test: {full_test_name}")
+        return result
+    
     def run_single_test(self, test_name: str, test_func, **kwargs) -> TestResult:
-        """Führe einen einzelnen Test aus"""
+        """Führe einen einzelnen Test aus (im fortgesetzten Lauf nur, wenn er noch offen ist)
+        
+        Der Test läuft mit dem Zeitbudget max_test_duration. Ist es abgelaufen,
+        erhält der Test den Status "timeout"; ist das Budget des gesamten Laufs
+        erschöpft, wird der Test gar nicht mehr gestartet.
+        """
+        restored = self.restore_completed_test(f"{self.suite_name}_{test_name}")
+        if restored is not None:
+            return restored
+        
         start_time = time.time()
         
         # Logge Teststart
@@ -41,62 +136,36 @@ class BaseTestSuite(ABC):
             input_data=kwargs
         )
         
+        if deadlines.run_expired():
+            self.log_run_budget_exhausted(result, input_data=kwargs)
+            return result
+        
+        calls = []
         try:
-            # Führe Test aus
-            test_result = test_func(**kwargs)
+            # Führe Test mit Zeitbudget aus, Messwerte aller Modellanfragen landen in calls
+            with telemetry.collect(calls), deadlines.test_budget(config.test_config.max_test_duration):
+                test_result = test_func(**kwargs)
+                timed_out = deadlines.expired()
             
             # Berechne Dauer
             duration = time.time() - start_time
             result.duration = duration
+            self.attach_telemetry(result, calls)
             
-            # Logge Testergebnis
-            # Use the evaluation_score if available, otherwise use the score
-            final_score = 0.0
-            final_status = "failed"  # Default status
-            
-            if isinstance(test_result, dict):
-                # Check for specific success indicators - these override everything else
-                if test_result.get('is_correct', False):
-                    final_status = "success"
-                    # For JavaScript debugging, use the manual_score when is_correct is true
-                    if 'manual_score' in test_result:
-                        final_score = test_result['manual_score']
-                    else:
-                        final_score = 1.0  # Perfect score when is_correct is true
-                elif test_result.get('status') == 'success':
-                    final_status = "success"
-                    if 'score' in test_result:
-                        final_score = test_result['score']
-                elif 'evaluation_score' in test_result and test_result['evaluation_score'] >= config.test_config.similarity_threshold:
-                    final_status = "success"
-                    final_score = test_result['evaluation_score']
-                elif 'score' in test_result and test_result['score'] >= config.test_config.similarity_threshold:
-                    final_status = "success"
-                    final_score = test_result['score']
-                elif 'execution_result' in test_result and isinstance(test_result['execution_result'], dict):
-                    execution_score = test_result['execution_result'].get('score', 0.0)
-                    if execution_score >= config.test_config.similarity_threshold:
-                        final_status = "success"
-                        final_score = execution_score
-            
-            # Update result status and score
-            result.status = final_status
-            result.score = final_score
-            
-            self.model_logger.log_test_result(
-                result=result,
-                output_data=test_result,
-                score=final_score,
-                details=test_result.get('details', '') if isinstance(test_result, dict) else str(test_result),
-                input_data=test_result.get('input_data', {}) if isinstance(test_result, dict) else None
-            )
-            
+            if timed_out:
+                self.log_test_timeout(result, output_data=test_result, input_data=kwargs, duration=duration)
+            else:
+                self._finalize_test_result(result, test_result)
             return result
         
         except Exception as e:
             # Logge Fehler
             duration = time.time() - start_time
             result.duration = duration
+            self.attach_telemetry(result, calls)
+            if isinstance(e, DeadlineExceeded) or deadlines.expired():
+                self.log_test_timeout(result, input_data=kwargs, duration=duration)
+                return result
             self.model_logger.log_test_result(
                 result=result,
                 error_message=str(e),
@@ -104,6 +173,161 @@ class BaseTestSuite(ABC):
             )
             return result
     
+    def attach_telemetry(self, result: TestResult, calls: List[CallTelemetry]) -> None:
+        """Speichere die Messwerte der Modellanfragen eines Tests in result.metadata"""
+        if calls:
+            result.metadata = {**(result.metadata or {}), "telemetry": telemetry.describe(calls)}
+    
+    def log_test_timeout(self, result: TestResult, output_data: Any = None,
+                         input_data: Dict[str, Any] = None, duration: float = None) -> None:
+        """Logge einen Test, dessen Zeitbudget während der Ausführung abgelaufen ist"""
+        if deadlines.run_expired():
+            reason = "Laufzeitbudget des Testlaufs abgelaufen"
+        else:
+            reason = f"Zeitbudget von {config.test_config.max_test_duration}s überschritten"
+        self.model_logger.log_test_timeout(
+            result,
+            reason=reason,
+            output_data=output_data if isinstance(output_data, dict) else None,
+            input_data=input_data,
+            duration=duration
+        )
+    
+    def log_run_budget_exhausted(self, result: TestResult, input_data: Dict[str, Any] = None) -> None:
+        """Logge einen Test, der wegen des erschöpften Laufbudgets nicht mehr gestartet wird"""
+        self.model_logger.log_test_timeout(
+            result,
+            reason="Übersprungen: Laufzeitbudget des Testlaufs erschöpft",
+            input_data=input_data,
+            duration=0.0
+        )
+    
+    def map_concurrently(self, func: Callable, items: List[Any], max_workers: Optional[int] = None,
+                         endpoint: Optional[str] = None, group: Any = None) -> List[Any]:
+        """Wende func mit bis zu max_workers Threads auf alle Elemente an, Reihenfolge bleibt erhalten
+        
+        max_workers=None verwendet die Einstellung der Suite, 0 startet einen
+        Thread pro Element. Mit endpoint laufen die Aufrufe über den globalen
+        WorkScheduler: Sie teilen sich die Plätze der base_url mit allen anderen
+        Suiten und Modellen, max_workers begrenzt dann nur die eigene Gruppe.
+        """
+        if max_workers is None:
+            max_workers = self.max_workers
+        if endpoint is not None:
+            return work_scheduler.map(endpoint, (self.suite_name, group), func, items, group_limit=max_workers)
+        if max_workers == 0:
+            max_workers = len(items)
+        if max_workers <= 1 or len(items) <= 1:
+            return [func(item) for item in items]
+        
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(items)),
+                                thread_name_prefix=self.suite_name) as executor:
+            # Jeder Aufruf erhält eine eigene Kopie des Kontexts (z.B. Präfix der Konsolenausgabe)
+            futures = [executor.submit(contextvars.copy_context().run, func, item) for item in items]
+            return [future.result() for future in futures]
+    
+    def _run_test_entry(self, test: Tuple[str, Callable]) -> TestResult:
+        """Führe einen (Name, Testfunktion) Eintrag aus"""
+        test_name, test_func = test
+        return self.run_single_test(test_name, test_func)
+    
+    def run_tests_concurrently(self, tests: List[Tuple[str, Callable]], endpoint: Optional[str] = None,
+                               group: Any = None) -> List[TestResult]:
+        """Führe unabhängige Tests gleichzeitig aus (bis zu max_workers)
+        
+        Die Ergebnisse haben die Reihenfolge von tests, die Dauer wird pro Test
+        im jeweiligen Worker gemessen. Mit endpoint werden die Tests über den
+        WorkScheduler auf die Plätze dieser base_url verteilt. Tests anderer
+        Shards werden ausgelassen.
+        """
+        tests = [test for test in tests if self.in_shard(test[0])]
+        return self.map_concurrently(self._run_test_entry, tests, endpoint=endpoint, group=group)
+    
+    def create_model_contexts(self, service: str) -> List[ModelContext]:
+        """Erstelle die Kontexte aller erreichbaren Modelle eines Dienstes
+        
+        Modelle, deren Erreichbarkeitsprüfung fehlschlägt, werden übersprungen,
+        statt alle ihre Tests in Timeouts laufen zu lassen.
+        """
+        model_types = list(key_manager.get_available_models(service))
+        probes = health_probe.probe_many([(service, model_type) for model_type in model_types])
+        contexts = []
+        for model_type in model_types:
+            probe = probes[(service, model_type)]
+            if not probe.healthy:
+                print(f"✗ Überspringe Modell {model_type}: nicht erreichbar ({probe.error})")
+                continue
+            try:
+                contexts.append(ModelContext.create(service, model_type, owner=self.suite_name))
+            except Exception as e:
+                print(f"✗ Konnte Modell {model_type} nicht vorbereiten: {e}")
+        self.warm_up_models([(context.service, context.model_type) for context in contexts])
+        return contexts
+    
+    def warmup_prompts(self) -> List[str]:
+        """Prompts mit repräsentativer Länge für die Aufwärmphase"""
+        return self.WARMUP_PROMPTS
+    
+    def warm_up_models(self, targets: List[Tuple[str, str]]) -> None:
+        """Wärme die (Dienst, Modelltyp) Ziele vor der Messung gleichzeitig auf (WARMUP_REQUESTS)"""
+        warmup.run_many(targets, self.warmup_prompts())
+    
+    def run_models_concurrently(self, contexts: List[Any], run_model: Callable[[Any], List[Any]]) -> List[Any]:
+        """Führe die Tests aller Modelle gleichzeitig aus (bis zu max_model_workers)
+        
+        run_model erhält den Kontext eines Modells und gibt dessen Ergebnisse
+        zurück. Die Ergebnisse werden in der Reihenfolge der Kontexte verkettet.
+        """
+        results = []
+        for model_results in self.map_concurrently(run_model, contexts, self.max_model_workers):
+            results.extend(model_results)
+        return results
+    
+    def _finalize_test_result(self, result: TestResult, test_result: Any, duration: float = None) -> None:
+        """Bestimme Status und Score eines Tests und logge das Ergebnis"""
+        # Logge Testergebnis
+        # Use the evaluation_score if available, otherwise use the score
+        final_score = 0.0
+        final_status = "failed"  # Default status
+        
+        if isinstance(test_result, dict):
+            # Check for specific success indicators - these override everything else
+            if test_result.get('is_correct', False):
+                final_status = "success"
+                # For JavaScript debugging, use the manual_score when is_correct is true
+                if 'manual_score' in test_result:
+                    final_score = test_result['manual_score']
+                else:
+                    final_score = 1.0  # Perfect score when is_correct is true
+            elif test_result.get('status') == 'success':
+                final_status = "success"
+                if 'score' in test_result:
+                    final_score = test_result['score']
+            elif 'evaluation_score' in test_result and test_result['evaluation_score'] >= config.test_config.similarity_threshold:
+                final_status = "success"
+                final_score = test_result['evaluation_score']
+            elif 'score' in test_result and test_result['score'] >= config.test_config.similarity_threshold:
+                final_status = "success"
+                final_score = test_result['score']
+            elif 'execution_result' in test_result and isinstance(test_result['execution_result'], dict):
+                execution_score = test_result['execution_result'].get('score', 0.0)
+                if execution_score >= config.test_config.similarity_threshold:
+                    final_status = "success"
+                    final_score = execution_score
+        
+        # Update result status and score
+        result.status = final_status
+        result.score = final_score
+        
+        self.model_logger.log_test_result(
+            result=result,
+            output_data=test_result,
+            score=final_score,
+            details=test_result.get('details', '') if isinstance(test_result, dict) else str(test_result),
+            input_data=test_result.get('input_data', {}) if isinstance(test_result, dict) else None,
+            duration=duration
+        )
+    
     def get_suite_summary(self) -> Dict[str, Any]:
         """Erstelle eine Zusammenfassung der Test Suite"""
         # Hole alle Ergebnisse für diese Suite, unabhängig vom Status
@@ -117,24 +341,32 @@ class BaseTestSuite(ABC):
                 "passed": 0,
                 "failed": 0,
                 "errors": 0,
+                "timeouts": 0,
                 "average_score": 0.0,
+                "telemetry": {},
                 "description": self.get_test_description()
             }
         
         passed = len([r for r in suite_results if r.status == "success"])
         failed = len([r for r in suite_results if r.status == "failed"])
         errors = len([r for r in suite_results if r.status == "error"])
+        timeouts = len([r for r in suite_results if r.status == "timeout"])
         
         scores = [r.score for r in suite_results if r.score is not None]
         average_score = sum(scores) / len(scores) if scores else 0.0
         
+        # Latenz und Tokens aller Modellanfragen, getrennt nach Generierung und Bewertung
+        calls = [call for r in suite_results for call in ((r.metadata or {}).get("telemetry") or {}).get("calls", [])]
+        
         return {
             "suite_name": self.suite_name,
             "total_tests": len(suite_results),
             "passed": passed,
             "failed": failed,
             "errors": errors,
+            "timeouts": timeouts,
             "average_score": average_score,
+            "telemetry": telemetry.summarize(calls),
             "description": self.get_test_description()
         }
     
@@ -148,7 +380,8 @@ class BaseTestSuite(ABC):
     
     def teardown_suite(self) -> None:
         """Räume die Test Suite auf"""
-        pass
+        # Gib die Clients dieser Suite frei; ungenutzte Verbindungspools werden geschlossen
+        client_registry.release(self.suite_name)
     
     def run_suite_with_setup(self) -> List[TestResult]:
         """Führe die Test Suite mit Setup und Teardown aus"""
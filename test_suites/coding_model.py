@@ -5,49 +5,154 @@ import subprocess
 import tempfile
 import os
 import time
-from typing import Dict, Any, List
-from openai import OpenAI
+from functools import partial
+from typing import Dict, Any, List, Optional
 
 from config import key_manager
-from .base_suite import BaseTestSuite
-from core import logger, evaluator, TestResult
+from .base_suite import BaseTestSuite, ModelContext
+from core import logger, evaluator, TestResult, cpu_pool, PlannedTest
+
+def run_python_tests(code: str, test_cases: List[Dict]) -> Dict[str, Any]:
+    """Führe generierten Python Code gegen Testfälle aus (läuft bei CPU_WORKERS > 0 in einem Worker-Prozess)"""
+    try:
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.py', delete=False) as f:
+            f.write(code)
+            temp_file = f.name
+
+        results = []
+
+        for test_case in test_cases:
+            try:
+                # Führe den Code aus
+                exec_globals = {}
+                exec(compile(open(temp_file).read(), temp_file, 'exec'), exec_globals)
+
+                # Finde die Hauptfunktion
+                function_name = None
+                for name in exec_globals:
+                    if callable(exec_globals[name]) and not name.startswith('_'):
+                        function_name = name
+                        break
+
+                if not function_name:
+                    results.append({
+                        "status": "error",
+                        "message": "Keine ausführbare Funktion gefunden"
+                    })
+                    continue
+
+                # Führe Testfall aus
+                if 'input' in test_case:
+                    # Versuche zuerst mit positional arguments
+                    try:
+                        if len(test_case['input']) == 1:
+                            # Single argument - call as positional
+                            input_value = list(test_case['input'].values())[0]
+                            result = exec_globals[function_name](input_value)
+                        else:
+                            # Multiple arguments - call as keyword arguments
+                            result = exec_globals[function_name](**test_case['input'])
+                    except TypeError as e:
+                        # Wenn keyword arguments fehlschlagen, versuche positional
+                        if 'unexpected keyword argument' in str(e):
+                            # Extrahiere values und rufe mit positional arguments auf
+                            input_values = list(test_case['input'].values())
+                            result = exec_globals[function_name](*input_values)
+                        else:
+                            raise e
+                else:
+                    result = exec_globals[function_name]()
+
+                expected = test_case.get('expected')
+                if expected == result:
+                    results.append({
+                        "status": "success",
+                        "input": test_case.get('input'),
+                        "expected": expected,
+                        "result": result
+                    })
+                else:
+                    results.append({
+                        "status": "failed",
+                        "input": test_case.get('input'),
+                        "expected": expected,
+                        "result": result
+                    })
+
+            except Exception as e:
+                results.append({
+                    "status": "error",
+                    "input": test_case.get('input'),
+                    "error": str(e)
+                })
+
+        # Bereinige temporäre Datei
+        os.unlink(temp_file)
+
+        # Berechne Gesamtscore
+        successful = len([r for r in results if r['status'] == 'success'])
+        total = len(results)
+        score = successful / total if total > 0 else 0.0
+
+        return {
+            "score": score,
+            "results": results,
+            "total_tests": total,
+            "passed_tests": successful
+        }
+
+    except Exception as e:
+        return {
+            "score": 0.0,
+            "error": str(e),
+            "results": []
+        }
 
 class CodingModelTestSuite(BaseTestSuite):
     """Test Suite für Coding Model Tests"""
     
+    WARMUP_PROMPTS = [
+        "Erstelle eine Python-Funktion, die eine Liste von Zahlen entgegennimmt und das arithmetische Mittel berechnet."
+    ]
+    
+    # Tests pro Modell (Methode test_<Name>), je eine Anfrage und eine Bewertung
+    TEST_NAMES = [
+        "python_arithmetic_mean",
+        "javascript_debugging",
+        "python_string_operations",
+        "python_list_operations"
+    ]
+    
     def __init__(self):
         super().__init__("coding_model")
         # Initialize available models for coding
         self.available_models = key_manager.get_available_models("coding_llm")
-        self.current_model = None
-        self.llm_client = None
-        self.model = None
         
-        # Use first available model instead of "coding"
+        # Standardkontext für Einzelaufrufe der Testmethoden: erstes verfügbares Modell
+        self.context = None
         available_model_keys = list(self.available_models.keys())
         if available_model_keys:
             self.set_model(available_model_keys[0])  # Use first available model
         else:
             print("ERROR: No coding models available")
     
+    @property
+    def model(self) -> Optional[str]:
+        """Modellname des Standardkontexts"""
+        return self.context.model if self.context else None
+    
     def get_test_description(self) -> str:
         """Gib eine Beschreibung der Test Suite zurück"""
         return "Bewertung von Codegenerierung und Debugging Fähigkeiten"
     
     def set_model(self, model_type: str) -> bool:
-        """Wechsle zu einem anderen Modell"""
+        """Setze das Modell des Standardkontexts"""
         try:
             if model_type not in self.available_models:
                 print(f"Modell {model_type} nicht verfügbar. Verfügbare Modelle: {list(self.available_models.keys())}")
                 return False
             
-            self.current_model = model_type
-            self.model = key_manager.get_model("coding_llm", model_type)
-            self.llm_client = OpenAI(
-                api_key=key_manager.get_key("coding_llm", model_type),
-                base_url=key_manager.get_base_url("coding_llm", model_type),
-                timeout=key_manager.get_timeout("coding_llm", model_type)
-            )
+            self.context = ModelContext.create("coding_llm", model_type, owner=self.suite_name)
             return True
         except Exception as e:
             print(f"Fehler beim Wechseln zu Modell {model_type}: {e}")
@@ -64,94 +169,9 @@ class CodingModelTestSuite(BaseTestSuite):
             return False
     
     def execute_python_code(self, code: str, test_cases: List[Dict]) -> Dict[str, Any]:
-        """Führe Python Code sicher aus"""
+        """Führe Python Code sicher aus (im Prozesspool, damit exec das GIL der Netzwerk-Threads nicht blockiert)"""
         try:
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.py', delete=False) as f:
-                f.write(code)
-                temp_file = f.name
-            
-            results = []
-            
-            for test_case in test_cases:
-                try:
-                    # Führe den Code aus
-                    exec_globals = {}
-                    exec(compile(open(temp_file).read(), temp_file, 'exec'), exec_globals)
-                    
-                    # Finde die Hauptfunktion
-                    function_name = None
-                    for name in exec_globals:
-                        if callable(exec_globals[name]) and not name.startswith('_'):
-                            function_name = name
-                            break
-                    
-                    if not function_name:
-                        results.append({
-                            "status": "error",
-                            "message": "Keine ausführbare Funktion gefunden"
-                        })
-                        continue
-                    
-                    # Führe Testfall aus
-                    if 'input' in test_case:
-                        # Versuche zuerst mit positional arguments
-                        try:
-                            if len(test_case['input']) == 1:
-                                # Single argument - call as positional
-                                input_value = list(test_case['input'].values())[0]
-                                result = exec_globals[function_name](input_value)
-                            else:
-                                # Multiple arguments - call as keyword arguments
-                                result = exec_globals[function_name](**test_case['input'])
-                        except TypeError as e:
-                            # Wenn keyword arguments fehlschlagen, versuche positional
-                            if 'unexpected keyword argument' in str(e):
-                                # Extrahiere values und rufe mit positional arguments auf
-                                input_values = list(test_case['input'].values())
-                                result = exec_globals[function_name](*input_values)
-                            else:
-                                raise e
-                    else:
-                        result = exec_globals[function_name]()
-                    
-                    expected = test_case.get('expected')
-                    if expected == result:
-                        results.append({
-                            "status": "success",
-                            "input": test_case.get('input'),
-                            "expected": expected,
-                            "result": result
-                        })
-                    else:
-                        results.append({
-                            "status": "failed",
-                            "input": test_case.get('input'),
-                            "expected": expected,
-                            "result": result
-                        })
-                
-                except Exception as e:
-                    results.append({
-                        "status": "error",
-                        "input": test_case.get('input'),
-                        "error": str(e)
-                    })
-            
-            # Bereinige temporäre Datei
-            os.unlink(temp_file)
-            
-            # Berechne Gesamtscore
-            successful = len([r for r in results if r['status'] == 'success'])
-            total = len(results)
-            score = successful / total if total > 0 else 0.0
-            
-            return {
-                "score": score,
-                "results": results,
-                "total_tests": total,
-                "passed_tests": successful
-            }
-        
+            return cpu_pool.run(run_python_tests, code, test_cases)
         except Exception as e:
             return {
                 "score": 0.0,
@@ -159,8 +179,9 @@ class CodingModelTestSuite(BaseTestSuite):
                 "results": []
             }
     
-    def test_python_arithmetic_mean(self) -> Dict[str, Any]:
+    def test_python_arithmetic_mean(self, context: Optional[ModelContext] = None) -> Dict[str, Any]:
         """Teste Python Funktion für arithmetisches Mittel"""
+        context = context or self.context
         prompt = "Erstelle eine Python-Funktion, die eine Liste von Zahlen entgegennimmt und das arithmetische Mittel berechnet."
         
         test_cases = [
@@ -172,8 +193,7 @@ class CodingModelTestSuite(BaseTestSuite):
         
         try:
             # Generiere Code mit LLM
-            response = self.llm_client.chat.completions.create(
-                model=self.model,
+            response = context.chat(
                 messages=[{"role": "user", "content": prompt}],
                 max_tokens=300,
                 temperature=0.1
@@ -215,8 +235,9 @@ class CodingModelTestSuite(BaseTestSuite):
                 "details": f"Python arithmetisches Mittel Test fehlgeschlagen: {e}"
             }
     
-    def test_javascript_debugging(self) -> Dict[str, Any]:
+    def test_javascript_debugging(self, context: Optional[ModelContext] = None) -> Dict[str, Any]:
         """Teste JavaScript Debugging"""
+        context = context or self.context
         prompt = "Finde den Fehler in diesem JavaScript-Code, der eine Endlosschleife verursacht: `for (let i = 0; i < 10; i++) { console.log(i); }`"
         
         # Der Code hat eigentlich keine Endlosschleife, das ist der Test
@@ -224,8 +245,7 @@ class CodingModelTestSuite(BaseTestSuite):
         
         try:
             # Generiere Analyse mit LLM
-            response = self.llm_client.chat.completions.create(
-                model=self.model,
+            response = context.chat(
                 messages=[{"role": "user", "content": prompt}],
                 max_tokens=200,
                 temperature=0.1
@@ -264,8 +284,9 @@ class CodingModelTestSuite(BaseTestSuite):
                 "details": f"JavaScript Debugging Test fehlgeschlagen: {e}"
             }
     
-    def test_python_string_operations(self) -> Dict[str, Any]:
+    def test_python_string_operations(self, context: Optional[ModelContext] = None) -> Dict[str, Any]:
         """Teste String Operationen"""
+        context = context or self.context
         prompt = "Erstelle eine Python-Funktion, die einen String entgegennimmt und die Anzahl der Wörter zurückgibt."
         
         test_cases = [
@@ -277,8 +298,7 @@ class CodingModelTestSuite(BaseTestSuite):
         
         try:
             # Generiere Code mit LLM
-            response = self.llm_client.chat.completions.create(
-                model=self.model,
+            response = context.chat(
                 messages=[{"role": "user", "content": prompt}],
                 max_tokens=300,
                 temperature=0.1
@@ -319,8 +339,9 @@ class CodingModelTestSuite(BaseTestSuite):
                 "details": f"Python String Operationen Test fehlgeschlagen: {e}"
             }
     
-    def test_python_list_operations(self) -> Dict[str, Any]:
+    def test_python_list_operations(self, context: Optional[ModelContext] = None) -> Dict[str, Any]:
         """Teste List Operationen"""
+        context = context or self.context
         prompt = "Erstelle eine Python-Funktion, die eine Liste von Zahlen entgegennimmt und die größte Zahl zurückgibt."
         
         test_cases = [
@@ -332,8 +353,7 @@ class CodingModelTestSuite(BaseTestSuite):
         
         try:
             # Generiere Code mit LLM
-            response = self.llm_client.chat.completions.create(
-                model=self.model,
+            response = context.chat(
                 messages=[{"role": "user", "content": prompt}],
                 max_tokens=300,
                 temperature=0.1
@@ -374,41 +394,33 @@ class CodingModelTestSuite(BaseTestSuite):
                 "details": f"Python List Operationen Test fehlgeschlagen: {e}"
             }
     
+    def _run_model_tests(self, context: ModelContext) -> List[TestResult]:
+        """Führe alle Tests für ein Modell aus (bis zu max_workers gleichzeitig)"""
+        print(f"\n{'='*60}")
+        print(f"TESTE MODELL: {context.model_type}")
+        print(f"{'='*60}")
+        
+        # Add model name to test name for identification
+        return self.run_tests_concurrently(
+            [(f"{test_name}_{context.model_type}", partial(getattr(self, f"test_{test_name}"), context))
+             for test_name in self.TEST_NAMES],
+            endpoint=context.base_url,
+            group=context.model_type
+        )
+    
+    def plan_tests(self) -> List[PlannedTest]:
+        """Eine Anfrage und eine Bewertung pro Test und Modell"""
+        tests = []
+        for model_type in self.available_models:
+            base_url = key_manager.get_base_url("coding_llm", model_type)
+            tests.extend(self.plan_test(f"{test_name}_{model_type}", base_url, model_type)
+                         for test_name in self.TEST_NAMES)
+        return self.select_planned_tests(tests)
+    
     def run_all_tests(self) -> List[TestResult]:
-        """Führe alle Tests in der Suite aus"""
+        """Führe alle Tests in der Suite aus, alle Modelle gleichzeitig"""
         # Get all available models
         available_models = list(self.available_models.keys())
         print(f"Verfügbare Modelle: {available_models}")
         
-        all_results = []
-        
-        # Run tests for each model
-        for model_type in available_models:
-            print(f"\n{'='*60}")
-            print(f"TESTE MODELL: {model_type}")
-            print(f"{'='*60}")
-            
-            # Switch to this model
-            if not self.set_model(model_type):
-                print(f"✗ Konnte nicht zu Modell {model_type} wechseln")
-                continue
-            
-            # Run all tests for this model
-            tests = [
-                ("python_arithmetic_mean", self.test_python_arithmetic_mean),
-                ("javascript_debugging", self.test_javascript_debugging),
-                ("python_string_operations", self.test_python_string_operations),
-                ("python_list_operations", self.test_python_list_operations)
-            ]
-            
-            model_results = []
-            for test_name, test_func in tests:
-                # Add model name to test name for identification
-                test_name_with_model = f"{test_name}_{model_type}"
-                result = self.run_single_test(test_name_with_model, test_func)
-                all_results.append(result)
-                model_results.append(result)
-            
-            all_results.extend(model_results)
-        
-        return all_results
\ No newline at end of file
+        return self.run_models_concurrently(self.create_model_contexts("coding_llm"), self._run_model_tests)
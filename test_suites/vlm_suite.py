@@ -3,17 +3,53 @@ Vision Language Model (VLM) Tests
 """
 import os
 import time
-from typing import Dict, Any, List
-from openai import OpenAI
+import base64
+from dataclasses import dataclass, replace
+from functools import partial
+from typing import Dict, Any, List, Optional
 from pathlib import Path
 
 from config import key_manager
-from .base_suite import BaseTestSuite
-from core import logger, evaluator, TestResult
+from .base_suite import BaseTestSuite, ModelContext
+from core import logger, evaluator, TestResult, reference_index, cpu_pool, health_probe, PlannedTest
+
+def encode_file_base64(file_path: str) -> str:
+    """Lese eine Bilddatei und kodiere sie als Base64 (läuft bei CPU_WORKERS > 0 in einem Worker-Prozess)"""
+    with open(file_path, "rb") as file:
+        return base64.b64encode(file.read()).decode('utf-8')
+
+@dataclass(frozen=True)
+class VLMModelContext:
+    """Modellkombination eines VLM Testlaufs: Vision, VLM LLM und Evaluation"""
+    vision: Optional[ModelContext] = None
+    vlm_llm: Optional[ModelContext] = None
+    evaluation: Optional[ModelContext] = None
+    
+    @property
+    def label(self) -> str:
+        """Bezeichnung der Kombination für Testnamen"""
+        return self.make_label(
+            self.vision.model_type if self.vision else None,
+            self.vlm_llm.model_type if self.vlm_llm else None,
+            self.evaluation.model_type if self.evaluation else None
+        )
+    
+    @staticmethod
+    def make_label(vision_model_type: Optional[str], vlm_llm_model_type: Optional[str],
+                   evaluation_model_type: Optional[str]) -> str:
+        """Bezeichnung einer Kombination aus den Modelltypen"""
+        return f"vision_{vision_model_type}_vlm_llm_{vlm_llm_model_type}_eval_{evaluation_model_type}"
 
 class VLMTestSuite(BaseTestSuite):
     """Test Suite für Vision Language Model Tests"""
     
+    # Tests pro Modellkombination (Methode test_<Name>), je eine Vision Anfrage und eine Bewertung
+    TEST_NAMES = [
+        "document_analysis",
+        "data_extraction",
+        "creative_story_generation"
+    ]
+    
     def __init__(self):
         super().__init__("vlm")
         # Initialize available models for vision, VLM-specific LLM, and evaluation
@@ -21,16 +57,8 @@ class VLMTestSuite(BaseTestSuite):
         self.available_vlm_llm_models = key_manager.get_available_models("vlm_llm")
         self.available_evaluation_models = key_manager.get_available_models("evaluation")
         
-        self.current_vision_model = None
-        self.current_vlm_llm_model = None
-        self.current_evaluation_model = None
-        
-        self.vision_client = None
-        self.vision_model = None
-        self.vlm_llm_client = None
-        self.vlm_llm_model = None
-        self.evaluation_client = None
-        self.evaluation_model = None
+        # Standardkontext für Einzelaufrufe der Testmethoden
+        self.context = VLMModelContext()
         
         # Set default models - use first available model for each type
         available_vision_models = list(self.available_vlm_llm_models.keys())  # Use VLM LLM models for vision
@@ -66,66 +94,60 @@ class VLMTestSuite(BaseTestSuite):
         """Gib eine Beschreibung der Test Suite zurück"""
         return "Umfassende multimodale Tests für Vision Language Models mit Integration aller vorheriger Aufgaben"
     
+    @property
+    def model(self) -> Optional[str]:
+        """Vision Modellname des Standardkontexts"""
+        return self.context.vision.model if self.context.vision else None
+    
     def set_model(self, vision_model_type: str = None, llm_model_type: str = None, evaluation_model_type: str = None) -> bool:
-        """Wechsle zu anderen Modellen"""
+        """Setze die Modelle des Standardkontexts"""
         try:
-            # Set vision model
-            if vision_model_type:
-                if vision_model_type not in self.available_vlm_llm_models:
-                    print(f"Vision Modell {vision_model_type} nicht verfügbar. Verfügbare Modelle: {list(self.available_vlm_llm_models.keys())}")
-                    return False
-                
-                self.current_vision_model = vision_model_type
-                self.vision_model = key_manager.get_model("vlm_llm", vision_model_type)
-                self.vision_client = OpenAI(
-                    api_key=key_manager.get_key("vlm_llm", vision_model_type),
-                    base_url=key_manager.get_base_url("vlm_llm", vision_model_type),
-                    timeout=key_manager.get_timeout("vlm_llm", vision_model_type)
-                )
-            
-            # Set VLM-specific LLM model
-            if llm_model_type:
-                if llm_model_type not in self.available_vlm_llm_models:
-                    print(f"VLM LLM Modell {llm_model_type} nicht verfügbar. Verfügbare Modelle: {list(self.available_vlm_llm_models.keys())}")
-                    return False
-                
-                self.current_vlm_llm_model = llm_model_type
-                self.vlm_llm_model = key_manager.get_model("vlm_llm", llm_model_type)
-                self.vlm_llm_client = OpenAI(
-                    api_key=key_manager.get_key("vlm_llm", llm_model_type),
-                    base_url=key_manager.get_base_url("vlm_llm", llm_model_type),
-                    timeout=key_manager.get_timeout("vlm_llm", llm_model_type)
-                )
-            
-            # Set evaluation model
-            if evaluation_model_type:
-                if evaluation_model_type not in self.available_evaluation_models:
-                    print(f"Evaluationsmodell {evaluation_model_type} nicht verfügbar. Verfügbare Modelle: {list(self.available_evaluation_models.keys())}")
-                    return False
-                
-                self.current_evaluation_model = evaluation_model_type
-                self.evaluation_model = key_manager.get_model("evaluation", evaluation_model_type)
-                self.evaluation_client = OpenAI(
-                    api_key=key_manager.get_key("evaluation", evaluation_model_type),
-                    base_url=key_manager.get_base_url("evaluation", evaluation_model_type),
-                    timeout=key_manager.get_timeout("evaluation", evaluation_model_type)
-                )
-            
+            context = self.create_context(vision_model_type, llm_model_type, evaluation_model_type, self.context)
+            if context is None:
+                return False
+            self.context = context
             return True
         except Exception as e:
             print(f"Fehler beim Wechseln der Modelle: {e}")
             return False
     
+    def create_context(self, vision_model_type: str = None, llm_model_type: str = None,
+                       evaluation_model_type: str = None,
+                       base: Optional[VLMModelContext] = None) -> Optional[VLMModelContext]:
+        """Erstelle den Kontext einer Modellkombination (nicht angegebene Modelle stammen aus base)"""
+        context = base or VLMModelContext()
+        
+        # Set vision model
+        if vision_model_type:
+            if vision_model_type not in self.available_vlm_llm_models:
+                print(f"Vision Modell {vision_model_type} nicht verfügbar. Verfügbare Modelle: {list(self.available_vlm_llm_models.keys())}")
+                return None
+            context = replace(context, vision=ModelContext.create("vlm_llm", vision_model_type, owner=self.suite_name))
+        
+        # Set VLM-specific LLM model
+        if llm_model_type:
+            if llm_model_type not in self.available_vlm_llm_models:
+                print(f"VLM LLM Modell {llm_model_type} nicht verfügbar. Verfügbare Modelle: {list(self.available_vlm_llm_models.keys())}")
+                return None
+            context = replace(context, vlm_llm=ModelContext.create("vlm_llm", llm_model_type, owner=self.suite_name))
+        
+        # Set evaluation model
+        if evaluation_model_type:
+            if evaluation_model_type not in self.available_evaluation_models:
+                print(f"Evaluationsmodell {evaluation_model_type} nicht verfügbar. Verfügbare Modelle: {list(self.available_evaluation_models.keys())}")
+                return None
+            context = replace(context, evaluation=ModelContext.create("evaluation", evaluation_model_type, owner=self.suite_name))
+        
+        return context
+    
     def validate_prerequisites(self) -> bool:
         """Validiere Voraussetzungen für die Test Suite"""
         try:
-            # Teste Vision API Verbindung
-            response = self.vision_client.chat.completions.create(
-                model=self.vision_model,
-                messages=[{"role": "user", "content": "Test"}],
-                max_tokens=1
-            )
-            return True
+            # Teste Vision API Verbindung (Ergebnis wird zwischengespeichert)
+            probe = health_probe.probe(self.context.vision.service, self.context.vision.model_type)
+            if not probe.healthy:
+                print(f"Vision API Verbindung fehlgeschlagen: {probe.error}")
+            return probe.healthy
         except Exception as e:
             print(f"Vision API Verbindung fehlgeschlagen: {e}")
             return False
@@ -133,14 +155,14 @@ class VLMTestSuite(BaseTestSuite):
     def read_reference_text(self, filename: str) -> str:
         """Lese Referenztext aus Datei"""
         try:
-            with open(filename, 'r', encoding='utf-8') as f:
-                return f.read().strip()
+            return reference_index.read_file(filename)
         except Exception as e:
             print(f"Fehler beim Lesen der Referenzdatei {filename}: {e}")
             return ""
     
-    def test_document_analysis(self) -> Dict[str, Any]:
+    def test_document_analysis(self, context: Optional[VLMModelContext] = None) -> Dict[str, Any]:
         """Teste Dokumentenanalyse mit Bildern"""
+        context = context or self.context
         image_file = "Bild/1.png"
         reference_text = self.read_reference_text("Bild/1.txt")
         
@@ -153,22 +175,19 @@ class VLMTestSuite(BaseTestSuite):
         
         try:
             # Analysiere Bild mit Vision API
-            import base64
-            with open(image_file, "rb") as image_file_obj:
-                image_base64 = base64.b64encode(image_file_obj.read()).decode('utf-8')
-                response = self.vision_client.chat.completions.create(
-                    model=self.vision_model,
-                    messages=[
-                        {
-                            "role": "user",
-                            "content": [
-                                {"type": "text", "text": "Analysiere dieses Bild und erkläre die dargestellten chemischen Prozesse und Spaltungsprodukte von Methan."},
-                                {"type": "image_url", "image_url": {"url": f"data:image/png;base64,{image_base64}"}}
-                            ]
-                        }
-                    ],
-                    max_tokens=500
-                )
+            image_base64 = cpu_pool.run(encode_file_base64, image_file)
+            response = context.vision.chat(
+                messages=[
+                    {
+                        "role": "user",
+                        "content": [
+                            {"type": "text", "text": "Analysiere dieses Bild und erkläre die dargestellten chemischen Prozesse und Spaltungsprodukte von Methan."},
+                            {"type": "image_url", "image_url": {"url": f"data:image/png;base64,{image_base64}"}}
+                        ]
+                    }
+                ],
+                max_tokens=500
+            )
             
             generated_analysis = response.choices[0].message.content
             
@@ -196,8 +215,9 @@ class VLMTestSuite(BaseTestSuite):
                 "details": f"Dokumentenanalyse Test fehlgeschlagen: {e}"
             }
     
-    def test_data_extraction(self) -> Dict[str, Any]:
+    def test_data_extraction(self, context: Optional[VLMModelContext] = None) -> Dict[str, Any]:
         """Teste Datenextraktion aus technischen Bildern"""
+        context = context or self.context
         image_file = "Bild/2.JPG"
         reference_text = self.read_reference_text("Bild/2.txt")
         
@@ -210,22 +230,19 @@ class VLMTestSuite(BaseTestSuite):
         
         try:
             # Extrahiere Daten aus Bild mit Vision API
-            import base64
-            with open(image_file, "rb") as image_file_obj:
-                image_base64 = base64.b64encode(image_file_obj.read()).decode('utf-8')
-                response = self.vision_client.chat.completions.create(
-                    model=self.vision_model,
-                    messages=[
-                        {
-                            "role": "user",
-                            "content": [
-                                {"type": "text", "text": "Extrahiere alle technischen Daten aus diesem Bild und formatiere sie als strukturierte Daten."},
-                                {"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{image_base64}"}}
-                            ]
-                        }
-                    ],
-                    max_tokens=600
-                )
+            image_base64 = cpu_pool.run(encode_file_base64, image_file)
+            response = context.vision.chat(
+                messages=[
+                    {
+                        "role": "user",
+                        "content": [
+                            {"type": "text", "text": "Extrahiere alle technischen Daten aus diesem Bild und formatiere sie als strukturierte Daten."},
+                            {"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{image_base64}"}}
+                        ]
+                    }
+                ],
+                max_tokens=600
+            )
             
             generated_data = response.choices[0].message.content
             
@@ -253,8 +270,9 @@ class VLMTestSuite(BaseTestSuite):
                 "details": f"Datenextraktion Test fehlgeschlagen: {e}"
             }
     
-    def test_creative_story_generation(self) -> Dict[str, Any]:
+    def test_creative_story_generation(self, context: Optional[VLMModelContext] = None) -> Dict[str, Any]:
         """Teste kreative Geschichtenerstellung aus Bildern"""
+        context = context or self.context
         image_file = "Bild/3.png"
         reference_text = self.read_reference_text("Bild/3.txt")
         
@@ -267,22 +285,19 @@ class VLMTestSuite(BaseTestSuite):
         
         try:
             # Generiere Geschichte aus Bild mit Vision API
-            import base64
-            with open(image_file, "rb") as image_file_obj:
-                image_base64 = base64.b64encode(image_file_obj.read()).decode('utf-8')
-                response = self.vision_client.chat.completions.create(
-                    model=self.vision_model,
-                    messages=[
-                        {
-                            "role": "user",
-                            "content": [
-                                {"type": "text", "text": "Erstelle eine kreative Geschichte basierend auf diesem Bild. Die Geschichte sollte ansprechend und originell sein."},
-                                {"type": "image_url", "image_url": {"url": f"data:image/png;base64,{image_base64}"}}
-                            ]
-                        }
-                    ],
-                    max_tokens=600
-                )
+            image_base64 = cpu_pool.run(encode_file_base64, image_file)
+            response = context.vision.chat(
+                messages=[
+                    {
+                        "role": "user",
+                        "content": [
+                            {"type": "text", "text": "Erstelle eine kreative Geschichte basierend auf diesem Bild. Die Geschichte sollte ansprechend und originell sein."},
+                            {"type": "image_url", "image_url": {"url": f"data:image/png;base64,{image_base64}"}}
+                        ]
+                    }
+                ],
+                max_tokens=600
+            )
             
             generated_story = response.choices[0].message.content
             
@@ -310,16 +325,16 @@ class VLMTestSuite(BaseTestSuite):
                 "details": f"Kreative Geschichtenerstellung Test fehlgeschlagen: {e}"
             }
     
-    def test_multimodal_integration(self) -> Dict[str, Any]:
+    def test_multimodal_integration(self, context: Optional[VLMModelContext] = None) -> Dict[str, Any]:
         """Teste Integration von Text, Audio und Vision"""
+        context = context or self.context
         # Kombiniere alle Modalitäten
         results = {}
         
         try:
             # 1. Textanalyse (aus VLM-specific LLM Tests)
             text_prompt = "Was sind die Hauptprinzipien der evolutionären Biologie?"
-            text_response = self.vlm_llm_client.chat.completions.create(
-                model=self.vlm_llm_model,
+            text_response = context.vlm_llm.chat(
                 messages=[{"role": "user", "content": text_prompt}],
                 max_tokens=300
             )
@@ -328,8 +343,8 @@ class VLMTestSuite(BaseTestSuite):
             # 2. Audioanalyse (aus Audio Model Tests)
             if os.path.exists("Audio/1.wav"):
                 with open("Audio/1.wav", "rb") as audio_file:
-                    audio_transcription = self.vlm_llm_client.audio.transcriptions.create(
-                        model=self.vlm_llm_model,
+                    audio_transcription = context.vlm_llm.client.audio.transcriptions.create(
+                        model=context.vlm_llm.model,
                         file=audio_file,
                         response_format="text"
                     )
@@ -337,22 +352,19 @@ class VLMTestSuite(BaseTestSuite):
             
             # 3. Bildanalyse (aus VLM Tests)
             if os.path.exists("Bild/1.png"):
-                import base64
-                with open("Bild/1.png", "rb") as image_file:
-                    image_base64 = base64.b64encode(image_file.read()).decode('utf-8')
-                    vision_response = self.vision_client.chat.completions.create(
-                        model=self.vision_model,
-                        messages=[
-                            {
-                                "role": "user",
-                                "content": [
-                                    {"type": "text", "text": "Zusammenfasse die wichtigsten Punkte aus diesem Bild."},
-                                    {"type": "image_url", "image_url": {"url": f"data:image/png;base64,{image_base64}"}}
-                                ]
-                            }
-                        ],
-                        max_tokens=300
-                    )
+                image_base64 = cpu_pool.run(encode_file_base64, "Bild/1.png")
+                vision_response = context.vision.chat(
+                    messages=[
+                        {
+                            "role": "user",
+                            "content": [
+                                {"type": "text", "text": "Zusammenfasse die wichtigsten Punkte aus diesem Bild."},
+                                {"type": "image_url", "image_url": {"url": f"data:image/png;base64,{image_base64}"}}
+                            ]
+                        }
+                    ],
+                    max_tokens=300
+                )
                 results["image_analysis"] = vision_response.choices[0].message.content
             
             # 4. Kombinierte Analyse
@@ -366,8 +378,7 @@ class VLMTestSuite(BaseTestSuite):
             Bitte verbinde alle Informationen zu einem kohärenten Ganzen.
             """
             
-            combined_response = self.vlm_llm_client.chat.completions.create(
-                model=self.vlm_llm_model,
+            combined_response = context.vlm_llm.chat(
                 messages=[{"role": "user", "content": combined_prompt}],
                 max_tokens=500
             )
@@ -391,8 +402,7 @@ class VLMTestSuite(BaseTestSuite):
             - Qualität der Zusammenführung
             """
             
-            evaluation_response = self.evaluation_client.chat.completions.create(
-                model=self.evaluation_model,
+            evaluation_response = context.evaluation.chat(
                 messages=[{"role": "user", "content": evaluation_prompt}],
                 max_tokens=200
             )
@@ -414,8 +424,9 @@ class VLMTestSuite(BaseTestSuite):
                 "details": f"Multimodale Integration Test fehlgeschlagen: {e}"
             }
     
-    def test_comprehensive_vlm_evaluation(self) -> Dict[str, Any]:
+    def test_comprehensive_vlm_evaluation(self, context: Optional[VLMModelContext] = None) -> Dict[str, Any]:
         """Teste umfassende VLM Bewertung mit allen vorherigen Aufgaben"""
+        context = context or self.context
         # Führe alle vorherigen Aufgaben aus und kombiniere Ergebnisse
         all_results = {}
         
@@ -460,8 +471,7 @@ class VLMTestSuite(BaseTestSuite):
             Bitte gib eine finale Gesamtbewertung ab und gib Empfehlungen für Verbesserungen.
             """
             
-            final_response = self.evaluation_client.chat.completions.create(
-                model=self.evaluation_model,
+            final_response = context.evaluation.chat(
                 messages=[{"role": "user", "content": final_prompt}],
                 max_tokens=400
             )
@@ -496,8 +506,20 @@ class VLMTestSuite(BaseTestSuite):
         except:
             return 0.5
     
+    def plan_tests(self) -> List[PlannedTest]:
+        """Alle Kombinationen aus Vision, VLM LLM und Evaluationsmodell wie in run_all_tests"""
+        tests = []
+        for vision_model in self.available_vlm_llm_models:
+            base_url = key_manager.get_base_url("vlm_llm", vision_model)
+            for vlm_llm_model in self.available_vlm_llm_models:
+                for eval_model in self.available_evaluation_models:
+                    label = VLMModelContext.make_label(vision_model, vlm_llm_model, eval_model)
+                    tests.extend(self.plan_test(f"{test_name}_{label}", base_url, label)
+                                 for test_name in self.TEST_NAMES)
+        return self.select_planned_tests(tests)
+    
     def run_all_tests(self) -> List[TestResult]:
-        """Führe alle Tests in der Suite aus"""
+        """Führe alle Tests in der Suite aus, alle Modellkombinationen gleichzeitig"""
         # Get all available models - use VLM LLM models for vision
         available_vision_models = list(self.available_vlm_llm_models.keys())
         available_vlm_llm_models = list(self.available_vlm_llm_models.keys())
@@ -507,36 +529,43 @@ class VLMTestSuite(BaseTestSuite):
         print(f"Verfügbare VLM LLM Modelle: {available_vlm_llm_models}")
         print(f"Verfügbare Evaluationsmodelle: {available_evaluation_models}")
         
-        all_results = []
+        # Nicht erreichbare Modelle werden übersprungen (Prüfung gleichzeitig und zwischengespeichert)
+        probes = health_probe.probe_many([("vlm_llm", model_type) for model_type in available_vlm_llm_models])
+        unhealthy = {model_type for (_, model_type), probe in probes.items() if not probe.healthy}
+        for model_type in sorted(unhealthy):
+            print(f"✗ Überspringe Modell {model_type}: nicht erreichbar ({probes[('vlm_llm', model_type)].error})")
+        self.warm_up_models([("vlm_llm", model_type) for model_type in available_vlm_llm_models if model_type not in unhealthy])
         
         # Test combinations of models
+        contexts = []
         for vision_model in available_vision_models:
             for vlm_llm_model in available_vlm_llm_models:
+                if vision_model in unhealthy or vlm_llm_model in unhealthy:
+                    continue
                 for eval_model in available_evaluation_models:
-                    print(f"\n{'='*60}")
-                    print(f"TESTE MODELL KOMBINATION: Vision={vision_model}, VLM_LLM={vlm_llm_model}, Evaluation={eval_model}")
-                    print(f"{'='*60}")
-                    
-                    # Switch to this model combination
-                    if not self.set_model(vision_model, vlm_llm_model, eval_model):
+                    try:
+                        context = self.create_context(vision_model, vlm_llm_model, eval_model)
+                    except Exception as e:
+                        print(f"Fehler beim Wechseln der Modelle: {e}")
+                        context = None
+                    if context is None:
                         print(f"✗ Konnte nicht zu Modellkombination wechseln")
                         continue
-                    
-                    # Run only the core VLM tests as specified
-                    tests = [
-                        ("document_analysis", self.test_document_analysis),
-                        ("data_extraction", self.test_data_extraction),
-                        ("creative_story_generation", self.test_creative_story_generation)
-                    ]
-                    
-                    model_results = []
-                    for test_name, test_func in tests:
-                        # Add model names to test name for identification
-                        test_name_with_models = f"{test_name}_vision_{vision_model}_vlm_llm_{vlm_llm_model}_eval_{eval_model}"
-                        result = self.run_single_test(test_name_with_models, test_func)
-                        all_results.append(result)
-                        model_results.append(result)
-                    
-                    all_results.extend(model_results)
+                    contexts.append(context)
+        
+        # Alle Kombinationen laufen gleichzeitig
+        return self.run_models_concurrently(contexts, self._run_model_tests)
+    
+    def _run_model_tests(self, context: VLMModelContext) -> List[TestResult]:
+        """Führe die VLM Tests für eine Modellkombination aus (bis zu max_workers gleichzeitig)"""
+        print(f"\n{'='*60}")
+        print(f"TESTE MODELL KOMBINATION: Vision={context.vision.model_type}, "
+              f"VLM_LLM={context.vlm_llm.model_type}, Evaluation={context.evaluation.model_type}")
+        print(f"{'='*60}")
         
-        return all_results
\ No newline at end of file
+        # Run only the core VLM tests as specified
+        # Add model names to test name for identification
+        return self.run_tests_concurrently([
+            (f"{test_name}_{context.label}", partial(getattr(self, f"test_{test_name}"), context))
+            for test_name in self.TEST_NAMES
+        ], endpoint=context.vision.base_url if context.vision else None, group=context.label)
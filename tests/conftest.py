@@ -0,0 +1,7 @@
+"""
+Gemeinsame Testumgebung: Platzhalter-Schlüssel, damit config ohne config.env lädt
+"""
+import os
+
+for _service in ("LLM", "VISION", "CODING", "WHISPER", "VOXTRAL", "EVALUATION"):
+    os.environ.setdefault(f"{_service}_API_KEY", "test")
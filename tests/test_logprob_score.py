@@ -0,0 +1,55 @@
+"""
+Tests für die Score-Berechnung im Logprob-Modus
+"""
+import math
+from types import SimpleNamespace
+
+import pytest
+
+from core.evaluator import _BaseLLMClient
+
+
+def _token(token, probability, alternatives=None):
+    return SimpleNamespace(token=token, logprob=math.log(probability), top_logprobs=alternatives or [])
+
+
+def _choice(*tokens):
+    return SimpleNamespace(logprobs=SimpleNamespace(content=list(tokens)))
+
+
+@pytest.fixture
+def client():
+    return _BaseLLMClient("evaluation")
+
+
+def test_expected_value_over_score_tokens(client):
+    first = _token("9", 0.75, [_token("9", 0.75), _token(" 9", 0.05), _token("6", 0.2)])
+    score, confidence = client._score_from_logprobs(_choice(first))
+    assert score == pytest.approx((0.8 * 9 + 0.2 * 6) / 9)
+    assert confidence == pytest.approx(0.8)
+
+
+def test_top_score_is_perfect(client):
+    first = _token("9", 0.99, [_token("9", 0.99)])
+    score, _ = client._score_from_logprobs(_choice(first))
+    assert score == pytest.approx(1.0)
+
+
+def test_digit_split_number_is_not_read_as_first_digit(client):
+    # Tokenizer mit Ziffernzerlegung: "10" kommt als "1" gefolgt von "0"
+    first = _token("1", 0.9, [_token("1", 0.9), _token("9", 0.1)])
+    second = _token("0", 0.99, [_token("0", 0.99)])
+    assert client._score_from_logprobs(_choice(first, second)) is None
+    assert client.logprobs_supported
+
+
+def test_single_digit_followed_by_text(client):
+    first = _token("1", 0.9, [_token("1", 0.9), _token("2", 0.1)])
+    second = _token(".", 0.9, [_token(".", 0.9)])
+    score, _ = client._score_from_logprobs(_choice(first, second))
+    assert score == pytest.approx((0.9 * 1 + 0.1 * 2) / 9)
+
+
+def test_missing_logprobs_disables_mode(client):
+    assert client._score_from_logprobs(SimpleNamespace(logprobs=None)) is None
+    assert not client.logprobs_supported
@@ -0,0 +1,76 @@
+"""
+Parität der eigenen BLEU und ROUGE-L Implementierung mit NLTK und rouge_score
+"""
+import pytest
+
+from core import metrics
+
+sentence_bleu = pytest.importorskip("nltk.translate.bleu_score").sentence_bleu
+SmoothingFunction = pytest.importorskip("nltk.translate.bleu_score").SmoothingFunction
+rouge_scorer = pytest.importorskip("rouge_score.rouge_scorer")
+
+# (Referenz, Antwort)
+CORPUS = [
+    ("Die deutsche Energiepolitik setzt auf erneuerbare Energien.",
+     "Die deutsche Energiepolitik setzt stark auf erneuerbare Energien."),
+    ("The quick brown fox jumps over the lazy dog.",
+     "A quick brown fox jumped over a lazy dog."),
+    ("Running runners ran quickly through the running track.",
+     "The runner runs quickly on the track."),
+    ("Künstliche Intelligenz verändert die Arbeitswelt grundlegend.",
+     "Die Arbeitswelt wird durch künstliche Intelligenz verändert."),
+    ("It's a well-known fact: 3.14 is close to pi!",
+     "It is well known that 3.14 is close to pi."),
+    ("Completely different reference text.", "Nothing in common here"),
+    ("Identical sentence with several words.", "Identical sentence with several words."),
+    # Leere Texte
+    ("", ""),
+    ("Reference without candidate.", ""),
+    ("", "Candidate without reference."),
+    # Einzelne Token
+    ("word", "word"),
+    ("word", "other"),
+    ("Ein kurzer Referenzsatz mit mehreren Wörtern.", "Referenzsatz"),
+    # Wiederholte Token
+    ("the cat sat on the mat", "the the the the the the"),
+    ("the the the", "the the the the the the"),
+    ("a b a b a b", "b a b a b a"),
+]
+
+
+def _nltk_bleu(reference: str, candidate: str) -> float:
+    # Gleiche Tokenisierung, damit nur die BLEU Berechnung verglichen wird
+    reference_tokens = metrics.tokenize(reference)
+    candidate_tokens = metrics.tokenize(candidate)
+    if not candidate_tokens:
+        return 0.0
+    return sentence_bleu([reference_tokens], candidate_tokens,
+                         smoothing_function=SmoothingFunction().method1)
+
+
+@pytest.fixture(scope="module")
+def scorer():
+    return rouge_scorer.RougeScorer(["rougeL"], use_stemmer=True)
+
+
+@pytest.mark.filterwarnings("ignore::UserWarning")
+@pytest.mark.parametrize("reference,candidate", CORPUS)
+def test_bleu_matches_nltk(reference, candidate):
+    native = metrics.bleu(metrics.tokenize(reference), metrics.tokenize(candidate))
+    assert native == pytest.approx(_nltk_bleu(reference, candidate), abs=1e-9)
+
+
+@pytest.mark.parametrize("reference,candidate", CORPUS)
+def test_rouge_l_matches_rouge_score(scorer, reference, candidate):
+    native = metrics.rouge_l(metrics.rouge_tokenize(reference), metrics.rouge_tokenize(candidate))
+    expected = scorer.score(reference, candidate)["rougeL"].fmeasure
+    assert native == pytest.approx(expected, abs=1e-9)
+
+
+@pytest.mark.filterwarnings("ignore::UserWarning")
+def test_batch_matches_single_scores():
+    assert metrics.bleu_batch(CORPUS) == pytest.approx([_nltk_bleu(*pair) for pair in CORPUS], abs=1e-9)
+    assert metrics.rouge_l_batch(CORPUS) == pytest.approx([
+        metrics.rouge_l(metrics.rouge_tokenize(reference), metrics.rouge_tokenize(candidate))
+        for reference, candidate in CORPUS
+    ])